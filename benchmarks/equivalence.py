@@ -0,0 +1,693 @@
+#-*- coding: utf-8 -*-
+
+
+import os
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from benchmarks.generators import GENERATORS, station_name
+from classes.Network import Network
+from classes.ResultCache import ResultCache
+from classes.Search import Search
+from classes.Station import Station
+from classes.SearchEngine import SearchEngine
+from classes.engines import register_engines
+
+from constants import NUMBER_OF_LANDMARKS
+
+
+register_engines()
+
+
+# The families of the random networks: those of the generators, and dense networks with few distinct times, where
+# many paths are equally fast and the order of the results only depends on how ties are broken.
+FAMILIES = sorted(GENERATORS) + ["ties"]
+
+# The precomputed structures with which the engines may also be run.
+STRUCTURES = ("hierarchy", "landmarks")
+
+# The ways in which the engines are run: searching all the pairs at once in one process or over several worker
+# processes, and streaming the pairs one at a time, which searches each of them with search_station_pair.
+MODES = ("batch", "workers", "stream")
+
+# The number of worker processes of the engines run in the workers mode.
+NUMBER_OF_WORKERS = 2
+
+# The station lines on which a connection is listed: the line of its first station, the line of its second station,
+# or both, in which case the network holds it twice.
+LISTINGS = ("first", "second", "both")
+
+# The name, in the reports, of the original depth-first search.
+REFERENCE = "reference"
+
+
+class ReferenceSearch(Search):
+    """
+    A class that finds and writes the fastest paths with a copy of the original Search class: its reading of the
+    stations file, its lookup of the stations by name, its recursive depth-first search and its string representation
+    are kept unchanged apart from the number of paths, so that the engines are compared with the output of the original
+    tool rather than with the current Search class.
+    """
+
+    def read_stations_file(self):
+        """
+        Reads the stations file of the current Search instance.
+
+        Returns:
+            list: a list of lists, where each inner list contains two strings representing a pair of stations (source and
+                  destination), as specified in each line of the file
+        """
+
+        in_file = open(self.get_stations_file(), "r", encoding="utf-8-sig")
+        lines = []
+        
+        for line in in_file:
+            start, end = line.rstrip().split(" - ")
+            lines.append([start, end])
+
+        return lines
+
+
+    def check_network_stations(self):
+        """
+        Checks which stations from the stations file are in and out of the network in the current Search instance.
+        """
+
+        stations = []
+        out_of_network_stations = []
+        in_network_stations = []
+
+        station_pairs = self.read_stations_file()
+
+        for station_pair in station_pairs:
+            start_station = None
+            end_station = None
+
+            for station in self.get_network().stations_items():
+                if station.get_name() == station_pair[0]:
+                    start_station = station
+                    
+                if station.get_name() == station_pair[1]:
+                    end_station = station
+
+            if start_station is not None and end_station is not None:
+                in_network_stations.append([start_station, end_station])
+                stations.append([start_station, end_station])
+            
+            elif start_station is None and end_station is not None:
+                out_of_network_stations.append(Station(station_pair[0]))
+                stations.append([Station(station_pair[0]), end_station])
+            
+            elif start_station is not None and end_station is None:
+                out_of_network_stations.append(Station(station_pair[1]))
+                stations.append([start_station, Station(station_pair[1])])
+            
+            elif start_station is None and end_station is None:
+                out_of_network_stations.append(Station(station_pair[0]))
+                out_of_network_stations.append(Station(station_pair[1]))
+                stations.append([Station(station_pair[0]), Station(station_pair[1])])
+            
+        self.set_stations(stations)
+        self.set_in_network_stations(in_network_stations)
+        self.set_out_of_network_stations(out_of_network_stations)
+
+
+    def depth_first_search(self, start, end, path, fastest_paths):
+        """
+        Performs depth-first search to find the three fastest paths between two stations of the current Search instance
+
+        Args:
+            start (Station):
+            end (Station): 
+            path (list): the list of stations that make a path.
+            
+        Returns:
+            fastest_paths (list): a list of lists, where each inner list corresponds to one of the fastest paths (maximum of 3)
+                                  found between the start and end stations.
+        """
+
+        if fastest_paths is None:
+            fastest_paths = []
+
+        if not path:
+            path = [0, start]
+
+        current_time = path[0]
+        current_path = path[1:]
+
+        if start == end:
+            self.update_fastest_paths(path, fastest_paths)
+            return fastest_paths
+
+        if self.is_current_path_longer_than_third_fastest(fastest_paths, current_time):
+            return fastest_paths
+
+        for neighbor, time in self.get_network().children_of(start):
+            if neighbor not in current_path:
+                new_time = current_time + time.get_minutes()
+                new_path = [new_time] + current_path + [neighbor]
+                fastest_paths = self.depth_first_search(neighbor, end, new_path, fastest_paths)
+
+        return fastest_paths
+
+
+    def update_fastest_paths(self, path, fastest_paths):
+        """
+        Updates the collection of fastest paths for the current Search instance.
+
+        Args:
+            fastest_paths (list): list of lists where each inner list corresponds to one of the fastest paths found so far
+                                  between the source and destination stations.
+            path (list): the path to potentially add, where the first element corresponds to the time and the subsequent ones
+                         to the stations.
+        """
+
+        if len(fastest_paths) < self.get_k():
+            fastest_paths.append(path)
+        else:
+            if path[0] < max(path[0] for path in fastest_paths):
+                fastest_paths.remove(max(fastest_paths, key=lambda x: (x[0], -len(x[1:]), x[2])))
+                fastest_paths.append(path)
+
+    
+    def is_current_path_longer_than_third_fastest(self, fastest_paths, current_time):
+        """
+        Checks whether the current time of a path is longer than the third fastest path found so far between the start and
+        end stations.
+        
+        Args:
+            fastest_paths (list): a list of lists, where each inner list corresponds to one of the fastest paths (up to
+                                  three) between the start and end stations.
+            current_time (int): the current time of the path.
+
+        Returns:
+            bool:
+                - True if the current path time is longer than the less fastest path in fastest paths.
+                - False otherwise.
+        """
+
+        if len(fastest_paths) == self.get_k():
+            third_best_path_time = max(fastest_paths, key=lambda x: x[0])[0]
+            if current_time >= third_best_path_time:
+                return True
+        return False
+
+
+    def sort_fastest_paths(self, fastest_paths):
+        """
+        Sorts the depth-first search results for the current Search instance, according to the criteria defined in the
+        specification of the network-fastest-path-find tool.
+
+        Args:
+            fastest_paths (list): a list of lists, where each inner list corresponds to one of the fastest paths (up to
+                                  three) between the start and end stations.
+        
+        Returns:
+            list: the sorted list of fastest paths.
+        """
+
+        return sorted(fastest_paths, key=lambda x: (x[0], -len(x[1:]), x[2]))
+
+
+    def search(self):
+        """
+        Performs depth-first search to find the three fastest paths between the station pairs provided in the stations file
+        and present in the network of the current Search instance.
+        """
+        
+        for station_pair in self.get_in_network_stations():
+            start = station_pair[0]
+            end = station_pair[1]
+            
+            fastest_paths = self.depth_first_search(start, end, [], None)
+            sorted_paths = self.sort_fastest_paths(fastest_paths)
+
+            self._search_results.append(sorted_paths)
+
+
+    def __str__(self):
+        """
+        The string representation of a Search instance.
+
+        Returns:
+            result (str): the current Search instance as a string.
+        """
+
+        result = ""
+        for station_pair in self.stations_items():
+            
+            station_pairs_result = None
+            result += '# ' + ' - '.join([str(station) for station in station_pair]) + "\n"
+
+            if station_pair[0] in self.get_out_of_network_stations() and station_pair[1] not in self.get_out_of_network_stations():
+                result += f"{station_pair[0]} out of the network\n"
+            elif station_pair[1] in self.get_out_of_network_stations() and station_pair[0] not in self.get_out_of_network_stations():
+                result += f"{station_pair[1]} out of the network\n"
+            elif station_pair[0] in self.get_out_of_network_stations() and station_pair[1] in self.get_out_of_network_stations():
+                result += f"{station_pair[0]} and {station_pair[1]} out of the network\n"
+
+            for result_path in self.get_search_results():
+                for i in range(len(result_path)):
+                    if station_pair[0] == result_path[i][1] and station_pair[1] == result_path[i][-1]:
+                        station_pairs_result = ', '.join([str(station) for station in result_path[i]])
+                        result += station_pairs_result + "\n"
+
+            if station_pairs_result is None and station_pair[0] not in self.get_out_of_network_stations() \
+                                          and station_pair[1] not in self.get_out_of_network_stations():
+                result += f"{station_pair[0]} and {station_pair[1]} do not communicate\n"
+        
+        return result.rstrip()
+
+
+def random_case(rng, family, max_stations):
+    """
+    Generates a small random network and pairs of stations to be searched in it. The times are sometimes replaced by
+    two values, so that many paths are equally fast. Some connections are repeated with another time, and some are
+    listed on the line of their second station or on the lines of both stations. The pairs include repeated pairs,
+    next to each other or not, reversed pairs, stations out of the network and, whenever the network has several
+    components, stations that do not communicate. A few pairs have the same start and end station, on which the
+    original tool fails; the engines must then fail in the same way.
+
+    Args:
+        rng (Random): the random number generator.
+        family (str): the family of the network, one of FAMILIES.
+        max_stations (int): the largest number of stations of the network, at least 2.
+
+    Returns:
+        tuple: a 3-element tuple containing:
+            - number_of_stations (int): the number of stations of the network.
+            - connections (list): the first station, second station, time and listing (one of LISTINGS) of each
+                                  connection, as 4-element tuples.
+            - pairs (list): the names of the start and end stations of each pair, as 2-element tuples.
+    """
+
+    number_of_stations = rng.randint(2, max_stations)
+    connections = []
+
+    if family == "ties":
+        density = rng.choice((0.3, 0.5, 0.8))
+        for first in range(number_of_stations):
+            for second in range(first + 1, number_of_stations):
+                if rng.random() < density:
+                    connections.append((first, second, rng.choice((5, 10))))
+    else:
+        for first, neighbors in enumerate(GENERATORS[family](number_of_stations, rng)):
+            connections.extend((first, second, time) for second, time in neighbors)
+
+        if rng.random() < 0.5:
+            times = rng.choice(((1, 2), (5, 10), (3, 3)))
+            connections = [(first, second, rng.choice(times)) for first, second, _ in connections]
+
+    for first, second, time in list(connections):
+        if rng.random() < 0.1:
+            connections.append((first, second, max(1, time + rng.choice((-1, 0, 1)))))
+
+    connections = [(first, second, time, rng.choices(LISTINGS, (8, 1, 1))[0]) for first, second, time in connections]
+
+    names = [station_name(station) for station in range(number_of_stations)] + ["Ghost %d" % i for i in range(2)]
+    weights = [10] * number_of_stations + [1, 1]
+    pairs = []
+
+    for _ in range(rng.randint(1, 8)):
+        start, end = rng.choices(range(len(names)), weights, k=2)
+        if start == end and rng.random() < 0.9:
+            continue
+
+        pairs.append((names[start], names[end]))
+        if rng.random() < 0.2:
+            pairs.append((names[end], names[start]))
+        if rng.random() < 0.1:
+            pairs.append((names[start], names[end]))
+        if rng.random() < 0.2:
+            pairs.append(rng.choice(pairs))
+
+    if not pairs:
+        pairs.append((names[0], names[1]))
+
+    return number_of_stations, connections, pairs
+
+
+def write_case(directory, case):
+    """
+    Writes the network file and stations file of a case. Each connection is listed on the lines of the stations given
+    by its listing.
+
+    Args:
+        directory (str): the directory where the files are written.
+        case (tuple): the number of stations, connections and pairs of the case, as returned by random_case.
+
+    Returns:
+        tuple: the names of the network file and of the stations file.
+    """
+
+    number_of_stations, connections, pairs = case
+    network_file = os.path.join(directory, "network.txt")
+    stations_file = os.path.join(directory, "stations.txt")
+
+    with open(network_file, "w", encoding="utf-8") as out_file:
+        out_file.write("#Id, Name, Connected:\n")
+
+        for station in range(number_of_stations):
+            listed = []
+            for first, second, time, listing in connections:
+                if first == station and listing != "second":
+                    listed.append("(S%d, %d)" % (second, time))
+                if second == station and listing != "first":
+                    listed.append("(S%d, %d)" % (first, time))
+
+            out_file.write("S%d, %s, [%s]\n" % (station, station_name(station), ", ".join(listed)))
+
+    with open(stations_file, "w", encoding="utf-8") as out_file:
+        out_file.write("\n".join("%s - %s" % pair for pair in pairs))
+
+    return network_file, stations_file
+
+
+def load_network(network_file, structure=None, compact=True):
+    """
+    Loads a network, with one of its precomputed structures.
+
+    Args:
+        network_file (str): the file containing the network data.
+        structure (str, optional): the precomputed structure to build, one of STRUCTURES. Defaults to None.
+        compact (bool, optional): whether the connections are kept only in the compact graph. Defaults to True.
+
+    Returns:
+        Network: the network.
+    """
+
+    network = Network(network_file, compact=compact)
+
+    if structure == "hierarchy":
+        network.build_contraction_hierarchy()
+    elif structure == "landmarks":
+        network.build_landmark_index(NUMBER_OF_LANDMARKS)
+
+    return network
+
+
+def run_reference(network, stations_file, k):
+    """
+    Finds the results of a case with the original depth-first search, through ReferenceSearch.
+
+    Args:
+        network (Network): the network of the case.
+        stations_file (str): the stations file of the case.
+        k (int): the number of fastest paths of each pair of stations.
+
+    Returns:
+        tuple: the results, as written to the results file, and the time, in seconds, taken by the search.
+    """
+
+    search = ReferenceSearch(stations_file, network, k)
+    start_time = time.perf_counter()
+    search.search()
+
+    return str(search), time.perf_counter() - start_time
+
+
+def run_engine(engine, mode, network, stations_file, k):
+    """
+    Finds the results of a case with a registered search engine, run in one of MODES. In the stream mode, the results
+    are written next to the stations file and read back.
+
+    Args:
+        engine (str): the name of the engine.
+        mode (str): the way in which the engine is run, one of MODES.
+        network (Network): the network of the case.
+        stations_file (str): the stations file of the case.
+        k (int): the number of fastest paths of each pair of stations.
+
+    Returns:
+        tuple: the results, as written to the results file, and the time, in seconds, taken by the search.
+    """
+
+    if mode == "stream":
+        search = Search(stations_file, network, k, cache=ResultCache(), streaming=True)
+        directory = os.path.dirname(stations_file)
+        start_time = time.perf_counter()
+        SearchEngine.create(engine).stream_results(search, "results.txt", directory)
+        duration = time.perf_counter() - start_time
+
+        with open(os.path.join(directory, "results.txt"), "r", encoding="utf-8-sig") as in_file:
+            return in_file.read(), duration
+
+    search = Search(stations_file, network, k)
+    start_time = time.perf_counter()
+    SearchEngine.create(engine).search(search, NUMBER_OF_WORKERS if mode == "workers" else 1)
+
+    return str(search), time.perf_counter() - start_time
+
+
+def outcome(run, *arguments):
+    """
+    Runs the reference or an engine, turning an exception into a result so that failures can be compared.
+
+    Args:
+        run (function): run_reference or run_engine.
+        *arguments: the arguments of the function.
+
+    Returns:
+        tuple: the results, or the name of the exception raised, and the time taken.
+    """
+
+    start_time = time.perf_counter()
+
+    try:
+        return run(*arguments)
+    except Exception as error:
+        return "error: %s" % type(error).__name__, time.perf_counter() - start_time
+
+
+def differs(case, variant, k, directory):
+    """
+    Checks whether an engine gives different results from the reference on a case.
+
+    Args:
+        case (tuple): the number of stations, connections and pairs of the case, as returned by random_case.
+        variant (tuple): the name of the engine, the precomputed structure of its network, or None, and its mode.
+        k (int): the number of fastest paths of each pair of stations.
+        directory (str): the directory where the files of the case are written.
+
+    Returns:
+        bool:
+            - True if the results differ.
+            - False otherwise.
+    """
+
+    network_file, stations_file = write_case(directory, case)
+    engine, structure, mode = variant
+    expected, _ = outcome(run_reference, load_network(network_file, compact=False), stations_file, k)
+    actual, _ = outcome(run_engine, engine, mode, load_network(network_file, structure), stations_file, k)
+
+    return expected != actual
+
+
+def shrink(case, variant, k, directory):
+    """
+    Shrinks a case on which an engine differs from the reference, by removing pairs, stations and connections, by
+    listing connections on the line of their first station only and by lowering times, one at a time, for as long as
+    the results still differ.
+
+    Args:
+        case (tuple): the number of stations, connections and pairs of the case, as returned by random_case.
+        variant (tuple): the name of the engine, the precomputed structure of its network, or None, and its mode.
+        k (int): the number of fastest paths of each pair of stations.
+        directory (str): the directory where the files of the cases are written.
+
+    Returns:
+        tuple: the smallest case found on which the engine still differs from the reference.
+    """
+
+    def smaller_cases(case):
+        number_of_stations, connections, pairs = case
+
+        for i in range(len(pairs)):
+            if len(pairs) > 1:
+                yield number_of_stations, connections, pairs[:i] + pairs[i + 1:]
+
+        for station in reversed(range(number_of_stations)):
+            if number_of_stations > 2:
+                renamed = {station_name(other): station_name(other - 1) for other in range(station + 1, number_of_stations)}
+                yield (number_of_stations - 1,
+                       [(first - (first > station), second - (second > station), time, listing)
+                        for first, second, time, listing in connections if station not in (first, second)],
+                       [tuple(renamed.get(name, name) if name != station_name(station) else "Ghost 0" for name in pair)
+                        for pair in pairs])
+
+        for i in range(len(connections)):
+            yield number_of_stations, connections[:i] + connections[i + 1:], pairs
+
+        for i, (first, second, time, listing) in enumerate(connections):
+            if listing != "first":
+                yield number_of_stations, connections[:i] + [(first, second, time, "first")] + connections[i + 1:], pairs
+
+        for i, (first, second, time, listing) in enumerate(connections):
+            if time > 1:
+                yield (number_of_stations, connections[:i] + [(first, second, time // 2, listing)] + connections[i + 1:],
+                       pairs)
+
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for smaller_case in smaller_cases(case):
+            if differs(smaller_case, variant, k, directory):
+                case = smaller_case
+                shrunk = True
+                break
+
+    return case
+
+
+def variants(structures, modes=MODES):
+    """
+    The engines to be compared with the reference, each with the precomputed structures of its network and in each of
+    the modes. The workers mode is skipped for the engines that cannot use worker processes, and for the networks with a
+    precomputed structure, which are always searched in the current process.
+
+    Args:
+        structures (bool): whether each engine is also run with each of STRUCTURES.
+        modes (list, optional): the modes in which each engine is run, among MODES. Defaults to MODES.
+
+    Returns:
+        list: the name of each engine, its structure, or None, and its mode, as 3-element tuples.
+    """
+
+    return [(engine, structure, mode) for engine in SearchEngine.names()
+            for structure in (None,) + (STRUCTURES if structures else ())
+            for mode in modes
+            if mode != "workers" or (SearchEngine.engine_class(engine).parallel and structure is None)]
+
+
+def variant_name(engine, structure, mode):
+    """
+    The name of an engine, structure and mode in the reports.
+
+    Args:
+        engine (str): the name of the engine.
+        structure (str): the precomputed structure of the network of the engine, or None.
+        mode (str): the way in which the engine is run, one of MODES.
+
+    Returns:
+        str: the name of the engine, followed by the structure, if any, and by the mode, unless it is the batch mode.
+    """
+
+    return "/".join(part for part in (engine, structure, mode if mode != "batch" else None) if part is not None)
+
+
+def run(number_of_cases, families, max_stations, paths, seed=0, structures=False, output=None, modes=MODES):
+    """
+    Compares every registered engine with the reference on random cases. The first case on which each engine differs
+    from the reference is shrunk and, when an output directory is given, its network and stations files are written to
+    it.
+
+    Args:
+        number_of_cases (int): the number of random cases of each family.
+        families (list): the families of the networks, among FAMILIES.
+        max_stations (int): the largest number of stations of the networks.
+        paths (list): the numbers of fastest paths with which each case is searched.
+        seed (int, optional): the seed of the random cases. Defaults to 0.
+        structures (bool, optional): whether each engine is also run with each of STRUCTURES. Defaults to False.
+        output (str, optional): the directory where the shrunk cases are written. Defaults to None.
+        modes (list, optional): the modes in which each engine is run, among MODES. Defaults to MODES.
+
+    Returns:
+        tuple: a 2-element tuple containing:
+            - times (dict): the total time, in seconds, of the reference and of each engine, for each family.
+            - failures (dict): for each engine that differs from the reference, its structure and mode, its shrunk
+                               case, its number of fastest paths and the number of cases on which it differs.
+    """
+
+    times = {family: {} for family in families}
+    failures = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for family in families:
+            rng = random.Random("%s-%d" % (family, seed))
+
+            for _ in range(number_of_cases):
+                case = random_case(rng, family, max_stations)
+                k = rng.choice(paths)
+                network_file, stations_file = write_case(directory, case)
+
+                expected, duration = outcome(run_reference, load_network(network_file, compact=False), stations_file,
+                                             k)
+                times[family][REFERENCE] = times[family].get(REFERENCE, 0) + duration
+
+                for engine, structure, mode in variants(structures, modes):
+                    name = variant_name(engine, structure, mode)
+                    actual, duration = outcome(run_engine, engine, mode, load_network(network_file, structure),
+                                               stations_file, k)
+                    times[family][name] = times[family].get(name, 0) + duration
+
+                    if actual != expected:
+                        if name not in failures:
+                            failures[name] = {"variant": (engine, structure, mode), "case": case, "k": k, "count": 0}
+                        failures[name]["count"] += 1
+
+        for name, failure in failures.items():
+            failure["case"] = shrink(failure["case"], failure["variant"], failure["k"], directory)
+
+            if output is not None:
+                os.makedirs(os.path.join(output, name.replace("/", "-")), exist_ok=True)
+                write_case(os.path.join(output, name.replace("/", "-")), failure["case"])
+
+    return times, failures
+
+
+def parse_arguments():
+    """
+    Parses the command line arguments of the equivalence harness.
+
+    Returns:
+        Namespace: the parsed arguments.
+    """
+
+    parser = ArgumentParser(description="Compares the results of every search engine with the depth-first search.")
+    parser.add_argument("--cases", type=int, default=1000, metavar="N",
+                        help="the number of random cases of each family of networks")
+    parser.add_argument("--families", nargs="+", choices=FAMILIES, default=FAMILIES,
+                        help="the families of the random networks")
+    parser.add_argument("--max-stations", type=int, default=9, metavar="N",
+                        help="the largest number of stations of the random networks")
+    parser.add_argument("--paths", nargs="+", type=int, default=[1, 2, 3, 5], metavar="K",
+                        help="the numbers of fastest paths with which the cases are searched")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random cases")
+    parser.add_argument("--structures", action="store_true",
+                        help="also run each engine with a contraction hierarchy and with a landmark index")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES,
+                        help="the ways in which each engine is run: in one process, over worker processes or streamed")
+    parser.add_argument("--output", metavar="DIR", help="the directory where the shrunk failing cases are written")
+
+    arguments = parser.parse_args()
+
+    if arguments.cases < 1 or min(arguments.paths) < 1:
+        parser.error("--cases and --paths must be at least 1")
+
+    if arguments.max_stations < 2:
+        parser.error("--max-stations must be at least 2")
+
+    return arguments
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    times, failures = run(arguments.cases, arguments.families, arguments.max_stations, arguments.paths,
+                          arguments.seed, arguments.structures, arguments.output, arguments.modes)
+
+    names = [REFERENCE] + [variant_name(*variant) for variant in variants(arguments.structures, arguments.modes)]
+    print("%-10s " % "family" + " ".join("%22s" % name for name in names))
+    for family in arguments.families:
+        print("%-10s " % family + " ".join("%21.2fx" % (times[family][REFERENCE] / max(times[family][name], 1e-9))
+                                           for name in names))
+
+    for name, failure in failures.items():
+        number_of_stations, connections, pairs = failure["case"]
+        print("MISMATCH %s on %d cases, k=%d, shrunk to %d stations, %d connections and %d pairs" %
+              (name, failure["count"], failure["k"], number_of_stations, len(connections), len(pairs)))
+
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,216 @@
+#-*- coding: utf-8 -*-
+
+
+import math
+import random
+
+
+def station_name(station):
+    """
+    The name of a generated station.
+
+    Args:
+        station (int): the number of the station.
+
+    Returns:
+        str: the name of the station.
+    """
+
+    return "Station %d" % station
+
+
+def grid_network(number_of_stations, rng):
+    """
+    Generates a grid network, where each station is connected to the stations to its right and below it. The grid has
+    as many columns as the square root of the number of stations, rounded up, and its last row may be incomplete.
+
+    Args:
+        number_of_stations (int): the number of stations of the network.
+        rng (Random): the random number generator of the times.
+
+    Yields:
+        list: for each station, in order, the numbers of the stations it is connected to and the times of the
+              connections, as 2-element tuples.
+    """
+
+    columns = math.isqrt(max(0, number_of_stations - 1)) + 1
+
+    for station in range(number_of_stations):
+        connections = []
+
+        if station % columns + 1 < columns and station + 1 < number_of_stations:
+            connections.append((station + 1, rng.randint(1, 9)))
+        if station + columns < number_of_stations:
+            connections.append((station + columns, rng.randint(1, 9)))
+
+        yield connections
+
+
+def geometric_network(number_of_stations, rng, average_degree=6):
+    """
+    Generates a random geometric network, where the stations are placed uniformly at random in a unit square and
+    connected to every station closer than a radius chosen for the given average number of connections per station.
+    The times are proportional to the distances. Nearby stations are found through a grid of cells as wide as the
+    radius.
+
+    Args:
+        number_of_stations (int): the number of stations of the network.
+        rng (Random): the random number generator of the positions.
+        average_degree (int, optional): the expected number of connections per station. Defaults to 6.
+
+    Yields:
+        list: for each station, in order, the numbers of the stations it is connected to and the times of the
+              connections, as 2-element tuples.
+    """
+
+    radius = min(1.0, math.sqrt(average_degree / (math.pi * max(1, number_of_stations))))
+    cells_per_side = max(1, int(1 / radius))
+    positions = [(rng.random(), rng.random()) for _ in range(number_of_stations)]
+    cells = {}
+
+    for station, (x, y) in enumerate(positions):
+        cells.setdefault((int(x * cells_per_side), int(y * cells_per_side)), []).append(station)
+
+    for station, (x, y) in enumerate(positions):
+        cell_x, cell_y = int(x * cells_per_side), int(y * cells_per_side)
+        connections = []
+
+        for neighbor_x in range(cell_x - 1, cell_x + 2):
+            for neighbor_y in range(cell_y - 1, cell_y + 2):
+                for neighbor in cells.get((neighbor_x, neighbor_y), ()):
+                    if neighbor > station:
+                        distance = math.dist(positions[station], positions[neighbor])
+                        if distance < radius:
+                            connections.append((neighbor, 1 + int(10 * distance / radius)))
+
+        yield sorted(connections)
+
+
+def scale_free_network(number_of_stations, rng, connections_per_station=2):
+    """
+    Generates a scale-free network by preferential attachment (the Barabási-Albert model): each new station is
+    connected to a few of the previous stations, chosen with a probability proportional to their number of
+    connections, so that a few hub stations gather many connections.
+
+    Args:
+        number_of_stations (int): the number of stations of the network.
+        rng (Random): the random number generator of the connections and times.
+        connections_per_station (int, optional): the number of connections of each new station. Defaults to 2.
+
+    Yields:
+        list: for each station, in order, the numbers of the stations it is connected to and the times of the
+              connections, as 2-element tuples.
+    """
+
+    endpoints = []
+
+    for station in range(number_of_stations):
+        if station <= connections_per_station:
+            targets = set(range(station))
+        else:
+            targets = set()
+            while len(targets) < connections_per_station:
+                targets.add(rng.choice(endpoints))
+
+        connections = [(target, rng.randint(1, 20)) for target in sorted(targets)]
+
+        for target in targets:
+            endpoints.append(target)
+            endpoints.append(station)
+
+        yield connections
+
+
+def road_network(number_of_stations, rng, highway_spacing=8, closed_fraction=0.15):
+    """
+    Generates a road-like network: a grid of local roads, some of which are missing, crossed every few rows and
+    columns by highways whose connections are much faster.
+
+    Args:
+        number_of_stations (int): the number of stations of the network.
+        rng (Random): the random number generator of the missing roads and times.
+        highway_spacing (int, optional): the number of rows and columns between highways. Defaults to 8.
+        closed_fraction (float, optional): the fraction of local roads that are missing. Defaults to 0.15.
+
+    Yields:
+        list: for each station, in order, the numbers of the stations it is connected to and the times of the
+              connections, as 2-element tuples.
+    """
+
+    columns = math.isqrt(max(0, number_of_stations - 1)) + 1
+
+    for station in range(number_of_stations):
+        row, column = divmod(station, columns)
+        connections = []
+
+        for neighbor, highway in ((station + 1, row % highway_spacing == 0),
+                                  (station + columns, column % highway_spacing == 0)):
+            if neighbor >= number_of_stations or (neighbor == station + 1 and column + 1 == columns):
+                continue
+
+            if highway:
+                connections.append((neighbor, 1))
+            elif rng.random() >= closed_fraction:
+                connections.append((neighbor, rng.randint(3, 12)))
+
+        yield connections
+
+
+GENERATORS = {
+    "grid": grid_network,
+    "geometric": geometric_network,
+    "scale-free": scale_free_network,
+    "road": road_network,
+}
+
+
+def write_network(network_file, family, number_of_stations, seed):
+    """
+    Writes a generated network to a file, in the format of the network files of the fastest-path-finder tool. The same
+    family, number of stations and seed always give the same file.
+
+    Args:
+        network_file (str): the name of the file to write.
+        family (str): the family of the network, one of the keys of GENERATORS.
+        number_of_stations (int): the number of stations of the network.
+        seed (int): the seed of the random number generator.
+
+    Returns:
+        int: the number of connections of the network.
+
+    Raises:
+        KeyError: if the family is not one of the keys of GENERATORS.
+    """
+
+    generator = GENERATORS[family]
+    rng = random.Random("%s-%d-%d" % (family, number_of_stations, seed))
+    number_of_connections = 0
+
+    with open(network_file, "w", encoding="utf-8") as out_file:
+        out_file.write("#Id, Name, Connected:\n")
+
+        for station, connections in enumerate(generator(number_of_stations, rng)):
+            out_file.write("S%d, %s, [%s]\n" % (station, station_name(station),
+                                                ", ".join("(S%d, %d)" % connection for connection in connections)))
+            number_of_connections += len(connections)
+
+    return number_of_connections
+
+
+def write_stations(stations_file, number_of_stations, number_of_pairs, seed):
+    """
+    Writes a stations file with random pairs of distinct stations of a generated network.
+
+    Args:
+        stations_file (str): the name of the file to write.
+        number_of_stations (int): the number of stations of the network, at least 2.
+        number_of_pairs (int): the number of pairs of stations.
+        seed (int): the seed of the random number generator.
+    """
+
+    rng = random.Random("stations-%d-%d" % (number_of_stations, seed))
+
+    with open(stations_file, "w", encoding="utf-8") as out_file:
+        for _ in range(number_of_pairs):
+            start, end = rng.sample(range(number_of_stations), 2)
+            out_file.write("%s - %s\n" % (station_name(start), station_name(end)))
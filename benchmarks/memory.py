@@ -0,0 +1,154 @@
+#-*- coding: utf-8 -*-
+
+
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+
+from benchmarks.generators import write_network
+from classes.Network import Network
+
+
+# Script that measures a network file with the Network class of another checkout of the tool, given as its first
+# argument, and prints the same numbers as measure
+MEASURE_SCRIPT = """
+import sys, tracemalloc
+sys.path.insert(0, sys.argv[1])
+from classes.Network import Network
+tracemalloc.start()
+network = Network(sys.argv[2])
+print(*tracemalloc.get_traced_memory())
+"""
+
+
+def measure(network_file):
+    """
+    Measures the memory held by a network constructed from a file, with its connections kept as objects, and the
+    largest amount of memory used while it is constructed.
+
+    Args:
+        network_file (str): the file containing the network data.
+
+    Returns:
+        tuple: the number of bytes allocated by the network that are still in use once it is constructed, and the
+               largest number of bytes in use during its construction.
+    """
+
+    tracemalloc.start()
+    network = Network(network_file)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del network
+    return size, peak
+
+
+def measure_baseline(baseline_directory, network_file):
+    """
+    Measures, like measure, the memory of a network constructed from a file by the Network class of another checkout
+    of the tool, such as one from before the model classes used __slots__ and interned times. The network is
+    constructed in a separate process, so that the classes of both checkouts are not mixed.
+
+    Args:
+        baseline_directory (str): the root directory of the other checkout.
+        network_file (str): the file containing the network data.
+
+    Returns:
+        tuple: the number of bytes allocated by the network that are still in use once it is constructed, and the
+               largest number of bytes in use during its construction.
+    """
+
+    output = subprocess.run([sys.executable, "-c", MEASURE_SCRIPT, os.path.abspath(baseline_directory), network_file],
+                            capture_output=True, text=True, check=True).stdout
+    size, peak = output.split()
+
+    return int(size), int(peak)
+
+
+def bytes_per_item(measure_network, number_of_stations, number_of_connections, network_file, stations_file):
+    """
+    The bytes held per station and per connection by a network, and the bytes used per connection while it is
+    constructed. The stations are measured on a copy of the network without connections, and the connections by the
+    difference between both networks.
+
+    Args:
+        measure_network (function): the function measuring the memory of a network constructed from a file.
+        number_of_stations (int): the number of stations of the network.
+        number_of_connections (int): the number of connections of the network.
+        network_file (str): the file containing the network data.
+        stations_file (str): the file containing the stations of the network without their connections.
+
+    Returns:
+        tuple: the bytes held per station, the bytes held per connection and the bytes used per connection during
+               the construction.
+    """
+
+    stations_size, stations_peak = measure_network(stations_file)
+    network_size, network_peak = measure_network(network_file)
+
+    return (stations_size / number_of_stations, (network_size - stations_size) / number_of_connections,
+            (network_peak - stations_peak) / number_of_connections)
+
+
+def run(side, baseline_directory=None):
+    """
+    Measures the bytes held per station and per connection by a grid network, and the bytes used per connection while
+    it is constructed, which include the connections buffered until the whole file is read. When a baseline checkout
+    is given, the same numbers are measured with its Network class for comparison.
+
+    Args:
+        side (int): the number of stations on each side of the grid.
+        baseline_directory (str, optional): the root directory of another checkout of the tool to compare with.
+                                            Defaults to None.
+
+    Returns:
+        dict: the number of stations and connections, the bytes held per station and per connection, and the bytes
+              used per connection during the construction, together with the same bytes for the baseline checkout
+              when one is given.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        network_file = os.path.join(directory, "grid.txt")
+        stations_file = os.path.join(directory, "stations.txt")
+
+        number_of_stations = side * side
+        number_of_connections = write_network(network_file, "grid", number_of_stations, 0)
+
+        with open(network_file, encoding="utf-8") as in_file, open(stations_file, "w", encoding="utf-8") as out_file:
+            for line in in_file:
+                out_file.write(line.split("[")[0] + "[]\n" if "[" in line else line)
+
+        results = {"stations": number_of_stations, "connections": number_of_connections}
+        results["bytes_per_station"], results["bytes_per_connection"], results["peak_bytes_per_connection"] = \
+            bytes_per_item(measure, number_of_stations, number_of_connections, network_file, stations_file)
+
+        if baseline_directory is not None:
+            results["baseline_bytes_per_station"], results["baseline_bytes_per_connection"], \
+                results["baseline_peak_bytes_per_connection"] = \
+                bytes_per_item(lambda file: measure_baseline(baseline_directory, file), number_of_stations,
+                               number_of_connections, network_file, stations_file)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measures the memory held per station and per connection by a network.")
+    parser.add_argument("--side", type=int, default=200, metavar="N",
+                        help="the number of stations on each side of the grid network that is measured")
+    parser.add_argument("--baseline", metavar="DIR",
+                        help="the root directory of another checkout of the tool whose memory is measured for comparison")
+    arguments = parser.parse_args()
+
+    results = run(arguments.side, arguments.baseline)
+    print("%d stations, %d connections" % (results["stations"], results["connections"]))
+
+    for key, label in (("bytes_per_station", "bytes per station"), ("bytes_per_connection", "bytes per connection"),
+                       ("peak_bytes_per_connection", "bytes per connection while loading")):
+        if arguments.baseline is None:
+            print("%.1f %s" % (results[key], label))
+        else:
+            print("%.1f %s (baseline %.1f, %.2fx)" % (results[key], label, results["baseline_" + key],
+                                                      results[key] / results["baseline_" + key]))
@@ -0,0 +1,207 @@
+#-*- coding: utf-8 -*-
+
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from benchmarks.generators import GENERATORS, write_network, write_stations
+from classes.Network import Network
+from classes.Search import Search
+
+from constants import NUMBER_OF_FASTEST_PATHS, NUMBER_OF_WORKERS, BENCHMARK_PHASES, BENCHMARK_TOLERANCE, \
+    BENCHMARK_MINIMUM_DIFFERENCE
+
+
+def run_case(family, number_of_stations, number_of_pairs, seed, k, workers, repeat, directory):
+    """
+    Times the phases of a run of the fastest-path-finder tool on a generated network: loading the network file,
+    resolving the names of the stations file, searching the fastest paths and writing the results. The network is
+    parsed from its file, without a snapshot, and each phase keeps its fastest time over the repetitions.
+
+    Args:
+        family (str): the family of the network, one of the keys of GENERATORS.
+        number_of_stations (int): the number of stations of the network.
+        number_of_pairs (int): the number of pairs of stations of the stations file.
+        seed (int): the seed of the network and stations file.
+        k (int): the number of fastest paths of each pair of stations.
+        workers (int): the number of worker processes of the search.
+        repeat (int): the number of times each phase is timed.
+        directory (str): the directory where the network, stations and results files are written.
+
+    Returns:
+        dict: the description of the case and the time, in seconds, of each phase.
+    """
+
+    network_file = os.path.join(directory, "%s-%d.txt" % (family, number_of_stations))
+    stations_file = os.path.join(directory, "%s-%d-stations.txt" % (family, number_of_stations))
+
+    number_of_connections = write_network(network_file, family, number_of_stations, seed)
+    write_stations(stations_file, number_of_stations, number_of_pairs, seed)
+
+    times = {phase: float("inf") for phase in BENCHMARK_PHASES}
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        network = Network(network_file, compact=True)
+        load = time.perf_counter()
+        search = Search(stations_file, network, k)
+        resolution = time.perf_counter()
+        search.search(workers)
+        searched = time.perf_counter()
+        search.write_results("results.txt", directory)
+        written = time.perf_counter()
+
+        for phase, duration in zip(BENCHMARK_PHASES, (load - start, resolution - load, searched - resolution,
+                                                      written - searched)):
+            times[phase] = min(times[phase], duration)
+
+    return {"family": family, "stations": number_of_stations, "connections": number_of_connections,
+            "pairs": number_of_pairs, "k": k, "workers": workers, "times": times}
+
+
+def run(families, sizes, number_of_pairs, seed=0, k=NUMBER_OF_FASTEST_PATHS, workers=NUMBER_OF_WORKERS, repeat=1):
+    """
+    Runs the benchmark of every family of networks at every size.
+
+    Args:
+        families (list): the families of the networks, keys of GENERATORS.
+        sizes (list): the numbers of stations of the networks.
+        number_of_pairs (int): the number of pairs of stations searched in each network.
+        seed (int, optional): the seed of the networks and stations files. Defaults to 0.
+        k (int, optional): the number of fastest paths of each pair of stations. Defaults to NUMBER_OF_FASTEST_PATHS.
+        workers (int, optional): the number of worker processes of the search. Defaults to NUMBER_OF_WORKERS.
+        repeat (int, optional): the number of times each phase is timed. Defaults to 1.
+
+    Returns:
+        dict: the environment and settings of the benchmark, and the results of each case.
+    """
+
+    cases = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for family in families:
+            for number_of_stations in sizes:
+                case = run_case(family, number_of_stations, number_of_pairs, seed, k, workers, repeat, directory)
+                cases.append(case)
+                print("%-10s %8d stations %9d connections  " % (family, number_of_stations, case["connections"]) +
+                      "  ".join("%s %.3fs" % (phase, case["times"][phase]) for phase in BENCHMARK_PHASES),
+                      flush=True)
+
+    return {"python": platform.python_version(), "seed": seed, "repeat": repeat, "cases": cases}
+
+
+def case_key(case):
+    """
+    The key that matches a case with the same case of another benchmark.
+
+    Args:
+        case (dict): a case of a benchmark.
+
+    Returns:
+        tuple: the family, number of stations, number of pairs, number of fastest paths and number of workers.
+    """
+
+    return case["family"], case["stations"], case["pairs"], case["k"], case["workers"]
+
+
+def find_regressions(results, baseline, tolerance=BENCHMARK_TOLERANCE, minimum_difference=BENCHMARK_MINIMUM_DIFFERENCE):
+    """
+    Compares the results of a benchmark with a baseline. A phase regresses when it is slower than in the same case of
+    the baseline by more than the tolerance, and by more than a minimum difference that ignores the noise of very fast
+    phases. Cases that are not in the baseline are not compared.
+
+    Args:
+        results (dict): the results of the benchmark, as returned by run.
+        baseline (dict): the results of an earlier benchmark, as returned by run.
+        tolerance (float, optional): the relative slowdown allowed. Defaults to BENCHMARK_TOLERANCE.
+        minimum_difference (float, optional): the slowdown, in seconds, below which a phase never regresses. Defaults
+                                              to BENCHMARK_MINIMUM_DIFFERENCE.
+
+    Returns:
+        list: a dictionary for each regression, with its case, phase and times.
+    """
+
+    baseline_cases = {case_key(case): case for case in baseline["cases"]}
+    regressions = []
+
+    for case in results["cases"]:
+        baseline_case = baseline_cases.get(case_key(case))
+        if baseline_case is None:
+            continue
+
+        for phase in BENCHMARK_PHASES:
+            current, previous = case["times"][phase], baseline_case["times"].get(phase)
+            if previous is None:
+                continue
+
+            if current > previous * (1 + tolerance) and current - previous > minimum_difference:
+                regressions.append({"family": case["family"], "stations": case["stations"], "phase": phase,
+                                    "baseline": previous, "current": current})
+
+    return regressions
+
+
+def parse_arguments():
+    """
+    Parses the command line arguments of the benchmark runner.
+
+    Returns:
+        Namespace: the parsed arguments.
+    """
+
+    parser = ArgumentParser(description="Times the phases of the fastest-path-finder tool on generated networks.")
+    parser.add_argument("--families", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS),
+                        help="the families of the generated networks")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000], metavar="N",
+                        help="the numbers of stations of the generated networks")
+    parser.add_argument("--pairs", type=int, default=100, metavar="P",
+                        help="the number of pairs of stations searched in each network")
+    parser.add_argument("--paths", type=int, default=NUMBER_OF_FASTEST_PATHS, metavar="K",
+                        help="the number of fastest paths of each pair of stations")
+    parser.add_argument("--workers", type=int, default=NUMBER_OF_WORKERS, metavar="N",
+                        help="the number of worker processes of the search")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the generated networks and stations files")
+    parser.add_argument("--repeat", type=int, default=1, metavar="R",
+                        help="the number of times each phase is timed, keeping the fastest time")
+    parser.add_argument("--output", metavar="FILE", help="the JSON file to which the results are written")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="a JSON file of earlier results, against which regressions are reported")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                        help="the relative slowdown of a phase allowed before it is reported as a regression")
+
+    arguments = parser.parse_args()
+
+    if min(arguments.sizes) < 2:
+        parser.error("--sizes must be at least 2")
+
+    if arguments.pairs < 1 or arguments.paths < 1 or arguments.workers < 1 or arguments.repeat < 1:
+        parser.error("--pairs, --paths, --workers and --repeat must be at least 1")
+
+    return arguments
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    results = run(arguments.families, arguments.sizes, arguments.pairs, arguments.seed, arguments.paths,
+                  arguments.workers, arguments.repeat)
+
+    if arguments.output is not None:
+        with open(arguments.output, "w", encoding="utf-8") as out_file:
+            json.dump(results, out_file, indent=2)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline, encoding="utf-8") as in_file:
+            regressions = find_regressions(results, json.load(in_file), arguments.tolerance)
+
+        for regression in regressions:
+            print("REGRESSION %s %d stations, %s: %.3fs -> %.3fs" % (regression["family"], regression["stations"],
+                                                                    regression["phase"], regression["baseline"],
+                                                                    regression["current"]))
+
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,467 @@
+#-*- coding: utf-8 -*-
+
+
+import heapq
+from array import array
+from collections import deque
+
+from constants import UNREACHABLE_TIME
+
+
+class CompactGraph:
+    """
+    A class to represent the connections of a network in compressed sparse row form. The stations are numbered from 0
+    to V-1 and the connections of the station numbered i are the entries offsets[i] to offsets[i+1]-1 of the targets
+    (numbers of the destination stations) and weights (times in minutes) arrays, in the order of the network connections.
+    """
+
+    def __init__(self, stations, offsets, targets, weights):
+        """
+        Initializes a new CompactGraph.
+
+        Args:
+            stations (list): the stations of the graph, where the position of each station is its number, or None when
+                             only the numbers of the stations are needed.
+            offsets (array): the V+1 offsets of the connections of each station in the targets and weights arrays.
+            targets (array): the number of the destination station of each connection.
+            weights (array): the time, in minutes, of each connection.
+        """
+
+        self._stations = stations
+        self._indexes = {station: index for index, station in enumerate(stations or ())}
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self._twins = None
+
+
+    @classmethod
+    def from_network(cls, network):
+        """
+        Builds a new CompactGraph from the connections of a network.
+
+        Args:
+            network (Network): the network whose connections are to be compacted.
+
+        Returns:
+            CompactGraph: the compact graph of the given network.
+        """
+
+        stations = list(network.get_stations())
+        indexes = {station: index for index, station in enumerate(stations)}
+        connections = network.get_connections()
+
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('q')
+
+        for station in stations:
+            for destination, time in connections[station]:
+                targets.append(indexes[destination])
+                weights.append(time.get_minutes())
+            offsets.append(len(targets))
+
+        return cls(stations, offsets, targets, weights)
+
+
+    def get_stations(self):
+        """
+        The stations of the current CompactGraph instance.
+
+        Returns:
+            list: the list of stations of the current CompactGraph instance, indexed by their number.
+        """
+
+        return self._stations
+
+
+    def get_offsets(self):
+        """
+        The offsets of the connections of each station of the current CompactGraph instance.
+
+        Returns:
+            array: the V+1 offsets of the connections of each station in the targets and weights arrays.
+        """
+
+        return self._offsets
+
+
+    def get_targets(self):
+        """
+        The destination stations of the connections of the current CompactGraph instance.
+
+        Returns:
+            array: the number of the destination station of each connection.
+        """
+
+        return self._targets
+
+
+    def get_weights(self):
+        """
+        The times of the connections of the current CompactGraph instance.
+
+        Returns:
+            array: the time, in minutes, of each connection.
+        """
+
+        return self._weights
+
+
+    def get_twins(self):
+        """
+        The twin of each connection of the current CompactGraph instance, that is, the same undirected connection taken
+        in the opposite direction. The twins are computed when first needed.
+
+        Returns:
+            array: the number of the twin of each connection.
+        """
+
+        if self._twins is None:
+            offsets, targets = self._offsets, self._targets
+            twins = array('q', [0]) * len(targets)
+            unpaired = {}
+
+            for source in range(self.number_of_stations()):
+                for edge in range(offsets[source], offsets[source + 1]):
+                    destination = targets[edge]
+                    waiting = unpaired.get((destination, source))
+
+                    if waiting:
+                        twin = waiting.popleft()
+                        twins[edge] = twin
+                        twins[twin] = edge
+                    else:
+                        unpaired.setdefault((source, destination), deque()).append(edge)
+
+            self._twins = twins
+
+        return self._twins
+
+
+    def number_of_stations(self):
+        """
+        The number of stations of the current CompactGraph instance.
+
+        Returns:
+            int: the number of stations of the current CompactGraph instance.
+        """
+
+        return len(self._offsets) - 1
+
+
+    def number_of_connections(self):
+        """
+        The number of connections of the current CompactGraph instance, where each undirected connection is counted
+        once in each direction.
+
+        Returns:
+            int: the number of connections of the current CompactGraph instance.
+        """
+
+        return len(self._targets)
+
+
+    def index_of(self, station):
+        """
+        The number of a station in the current CompactGraph instance.
+
+        Args:
+            station (Station): the station whose number is to be retrieved.
+
+        Returns:
+            int: the number of the given station.
+
+        Raises:
+            KeyError: if the given station is not in the current CompactGraph instance.
+        """
+
+        return self._indexes[station]
+
+
+    def station_of(self, index):
+        """
+        The station with a given number in the current CompactGraph instance.
+
+        Args:
+            index (int): the number of the station.
+
+        Returns:
+            Station: the station with the given number.
+        """
+
+        return self._stations[index]
+
+
+    def children_of(self, index):
+        """
+        The connections originating from the station with the given number.
+
+        Args:
+            index (int): the number of the station whose outgoing connections are to be retrieved.
+
+        Returns:
+            tuple: a 2-element tuple containing:
+                - targets (array): the numbers of the destination stations of the connections.
+                - weights (array): the times, in minutes, of the connections.
+        """
+
+        start, end = self._offsets[index], self._offsets[index + 1]
+
+        return self._targets[start:end], self._weights[start:end]
+
+
+    def distances_from(self, source, excluded=()):
+        """
+        Computes the time of the fastest path from the given station to every station reachable from it, using
+        Dijkstra's algorithm.
+
+        Args:
+            source (int): the number of the station from where the times are computed.
+            excluded (set, optional): the numbers of the stations that cannot be part of a path. Defaults to an empty
+                                      tuple.
+
+        Returns:
+            dict: a dictionary mapping the number of each reachable station to the time (in minutes) of its fastest path.
+        """
+
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        distances = {source: 0}
+        heap = [(0, source)]
+
+        while heap:
+            distance, current = heapq.heappop(heap)
+            if distance > distances[current]:
+                continue
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[edge]
+                if neighbor in excluded:
+                    continue
+
+                new_distance = distance + weights[edge]
+                if new_distance < distances.get(neighbor, new_distance + 1):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
+
+        return distances
+
+
+    def connection_time(self, first, second):
+        """
+        The time of the fastest connection between two stations of the current CompactGraph instance.
+
+        Args:
+            first (int): the number of the first station.
+            second (int): the number of the second station.
+
+        Returns:
+            int: the time, in minutes, of the fastest connection between the two stations, or None if they are not
+                 directly connected.
+        """
+
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        times = [weights[edge] for edge in range(offsets[first], offsets[first + 1]) if targets[edge] == second]
+
+        return min(times) if times else None
+
+
+    def make_writable(self):
+        """
+        Copies the arrays of the current CompactGraph instance that are memory-mapped from a snapshot, so that its
+        connections can be changed in place.
+        """
+
+        if not isinstance(self._offsets, array):
+            self._offsets = array('q', self._offsets)
+            self._targets = array('q', self._targets)
+            self._weights = array('q', self._weights)
+
+
+    def set_connection_time(self, first, second, time):
+        """
+        Sets the time of every connection between two stations of the current CompactGraph instance, in both
+        directions.
+
+        Args:
+            first (int): the number of the first station.
+            second (int): the number of the second station.
+            time (int): the time, in minutes, to set for the connections.
+        """
+
+        self.make_writable()
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+
+        for source, destination in ((first, second), (second, first)):
+            for edge in range(offsets[source], offsets[source + 1]):
+                if targets[edge] == destination:
+                    weights[edge] = time
+
+
+    def remove_connection(self, first, second, time):
+        """
+        Removes a connection between two stations of the current CompactGraph instance, that is, the first connection
+        with the given time from each station to the other one. The remaining connections keep their order. Since the
+        connections that follow are moved back and the offsets of every later station are shifted, each removal takes
+        O(V + E) time, where V is the number of stations and E the number of connections.
+
+        Args:
+            first (int): the number of the first station.
+            second (int): the number of the second station.
+            time (int): the time, in minutes, of the connection to be removed.
+
+        Returns:
+            bool:
+                - True if the connection was removed.
+                - False if there is no such connection.
+        """
+
+        self.make_writable()
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        edges = []
+
+        for source, destination in ((first, second), (second, first)):
+            edge = next((edge for edge in range(offsets[source], offsets[source + 1])
+                         if targets[edge] == destination and weights[edge] == time and edge not in edges), None)
+            if edge is None:
+                return False
+            edges.append(edge)
+
+        for edge in sorted(edges, reverse=True):
+            del targets[edge]
+            del weights[edge]
+
+            for station in range(1, len(offsets)):
+                if offsets[station] > edge:
+                    offsets[station] -= 1
+
+        self._twins = None
+
+        return True
+
+
+    def connected(self, first, second):
+        """
+        Checks whether there is a path between two stations of the current CompactGraph instance. Breadth-first searches
+        are grown from both stations in turn, so that when there is no path the search stops after visiting about twice
+        the stations of the smaller side.
+
+        Args:
+            first (int): the number of the first station.
+            second (int): the number of the second station.
+
+        Returns:
+            bool:
+                - True if the two stations are connected by a path.
+                - False otherwise.
+        """
+
+        if first == second:
+            return True
+
+        offsets, targets = self._offsets, self._targets
+        visited = ({first}, {second})
+        queues = (deque([first]), deque([second]))
+
+        while True:
+            for side in (0, 1):
+                if not queues[side]:
+                    return False
+
+                current = queues[side].popleft()
+
+                for edge in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[edge]
+                    if neighbor in visited[1 - side]:
+                        return True
+                    if neighbor not in visited[side]:
+                        visited[side].add(neighbor)
+                        queues[side].append(neighbor)
+
+
+    def repair_distances(self, times, row, source, first, second, old_time):
+        """
+        Repairs in place the times of the fastest paths from a station to every station, after the time of the fastest
+        connection between two stations changed. Only the stations whose times may have changed are visited: when the
+        connection became faster, the new times are propagated from its stations as by Dijkstra's algorithm; when it
+        became slower or was removed, the stations reached through it by fastest paths are computed again from their
+        other neighbors.
+
+        Args:
+            times (array): the times, in minutes, where the time to the station numbered j is at position row+j, and
+                           UNREACHABLE_TIME is held for the stations that cannot be reached.
+            row (int): the position of the time to the station numbered 0.
+            source (int): the number of the station from where the times are computed.
+            first (int): the number of the first station of the connection that changed.
+            second (int): the number of the second station of the connection that changed.
+            old_time (int): the time, in minutes, of the fastest connection between the two stations before it changed.
+        """
+
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        new_time = self.connection_time(first, second)
+
+        if new_time == old_time:
+            return
+
+        heap = []
+        affected = None
+
+        if new_time is not None and new_time < old_time:
+            for start, end in ((first, second), (second, first)):
+                if times[row + start] == UNREACHABLE_TIME:
+                    continue
+
+                time = times[row + start] + new_time
+                if times[row + end] == UNREACHABLE_TIME or time < times[row + end]:
+                    times[row + end] = time
+                    heapq.heappush(heap, (time, end))
+        else:
+            affected = set()
+
+            for start, end in ((first, second), (second, first)):
+                if end != source and times[row + start] != UNREACHABLE_TIME and \
+                        times[row + start] + old_time == times[row + end]:
+                    affected.add(end)
+
+            stack = list(affected)
+
+            while stack:
+                current = stack.pop()
+
+                for edge in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[edge]
+                    if neighbor not in affected and neighbor != source and \
+                            times[row + neighbor] == times[row + current] + weights[edge]:
+                        affected.add(neighbor)
+                        stack.append(neighbor)
+
+            for station in affected:
+                times[row + station] = UNREACHABLE_TIME
+
+            for station in affected:
+                for edge in range(offsets[station], offsets[station + 1]):
+                    neighbor = targets[edge]
+                    if neighbor in affected or times[row + neighbor] == UNREACHABLE_TIME:
+                        continue
+
+                    time = times[row + neighbor] + weights[edge]
+                    if times[row + station] == UNREACHABLE_TIME or time < times[row + station]:
+                        times[row + station] = time
+
+                if times[row + station] != UNREACHABLE_TIME:
+                    heapq.heappush(heap, (times[row + station], station))
+
+        while heap:
+            time, current = heapq.heappop(heap)
+            if time != times[row + current]:
+                continue
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[edge]
+                if affected is not None and neighbor not in affected:
+                    continue
+
+                new_distance = time + weights[edge]
+                if times[row + neighbor] == UNREACHABLE_TIME or new_distance < times[row + neighbor]:
+                    times[row + neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
@@ -0,0 +1,128 @@
+#-*- coding: utf-8 -*-
+
+
+class ComponentIndex:
+    """
+    A class to represent the connected components of a network as a union-find structure, with union by size and path
+    halving, so that checking whether two stations communicate takes almost constant time. Components can only grow:
+    connections are merged into the index as they are added.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new, empty ComponentIndex.
+
+        Attributes:
+            parents (dict): the parent of each station in its component tree, where the root represents the component.
+            sizes (dict): the number of stations of the component of each root station.
+            number_of_components (int): the number of components.
+        """
+
+        self._parents = {}
+        self._sizes = {}
+        self._number_of_components = 0
+
+
+    def get_number_of_components(self):
+        """
+        The number of components of the current ComponentIndex instance.
+
+        Returns:
+            int: the number of components of the current ComponentIndex instance.
+        """
+
+        return self._number_of_components
+
+
+    def add(self, station):
+        """
+        Adds a station to the current ComponentIndex instance, as a component of its own.
+
+        Args:
+            station (Station): the station to be added.
+        """
+
+        if station not in self._parents:
+            self._parents[station] = station
+            self._sizes[station] = 1
+            self._number_of_components += 1
+
+
+    def find(self, station):
+        """
+        The root station of the component of a station.
+
+        Args:
+            station (Station): the station whose component is to be found.
+
+        Returns:
+            Station: the root station of the component of the given station.
+
+        Raises:
+            KeyError: if the given station is not in the current ComponentIndex instance.
+        """
+
+        parents = self._parents
+
+        while parents[station] is not station:
+            parents[station] = parents[parents[station]]
+            station = parents[station]
+
+        return station
+
+
+    def union(self, first_station, second_station):
+        """
+        Merges the components of two stations.
+
+        Args:
+            first_station (Station): a station of the first component.
+            second_station (Station): a station of the second component.
+
+        Raises:
+            KeyError: if either station is not in the current ComponentIndex instance.
+        """
+
+        first_root = self.find(first_station)
+        second_root = self.find(second_station)
+
+        if first_root is second_root:
+            return
+
+        if self._sizes[first_root] < self._sizes[second_root]:
+            first_root, second_root = second_root, first_root
+
+        self._parents[second_root] = first_root
+        self._sizes[first_root] += self._sizes.pop(second_root)
+        self._number_of_components -= 1
+
+
+    def connected(self, first_station, second_station):
+        """
+        Checks whether two stations are in the same component.
+
+        Args:
+            first_station (Station): the first station.
+            second_station (Station): the second station.
+
+        Returns:
+            bool:
+                - True if both stations are in the same component.
+                - False otherwise.
+
+        Raises:
+            KeyError: if either station is not in the current ComponentIndex instance.
+        """
+
+        return self.find(first_station) is self.find(second_station)
+
+
+    def largest_component_size(self):
+        """
+        The number of stations of the largest component of the current ComponentIndex instance.
+
+        Returns:
+            int: the number of stations of the largest component, or 0 if there are no stations.
+        """
+
+        return max(self._sizes.values(), default=0)
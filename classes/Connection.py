@@ -5,6 +5,8 @@ class Connection:
     """
     A class to represent a connection.
     """
+
+    __slots__ = ("_source", "_destination", "_time")
     
     def __init__(self, source, destination, time):
         """
@@ -114,6 +116,9 @@ class Connection:
                 - False otherwise.
         """
         
+        if self is other_connection:
+            return True
+
         return self.get_source() == other_connection.get_source() and \
             self.get_destination() == other_connection.get_destination() and self.get_time() == other_connection.get_time()
 
@@ -0,0 +1,415 @@
+#-*- coding: utf-8 -*-
+
+
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from constants import CONTRACTION_HIERARCHY_MAGIC, CONTRACTION_HIERARCHY_VERSION, CONTRACTION_HIERARCHY_HEADER_FORMAT, \
+    WITNESS_SEARCH_LIMIT
+
+
+class ContractionHierarchy:
+    """
+    A class to represent a contraction hierarchy of a compact graph. The stations are contracted one at a time, in the
+    order of their rank, and a shortcut is added between two neighbors of a contracted station whenever the path through
+    it may be the only fastest one. Each station keeps only its upward connections, that is, the original connections
+    and shortcuts to stations of higher rank, so that a fastest path is found by two small searches that only move
+    upwards and meet at its highest station.
+
+    The upward connections are stored in compressed sparse row form, like in CompactGraph. Only their times are kept,
+    since the hierarchy is only used for the times of fastest paths: the paths themselves are found on the compact
+    graph, where ties are broken as the depth-first search breaks them.
+    """
+
+    def __init__(self, ranks, offsets, targets, weights):
+        """
+        Initializes a new ContractionHierarchy.
+
+        Args:
+            ranks (array): the rank of each station, that is, its position in the contraction order.
+            offsets (array): the V+1 offsets of the upward connections of each station.
+            targets (array): the number of the destination station of each upward connection.
+            weights (array): the time, in minutes, of each upward connection.
+        """
+
+        self._ranks = ranks
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Builds the contraction hierarchy of a compact graph. The next station to contract is the one with the smallest
+        edge difference (the number of shortcuts its contraction adds minus the number of its connections) plus the
+        number of its neighbors already contracted, which is updated lazily.
+
+        Args:
+            graph (CompactGraph): the compact graph whose contraction hierarchy is to be built.
+
+        Returns:
+            ContractionHierarchy: the contraction hierarchy of the given graph.
+        """
+
+        number_of_stations = graph.number_of_stations()
+        offsets, targets, weights = graph.get_offsets(), graph.get_targets(), graph.get_weights()
+
+        neighbors = [{} for _ in range(number_of_stations)]
+        for source in range(number_of_stations):
+            for edge in range(offsets[source], offsets[source + 1]):
+                destination = targets[edge]
+                if destination != source and weights[edge] < neighbors[source].get(destination, weights[edge] + 1):
+                    neighbors[source][destination] = weights[edge]
+
+        contracted_neighbors = [0] * number_of_stations
+        heap = [(cls.priority(neighbors, contracted_neighbors, station), station) for station in range(number_of_stations)]
+        heapq.heapify(heap)
+
+        ranks = array('q', [0]) * number_of_stations
+        upward = [None] * number_of_stations
+        rank = 0
+
+        while heap:
+            _, station = heapq.heappop(heap)
+            priority = cls.priority(neighbors, contracted_neighbors, station)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, station))
+                continue
+
+            for first, second, time in cls.shortcuts(neighbors, station):
+                if time < neighbors[first].get(second, time + 1):
+                    neighbors[first][second] = time
+                    neighbors[second][first] = time
+
+            for neighbor in neighbors[station]:
+                del neighbors[neighbor][station]
+                contracted_neighbors[neighbor] += 1
+
+            upward[station] = neighbors[station]
+            neighbors[station] = None
+            ranks[station] = rank
+            rank += 1
+
+        upward_offsets = array('q', [0])
+        upward_targets = array('q')
+        upward_weights = array('q')
+
+        for station in range(number_of_stations):
+            for neighbor, time in upward[station].items():
+                upward_targets.append(neighbor)
+                upward_weights.append(time)
+            upward_offsets.append(len(upward_targets))
+
+        return cls(ranks, upward_offsets, upward_targets, upward_weights)
+
+
+    @staticmethod
+    def witness_times(neighbors, source, contracted, limit):
+        """
+        Runs Dijkstra's algorithm from a station over the stations not yet contracted, avoiding the station being
+        contracted. The search stops at the given time or after WITNESS_SEARCH_LIMIT stations, so the times found are
+        upper bounds of the fastest times.
+
+        Args:
+            neighbors (list): the neighbors not yet contracted of each station, with the time of the connection to
+                              each of them.
+            source (int): the number of the station where the search starts.
+            contracted (int): the number of the station being contracted.
+            limit (int): the time after which the search stops.
+
+        Returns:
+            dict: a dictionary mapping the number of each station reached to the time of the fastest path found to it.
+        """
+
+        times = {source: 0}
+        heap = [(0, source)]
+        settled = 0
+
+        while heap and settled < WITNESS_SEARCH_LIMIT:
+            time, station = heapq.heappop(heap)
+            if time > limit:
+                break
+            if time > times[station]:
+                continue
+            settled += 1
+
+            for neighbor, connection_time in neighbors[station].items():
+                if neighbor == contracted:
+                    continue
+
+                new_time = time + connection_time
+                if new_time < times.get(neighbor, new_time + 1):
+                    times[neighbor] = new_time
+                    heapq.heappush(heap, (new_time, neighbor))
+
+        return times
+
+
+    @classmethod
+    def shortcuts(cls, neighbors, station):
+        """
+        The shortcuts needed to contract a station: one for each pair of its neighbors for which no path avoiding the
+        station, as fast as the path through it, is found.
+
+        Args:
+            neighbors (list): the neighbors not yet contracted of each station, with the time of the connection to
+                              each of them.
+            station (int): the number of the station to contract.
+
+        Returns:
+            list: a list of 3-element tuples with the numbers of the two neighbors and the time of the shortcut.
+        """
+
+        adjacent = list(neighbors[station].items())
+        shortcuts = []
+
+        for i, (first, first_time) in enumerate(adjacent):
+            via_times = {second: first_time + second_time for second, second_time in adjacent[i + 1:]}
+            if not via_times:
+                continue
+
+            witness_times = cls.witness_times(neighbors, first, station, max(via_times.values()))
+            for second, via_time in via_times.items():
+                if witness_times.get(second, via_time + 1) > via_time:
+                    shortcuts.append((first, second, via_time))
+
+        return shortcuts
+
+
+    @classmethod
+    def priority(cls, neighbors, contracted_neighbors, station):
+        """
+        The priority of a station in the contraction order, where stations with a smaller priority are contracted first.
+
+        Args:
+            neighbors (list): the neighbors not yet contracted of each station, with the time of the connection to
+                              each of them.
+            contracted_neighbors (list): the number of neighbors of each station already contracted.
+            station (int): the number of the station.
+
+        Returns:
+            int: the edge difference of the station plus the number of its neighbors already contracted.
+        """
+
+        return len(cls.shortcuts(neighbors, station)) - len(neighbors[station]) + contracted_neighbors[station]
+
+
+    def get_ranks(self):
+        """
+        The ranks of the stations of the current ContractionHierarchy instance.
+
+        Returns:
+            array: the rank of each station, that is, its position in the contraction order.
+        """
+
+        return self._ranks
+
+
+    def get_offsets(self):
+        """
+        The offsets of the upward connections of each station of the current ContractionHierarchy instance.
+
+        Returns:
+            array: the V+1 offsets of the upward connections of each station.
+        """
+
+        return self._offsets
+
+
+    def get_targets(self):
+        """
+        The destination stations of the upward connections of the current ContractionHierarchy instance.
+
+        Returns:
+            array: the number of the destination station of each upward connection.
+        """
+
+        return self._targets
+
+
+    def get_weights(self):
+        """
+        The times of the upward connections of the current ContractionHierarchy instance.
+
+        Returns:
+            array: the time, in minutes, of each upward connection.
+        """
+
+        return self._weights
+
+
+    def number_of_stations(self):
+        """
+        The number of stations of the current ContractionHierarchy instance.
+
+        Returns:
+            int: the number of stations of the current ContractionHierarchy instance.
+        """
+
+        return len(self._ranks)
+
+
+    def upward_search(self, source, bound=None):
+        """
+        Runs Dijkstra's algorithm from a station over the upward connections.
+
+        Args:
+            source (int): the number of the station where the search starts.
+            bound (function, optional): a function that receives each station reached and its time, in the order in
+                                        which they are settled, and returns the time from which the search stops.
+                                        Defaults to None.
+
+        Returns:
+            dict: the time of the fastest upward path from the source station to each station reached.
+        """
+
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        times = {source: 0}
+        heap = [(0, source)]
+
+        while heap:
+            time, station = heapq.heappop(heap)
+            if time > times[station]:
+                continue
+            if bound is not None and time >= bound(station, time):
+                break
+
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbor = targets[edge]
+                new_time = time + weights[edge]
+                if new_time < times.get(neighbor, new_time + 1):
+                    times[neighbor] = new_time
+                    heapq.heappush(heap, (new_time, neighbor))
+
+        return times
+
+
+    def remaining_time_to(self, end):
+        """
+        Builds a function that returns the time of the fastest path from any station to the given end station. The
+        upward search from the end station is run once, and each station then only needs its own upward search, which
+        stops as soon as it cannot improve the best time found. The times are remembered once computed.
+
+        Args:
+            end (int): the number of the station where the paths end.
+
+        Returns:
+            function: a function that receives the number of a station and returns the time (in minutes) of its fastest
+                      path to the end station, or None if there is no such path.
+        """
+
+        end_times = self.upward_search(end)
+        remaining_times = {}
+
+        def remaining_time(station):
+            if station not in remaining_times:
+                best = [None]
+
+                def bound(reached, time):
+                    if reached in end_times and (best[0] is None or time + end_times[reached] < best[0]):
+                        best[0] = time + end_times[reached]
+                    return time + 1 if best[0] is None else best[0]
+
+                self.upward_search(station, bound)
+                remaining_times[station] = best[0]
+
+            return remaining_times[station]
+
+        return remaining_time
+
+
+    def time_between(self, start, end):
+        """
+        The time of the fastest path between two stations.
+
+        Args:
+            start (int): the number of the station where the path starts.
+            end (int): the number of the station where the path ends.
+
+        Returns:
+            int: the time, in minutes, of the fastest path between the two stations, or None if they do not communicate.
+        """
+
+        return self.remaining_time_to(end)(start)
+
+
+    def save(self, hierarchy_file, source_hash):
+        """
+        Writes the current ContractionHierarchy instance to a binary file, keyed by the content hash of the network file
+        it was built from. The file is replaced atomically.
+
+        Args:
+            hierarchy_file (str): the name of the file to write.
+            source_hash (bytes): the SHA-256 digest of the contents of the network file.
+        """
+
+        header = struct.pack(CONTRACTION_HIERARCHY_HEADER_FORMAT, CONTRACTION_HIERARCHY_MAGIC,
+                             CONTRACTION_HIERARCHY_VERSION, sys.byteorder == "little", source_hash,
+                             self.number_of_stations(), len(self.get_targets()))
+
+        temporary_file = hierarchy_file + ".tmp"
+
+        with open(temporary_file, "wb") as out_file:
+            out_file.write(header)
+            for section in (self.get_ranks(), self.get_offsets(), self.get_targets(), self.get_weights()):
+                out_file.write(section.tobytes())
+
+        os.replace(temporary_file, hierarchy_file)
+
+
+    @classmethod
+    def load(cls, hierarchy_file, source_hash, number_of_stations):
+        """
+        Reads a contraction hierarchy from a binary file, if the file exists, has the current format version and was
+        written for the given contents of the network file. The arrays are memory-mapped instead of being read.
+
+        Args:
+            hierarchy_file (str): the name of the file to read.
+            source_hash (bytes): the SHA-256 digest of the contents of the network file.
+            number_of_stations (int): the number of stations of the network.
+
+        Returns:
+            ContractionHierarchy: the contraction hierarchy read from the file, or None if the file cannot be used.
+        """
+
+        header_size = struct.calcsize(CONTRACTION_HIERARCHY_HEADER_FORMAT)
+
+        try:
+            with open(hierarchy_file, "rb") as in_file:
+                header = in_file.read(header_size)
+                if len(header) < header_size:
+                    return None
+
+                magic, version, little_endian, file_hash, file_number_of_stations, number_of_connections = \
+                    struct.unpack(CONTRACTION_HIERARCHY_HEADER_FORMAT, header)
+
+                if magic != CONTRACTION_HIERARCHY_MAGIC or version != CONTRACTION_HIERARCHY_VERSION or \
+                        little_endian != (sys.byteorder == "little"):
+                    return None
+
+                if file_hash != source_hash or file_number_of_stations != number_of_stations:
+                    return None
+
+                contents = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return None
+
+        item_size = array('q').itemsize
+
+        if len(contents) != header_size + item_size * (2 * number_of_stations + 1 + 2 * number_of_connections):
+            contents.close()
+            return None
+
+        sections = []
+        position = header_size
+
+        for count in (number_of_stations, number_of_stations + 1, number_of_connections, number_of_connections):
+            sections.append(memoryview(contents)[position:position + count * item_size].cast('q'))
+            position += count * item_size
+
+        return cls(*sections)
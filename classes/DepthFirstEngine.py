@@ -0,0 +1,83 @@
+#-*- coding: utf-8 -*-
+
+
+from classes.SearchEngine import SearchEngine
+
+from constants import NUMBER_OF_WORKERS, AUTO_DEPTH_FIRST_MAX_STATIONS
+
+
+class DepthFirstEngine(SearchEngine):
+    """
+    A class that represents the search engine based on the exhaustive depth-first search of the Search class, which is
+    the reference for the other engines. It searches the pairs of stations one at a time, in the current process, so it
+    cannot use several worker processes, and is only chosen automatically for very small networks, where it is as fast
+    as Yen's algorithm.
+    """
+
+    name = 'dfs'
+    preference = 1
+
+    @classmethod
+    def suitable(cls, statistics, k):
+        """
+        Checks whether the depth-first search is suitable for a network, that is, whether its largest component has at
+        most AUTO_DEPTH_FIRST_MAX_STATIONS stations and more than one path is requested.
+
+        Args:
+            statistics (dict): the statistics of the network, as returned by SearchEngine.network_statistics.
+            k (int): the number of fastest paths requested.
+
+        Returns:
+            bool:
+                - True if the depth-first search may be chosen for the network.
+                - False otherwise.
+        """
+
+        return k > 1 and statistics["largest_component"] <= AUTO_DEPTH_FIRST_MAX_STATIONS
+
+
+    def search(self, search, workers=NUMBER_OF_WORKERS):
+        """
+        Finds the k fastest paths of the pairs of stations of a Search with Search.seeded_depth_first_search. A pair
+        repeated in the stations file is searched once.
+
+        Args:
+            search (Search): the search whose pairs of stations are searched.
+            workers (int, optional): ignored, since the pairs of stations are searched in the current process. Defaults
+                                     to NUMBER_OF_WORKERS.
+        """
+
+        results = {}
+
+        for start, end in search.get_in_network_stations():
+            if (start, end) not in results:
+                results[(start, end)] = self.search_station_pair(search, start, end)
+
+            search.get_search_results().append(results[(start, end)])
+
+
+    def search_station_pair(self, search, start, end):
+        """
+        Finds the k fastest paths between two stations with Search.seeded_depth_first_search, recording the work of the
+        search when the Search has statistics.
+
+        Args:
+            search (Search): the search that the pair of stations belongs to.
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+
+        Returns:
+            list: the sorted list of fastest paths between the two stations.
+        """
+
+        stats = search.get_stats()
+
+        if stats is not None:
+            stats.begin(start, end)
+
+        fastest_paths = search.seeded_depth_first_search(start, end)
+
+        if stats is not None:
+            stats.end()
+
+        return fastest_paths
@@ -0,0 +1,232 @@
+#-*- coding: utf-8 -*-
+
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from constants import DISTANCE_MATRIX_MAGIC, DISTANCE_MATRIX_VERSION, DISTANCE_MATRIX_HEADER_FORMAT, \
+    DISTANCE_MATRIX_BLOCK_SIZE, UNREACHABLE_TIME
+
+
+class DistanceMatrix:
+    """
+    A class to represent the times of the fastest paths between all the pairs of stations of a compact graph, stored as
+    a dense VxV matrix in row-major order so that the time between any two stations is read in constant time. Pairs of
+    stations that do not communicate hold UNREACHABLE_TIME.
+    """
+
+    def __init__(self, number_of_stations, times):
+        """
+        Initializes a new DistanceMatrix.
+
+        Args:
+            number_of_stations (int): the number of stations V of the matrix.
+            times (array): the VxV times, in minutes, of the fastest paths, where the time from the station numbered i
+                           to the station numbered j is at position i*V+j.
+        """
+
+        self._number_of_stations = number_of_stations
+        self._times = times
+
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Computes the distance matrix of a compact graph. The Floyd-Warshall algorithm is run with vectorized NumPy
+        operations when NumPy is installed; otherwise Dijkstra's algorithm is run from every station.
+
+        Args:
+            graph (CompactGraph): the compact graph whose distance matrix is to be computed.
+
+        Returns:
+            DistanceMatrix: the distance matrix of the given graph.
+        """
+
+        if numpy is not None:
+            return cls(graph.number_of_stations(), cls.floyd_warshall(graph))
+
+        number_of_stations = graph.number_of_stations()
+        times = array('q', [UNREACHABLE_TIME]) * (number_of_stations * number_of_stations)
+
+        for source in range(number_of_stations):
+            row = source * number_of_stations
+            for destination, time in graph.distances_from(source).items():
+                times[row + destination] = time
+
+        return cls(number_of_stations, times)
+
+
+    @staticmethod
+    def floyd_warshall(graph):
+        """
+        Runs the Floyd-Warshall algorithm on a compact graph with NumPy. Each intermediate station relaxes the matrix
+        one block of rows at a time, which bounds the size of the temporary arrays.
+
+        Args:
+            graph (CompactGraph): the compact graph whose distance matrix is to be computed.
+
+        Returns:
+            array: the VxV times of the fastest paths, in row-major order.
+        """
+
+        number_of_stations = graph.number_of_stations()
+        infinity = numpy.iinfo(numpy.int64).max // 2
+
+        offsets = numpy.asarray(graph.get_offsets(), dtype=numpy.int64)
+        sources = numpy.repeat(numpy.arange(number_of_stations, dtype=numpy.int64), numpy.diff(offsets))
+        targets = numpy.asarray(graph.get_targets(), dtype=numpy.int64)
+        weights = numpy.asarray(graph.get_weights(), dtype=numpy.int64)
+
+        times = numpy.full((number_of_stations, number_of_stations), infinity, dtype=numpy.int64)
+        numpy.minimum.at(times, (sources, targets), weights)
+        numpy.fill_diagonal(times, 0)
+
+        for middle in range(number_of_stations):
+            middle_row = times[middle]
+            for block in range(0, number_of_stations, DISTANCE_MATRIX_BLOCK_SIZE):
+                rows = times[block:block + DISTANCE_MATRIX_BLOCK_SIZE]
+                numpy.minimum(rows, rows[:, middle, None] + middle_row, out=rows)
+
+        times[times >= infinity] = UNREACHABLE_TIME
+
+        result = array('q')
+        result.frombytes(times.tobytes())
+
+        return result
+
+
+    def get_number_of_stations(self):
+        """
+        The number of stations of the current DistanceMatrix instance.
+
+        Returns:
+            int: the number of stations V of the current DistanceMatrix instance.
+        """
+
+        return self._number_of_stations
+
+
+    def get_times(self):
+        """
+        The times of the current DistanceMatrix instance.
+
+        Returns:
+            array: the VxV times, in minutes, of the fastest paths, in row-major order.
+        """
+
+        return self._times
+
+
+    def time_between(self, start, end):
+        """
+        The time of the fastest path between two stations.
+
+        Args:
+            start (int): the number of the station where the path starts.
+            end (int): the number of the station where the path ends.
+
+        Returns:
+            int: the time, in minutes, of the fastest path between the two stations, or None if they do not communicate.
+        """
+
+        time = self._times[start * self._number_of_stations + end]
+
+        return None if time == UNREACHABLE_TIME else time
+
+
+    def repair(self, graph, first, second, old_time):
+        """
+        Repairs the current DistanceMatrix instance after the time of the fastest connection between two stations of its
+        graph changed. Each row holds the fastest path tree of one station and is repaired in place, visiting only the
+        stations whose times may have changed.
+
+        Args:
+            graph (CompactGraph): the compact graph of the matrix, with the connection already changed.
+            first (int): the number of the first station of the connection that changed.
+            second (int): the number of the second station of the connection that changed.
+            old_time (int): the time, in minutes, of the fastest connection between the two stations before it changed.
+        """
+
+        if not isinstance(self._times, array):
+            self._times = array('q', self._times)
+
+        number_of_stations = self.get_number_of_stations()
+
+        for source in range(number_of_stations):
+            graph.repair_distances(self._times, source * number_of_stations, source, first, second, old_time)
+
+
+    def save(self, matrix_file, source_hash):
+        """
+        Writes the current DistanceMatrix instance to a binary file, keyed by the content hash of the network file it
+        was computed from. The file is replaced atomically.
+
+        Args:
+            matrix_file (str): the name of the file to write.
+            source_hash (bytes): the SHA-256 digest of the contents of the network file.
+        """
+
+        header = struct.pack(DISTANCE_MATRIX_HEADER_FORMAT, DISTANCE_MATRIX_MAGIC, DISTANCE_MATRIX_VERSION,
+                             sys.byteorder == "little", source_hash, self.get_number_of_stations())
+
+        temporary_file = matrix_file + ".tmp"
+
+        with open(temporary_file, "wb") as out_file:
+            out_file.write(header)
+            out_file.write(self.get_times().tobytes())
+
+        os.replace(temporary_file, matrix_file)
+
+
+    @classmethod
+    def load(cls, matrix_file, source_hash, number_of_stations):
+        """
+        Reads a distance matrix from a binary file, if the file exists, has the current format version and was written
+        for the given contents of the network file. The times are memory-mapped instead of being read.
+
+        Args:
+            matrix_file (str): the name of the file to read.
+            source_hash (bytes): the SHA-256 digest of the contents of the network file.
+            number_of_stations (int): the number of stations of the network.
+
+        Returns:
+            DistanceMatrix: the distance matrix read from the file, or None if the file cannot be used.
+        """
+
+        header_size = struct.calcsize(DISTANCE_MATRIX_HEADER_FORMAT)
+
+        try:
+            with open(matrix_file, "rb") as in_file:
+                header = in_file.read(header_size)
+                if len(header) < header_size:
+                    return None
+
+                magic, version, little_endian, file_hash, file_number_of_stations = \
+                    struct.unpack(DISTANCE_MATRIX_HEADER_FORMAT, header)
+
+                if magic != DISTANCE_MATRIX_MAGIC or version != DISTANCE_MATRIX_VERSION or \
+                        little_endian != (sys.byteorder == "little"):
+                    return None
+
+                if file_hash != source_hash or file_number_of_stations != number_of_stations:
+                    return None
+
+                contents = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return None
+
+        item_size = array('q').itemsize
+
+        if len(contents) != header_size + item_size * number_of_stations * number_of_stations:
+            contents.close()
+            return None
+
+        return cls(number_of_stations, memoryview(contents)[header_size:].cast('q'))
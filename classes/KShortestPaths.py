@@ -0,0 +1,652 @@
+#-*- coding: utf-8 -*-
+
+
+import heapq
+
+
+class KShortestPaths:
+    """
+    A class that finds the k fastest loopless paths between two stations of a network, using Yen's algorithm.
+
+    The search runs on the compact graph of the network. Paths are generated by increasing time and, for equal times,
+    in the order in which the depth-first search of the Search class would reach them (which is the order of their
+    connection numbers), so that the selection made by Search.update_fastest_paths is reproduced exactly.
+
+    When there is a SearchStats instance, each search adds the stations it expanded and the connections it relaxed to
+    the pair of stations begun last, and Yen's algorithm adds the candidate paths it pruned, slower than the k-th
+    fastest path.
+
+    When there is a SearchBudget instance, the stations expanded are spent from it, and Yen's algorithm stops looking
+    for further paths once it is exhausted. The first path is always found, so that a search that runs out of budget
+    still has the fastest path.
+    """
+
+    def __init__(self, network, stats=None, budget=None):
+        """
+        Initializes a new KShortestPaths.
+
+        Args:
+            network (Network): the network where the paths are to be found.
+            stats (SearchStats, optional): the statistics to which the work of the searches is added. Defaults to None.
+            budget (SearchBudget, optional): the budget of the search of each pair of stations. Defaults to None.
+        """
+
+        self._network = network
+        self._stats = stats
+        self._budget = budget
+
+
+    def get_network(self):
+        """
+        The network of the current KShortestPaths instance.
+
+        Returns:
+            Network: the network of the current KShortestPaths instance.
+        """
+
+        return self._network
+
+
+    def set_network(self, network):
+        """
+        Sets the network of the current KShortestPaths instance.
+
+        Args:
+            network (Network): the network to set for the current KShortestPaths instance.
+        """
+
+        self._network = network
+
+
+    def get_stats(self):
+        """
+        The statistics of the current KShortestPaths instance.
+
+        Returns:
+            SearchStats: the statistics to which the work of the searches is added, or None if it is not recorded.
+        """
+
+        return self._stats
+
+
+    def set_stats(self, stats):
+        """
+        Sets the statistics of the current KShortestPaths instance.
+
+        Args:
+            stats (SearchStats): the statistics to which the work of the searches is added, or None to stop recording it.
+        """
+
+        self._stats = stats
+
+
+    def get_budget(self):
+        """
+        The budget of the current KShortestPaths instance.
+
+        Returns:
+            SearchBudget: the budget of the search of each pair of stations, or None if it is not bounded.
+        """
+
+        return self._budget
+
+
+    def set_budget(self, budget):
+        """
+        Sets the budget of the current KShortestPaths instance.
+
+        Args:
+            budget (SearchBudget): the budget of the search of each pair of stations, or None to not bound it.
+        """
+
+        self._budget = budget
+
+
+    def contraction_hierarchy(self):
+        """
+        The contraction hierarchy of the network of the current KShortestPaths instance.
+
+        Returns:
+            ContractionHierarchy: the contraction hierarchy of the network, or None if there is no network or it has no
+                                  contraction hierarchy.
+        """
+
+        if self.get_network() is None:
+            return None
+
+        return self.get_network().get_contraction_hierarchy()
+
+
+    def landmark_index(self):
+        """
+        The landmark index of the network of the current KShortestPaths instance.
+
+        Returns:
+            LandmarkIndex: the landmark index of the network, or None if there is no network or it has no landmark
+                           index.
+        """
+
+        if self.get_network() is None:
+            return None
+
+        return self.get_network().get_landmark_index()
+
+
+    def tight_path(self, graph, spur, end, remaining_time, removed):
+        """
+        Finds, among the paths between the spur and end stations whose every connection is tight (that is, its time
+        plus the remaining time of its destination equals the remaining time of its source), the first one reached by a
+        depth-first search.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            spur (int): the number of the station where the path starts.
+            end (int): the number of the station where the path ends.
+            remaining_time (function): a function that receives the number of a station and returns its remaining time
+                                       to the end station, or None if the station cannot be part of the path.
+            removed (set): the connections, leaving the spur station, that cannot be taken.
+
+        Returns:
+            tuple: a 3-element tuple containing:
+                - time (int): the time of the path.
+                - connections (tuple): the connections taken, numbered as in the compact graph.
+                - stations (tuple): the numbers of the stations of the path, starting with the spur station.
+            None if there is no such path.
+        """
+
+        offsets, targets, weights = graph.get_offsets(), graph.get_targets(), graph.get_weights()
+
+        edges = []
+        stations = [spur]
+        on_path = {spur}
+        stack = [(spur, offsets[spur])]
+        nodes_expanded = edges_relaxed = 0
+        path = None
+
+        while stack:
+            station, first_edge = stack.pop()
+            if station == end:
+                path = remaining_time(spur), tuple(edges), tuple(stations)
+                break
+
+            station_time = remaining_time(station)
+            nodes_expanded += 1
+
+            for edge in range(first_edge, offsets[station + 1]):
+                neighbor = targets[edge]
+                if neighbor in on_path or edge in removed:
+                    continue
+                neighbor_time = remaining_time(neighbor)
+                if neighbor_time is not None and weights[edge] + neighbor_time == station_time:
+                    stack.append((station, edge + 1))
+                    stack.append((neighbor, offsets[neighbor]))
+                    edges.append(edge)
+                    stations.append(neighbor)
+                    on_path.add(neighbor)
+                    edges_relaxed += edge + 1 - first_edge
+                    break
+            else:
+                edges_relaxed += offsets[station + 1] - first_edge
+                if station != spur:
+                    edges.pop()
+                    on_path.discard(stations.pop())
+
+        if self._stats is not None:
+            self._stats.count(nodes_expanded, edges_relaxed)
+        if self._budget is not None:
+            self._budget.spend(nodes_expanded)
+
+        return path
+
+
+    def spur_path(self, graph, spur, end, root, removed):
+        """
+        Finds the fastest path between the spur and end stations that avoids the stations of the root path and leaves
+        the spur station through none of the removed connections. Among equally fast paths, the one that is reached
+        first by a depth-first search is chosen. The search from the end station stops as soon as the time of the spur
+        station is known, so that only the stations closer to the end station than the spur station are visited. When
+        the network has a landmark index, the search is an A* search guided by its lower bounds on the time to the spur
+        station, which only visits the stations whose time plus bound does not exceed the time of the spur station.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            spur (int): the number of the station where the path starts.
+            end (int): the number of the station where the path ends.
+            root (tuple): the numbers of the stations of the root path that precede the spur station.
+            removed (set): the connections, leaving the spur station, that cannot be taken.
+
+        Returns:
+            tuple: the time, connections and stations of the path, as returned by tight_path, or None if there is no
+                   such path.
+        """
+
+        if spur == end:
+            return 0, (), (spur,)
+
+        offsets, targets, weights = graph.get_offsets(), graph.get_targets(), graph.get_weights()
+
+        excluded = set(root)
+        excluded.add(spur)
+
+        spur_neighbors = {}
+        for edge in range(offsets[spur], offsets[spur + 1]):
+            neighbor = targets[edge]
+            if edge not in removed and neighbor not in excluded:
+                spur_neighbors[neighbor] = min(weights[edge], spur_neighbors.get(neighbor, weights[edge]))
+
+        if not spur_neighbors:
+            return None
+
+        landmark_index = self.landmark_index()
+        lower_bound = landmark_index.lower_bound_to(spur) if landmark_index is not None else lambda station: 0
+
+        end_bound = lower_bound(end)
+        if end_bound is None:
+            return None
+
+        distances = {end: 0}
+        heap = [(end_bound, 0, end)]
+        spur_time = None
+        nodes_expanded = edges_relaxed = 0
+
+        while heap:
+            estimate, distance, station = heapq.heappop(heap)
+            if spur_time is not None and estimate > spur_time:
+                break
+            if distance > distances[station]:
+                continue
+
+            nodes_expanded += 1
+            edges_relaxed += offsets[station + 1] - offsets[station]
+
+            if station in spur_neighbors and (spur_time is None or distance + spur_neighbors[station] < spur_time):
+                spur_time = distance + spur_neighbors[station]
+
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbor = targets[edge]
+                if neighbor in excluded:
+                    continue
+
+                new_distance = distance + weights[edge]
+                if new_distance < distances.get(neighbor, new_distance + 1):
+                    bound = lower_bound(neighbor)
+                    if bound is not None:
+                        distances[neighbor] = new_distance
+                        heapq.heappush(heap, (new_distance + bound, new_distance, neighbor))
+
+        if self._stats is not None:
+            self._stats.count(nodes_expanded, edges_relaxed)
+        if self._budget is not None:
+            self._budget.spend(nodes_expanded)
+
+        if spur_time is None:
+            return None
+
+        distances[spur] = spur_time
+
+        return self.tight_path(graph, spur, end, distances.get, removed)
+
+
+    def first_path(self, graph, start, end, tree):
+        """
+        Finds the fastest path between two stations from the times of the fastest paths from the start station to all
+        the others. Among equally fast paths, the one that is reached first by a depth-first search is chosen.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            start (int): the number of the station where the path starts.
+            end (int): the number of the station where the path ends.
+            tree (dict): the time of the fastest path from the start station to each station reachable from it, as
+                         returned by CompactGraph.distances_from.
+
+        Returns:
+            tuple: the time, connections and stations of the path, as returned by tight_path, or None if there is no
+                   such path.
+        """
+
+        if end not in tree:
+            return None
+
+        if start == end:
+            return 0, (), (start,)
+
+        offsets, targets, weights = graph.get_offsets(), graph.get_targets(), graph.get_weights()
+
+        fastest_time = tree[end]
+        distances = {end: 0}
+        stack = [end]
+        nodes_expanded = edges_relaxed = 0
+
+        while stack:
+            station = stack.pop()
+            nodes_expanded += 1
+            edges_relaxed += offsets[station + 1] - offsets[station]
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbor = targets[edge]
+                if neighbor not in distances and neighbor in tree and tree[neighbor] + weights[edge] == tree[station]:
+                    distances[neighbor] = fastest_time - tree[neighbor]
+                    stack.append(neighbor)
+
+        if self._stats is not None:
+            self._stats.count(nodes_expanded, edges_relaxed)
+        if self._budget is not None:
+            self._budget.spend(nodes_expanded)
+
+        return self.tight_path(graph, start, end, distances.get, ())
+
+
+    def bidirectional_path(self, graph, start, end):
+        """
+        Finds the fastest path between two stations with a bidirectional Dijkstra search, which grows one search from
+        each station and stops once the sum of the times at the top of both heaps exceeds the time of the fastest path
+        found, or one of the heaps is empty, so that only the stations within about half of that time from either
+        station are visited. Among equally fast paths, the one that is reached first by a depth-first search is chosen.
+
+        Every station of a fastest path is settled by one of the two searches, since its times from both stations add up
+        to less than the two heap tops. The stations of the fastest paths are found from the stations where both
+        searches meet, and their remaining times to the end station then guide tight_path.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            start (int): the number of the station where the path starts.
+            end (int): the number of the station where the path ends.
+
+        Returns:
+            tuple: the time, connections and stations of the path, as returned by tight_path, or None if there is no
+                   such path.
+        """
+
+        if start == end:
+            return 0, (), (start,)
+
+        offsets, targets, weights = graph.get_offsets(), graph.get_targets(), graph.get_weights()
+
+        times = ({start: 0}, {end: 0})
+        settled = ({}, {})
+        heaps = ([(0, start)], [(0, end)])
+        fastest_time = None
+        nodes_expanded = edges_relaxed = 0
+
+        while heaps[0] and heaps[1]:
+            if fastest_time is not None and heaps[0][0][0] + heaps[1][0][0] > fastest_time:
+                break
+
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            time, station = heapq.heappop(heaps[side])
+            if station in settled[side]:
+                continue
+            settled[side][station] = time
+            nodes_expanded += 1
+            edges_relaxed += offsets[station + 1] - offsets[station]
+
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbor = targets[edge]
+                new_time = time + weights[edge]
+
+                if neighbor in times[1 - side]:
+                    meeting_time = new_time + times[1 - side][neighbor]
+                    if fastest_time is None or meeting_time < fastest_time:
+                        fastest_time = meeting_time
+
+                if neighbor not in settled[side] and new_time < times[side].get(neighbor, new_time + 1):
+                    times[side][neighbor] = new_time
+                    heapq.heappush(heaps[side], (new_time, neighbor))
+
+        if self._stats is not None:
+            self._stats.count(nodes_expanded, edges_relaxed)
+        if self._budget is not None:
+            self._budget.spend(nodes_expanded)
+
+        if fastest_time is None:
+            return None
+
+        forward, backward = settled
+        forward.setdefault(start, 0)
+        backward.setdefault(end, 0)
+        remaining_times = {}
+        stack = []
+
+        for station, time in forward.items():
+            if station in backward and time + backward[station] == fastest_time:
+                remaining_times[station] = backward[station]
+                stack.append(station)
+
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbor = targets[edge]
+                if neighbor in backward and time + weights[edge] + backward[neighbor] == fastest_time:
+                    for fastest_station, remaining_time in ((station, fastest_time - time), (neighbor, backward[neighbor])):
+                        if fastest_station not in remaining_times:
+                            remaining_times[fastest_station] = remaining_time
+                            stack.append(fastest_station)
+
+        while stack:
+            station = stack.pop()
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbor = targets[edge]
+                if neighbor in remaining_times:
+                    continue
+
+                if station in forward and neighbor in forward and forward[neighbor] + weights[edge] == forward[station]:
+                    remaining_times[neighbor] = fastest_time - forward[neighbor]
+                    stack.append(neighbor)
+                elif station in backward and neighbor in backward and \
+                        backward[neighbor] + weights[edge] == backward[station]:
+                    remaining_times[neighbor] = backward[neighbor]
+                    stack.append(neighbor)
+
+        return self.tight_path(graph, start, end, remaining_times.get, ())
+
+
+    def hierarchy_path(self, graph, start, end, hierarchy):
+        """
+        Finds the fastest path between two stations, using a contraction hierarchy for the remaining time of each
+        station to the end station. Among equally fast paths, the one that is reached first by a depth-first search is
+        chosen, which is not necessarily the path found by the hierarchy itself.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            start (int): the number of the station where the path starts.
+            end (int): the number of the station where the path ends.
+            hierarchy (ContractionHierarchy): the contraction hierarchy of the compact graph.
+
+        Returns:
+            tuple: the time, connections and stations of the path, as returned by tight_path, or None if there is no
+                   such path.
+        """
+
+        remaining_time = hierarchy.remaining_time_to(end)
+
+        if remaining_time(start) is None:
+            return None
+
+        if start == end:
+            return 0, (), (start,)
+
+        return self.tight_path(graph, start, end, remaining_time, ())
+
+
+    def candidate_paths(self, graph, start, end, k, tree=None):
+        """
+        Finds the paths between two stations from which the k fastest paths are selected. These are all the paths faster
+        than the k-th fastest one, together with the first k paths as fast as the k-th fastest one.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            start (int): the number of the station where the paths start.
+            end (int): the number of the station where the paths end.
+            k (int): the number of fastest paths to be selected.
+            tree (dict, optional): the time of the fastest path from the start station to each station reachable from
+                                   it, used to find the first path. When it is not provided, the first path is found
+                                   with the contraction hierarchy of the network, if there is one, and with a
+                                   bidirectional search otherwise. Defaults to None.
+
+        Returns:
+            tuple: a 2-element tuple containing:
+                - paths (list): the time, connections and stations of each path, in the order in which a depth-first
+                                search would reach them.
+                - complete (bool): whether the paths are all the paths as fast as the k-th fastest one or faster, in
+                                   which case they do not depend on the direction of the search.
+        """
+
+        weights = graph.get_weights()
+        hierarchy = self.contraction_hierarchy()
+        budget = self.get_budget()
+
+        if budget is not None:
+            budget.start((start, end))
+
+        if tree is not None:
+            first_path = self.first_path(graph, start, end, tree)
+        elif hierarchy is not None:
+            first_path = self.hierarchy_path(graph, start, end, hierarchy)
+        else:
+            first_path = self.bidirectional_path(graph, start, end)
+
+        if first_path is None:
+            return [], True
+
+        accepted = [first_path + (0,)]
+        candidates = []
+        seen = {first_path[1]}
+        complete = True
+
+        while True:
+            if len(accepted) >= k:
+                kth_time = accepted[k - 1][0]
+                if sum(1 for path in accepted if path[0] == kth_time) >= k:
+                    complete = False
+                    break
+
+            _, last_edges, last_stations, deviation = accepted[-1]
+            root_time = 0
+
+            for i in range(len(last_stations) - 1):
+                if budget is not None and budget.is_exhausted():
+                    break
+
+                if i >= deviation:
+                    removed = {path[1][i] for path in accepted if path[1][:i] == last_edges[:i]}
+                    spur = self.spur_path(graph, last_stations[i], end, last_stations[:i], removed)
+
+                    if spur is not None:
+                        edges = last_edges[:i] + spur[1]
+                        if edges not in seen:
+                            seen.add(edges)
+                            heapq.heappush(candidates, (root_time + spur[0], edges, last_stations[:i] + spur[2], i))
+
+                root_time += weights[last_edges[i]]
+
+            if budget is not None and budget.is_exhausted():
+                accepted.extend(candidates)
+                complete = False
+                break
+
+            if not candidates:
+                break
+
+            if len(accepted) >= k and candidates[0][0] > kth_time:
+                break
+
+            accepted.append(heapq.heappop(candidates))
+
+        if self._stats is not None:
+            self._stats.count(branches_pruned=len(candidates))
+
+        accepted.sort(key=lambda path: path[1])
+
+        return accepted, complete
+
+
+    def candidate_paths_from(self, graph, start, ends, k):
+        """
+        Finds the candidate paths between a start station and several end stations. When there are several end stations
+        and the network has no contraction hierarchy, the times of the fastest paths from the start station are computed
+        once for all of them, and their work is attributed to the first end station when statistics are recorded.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            start (int): the number of the station where the paths start.
+            ends (list): the numbers of the stations where the paths end.
+            k (int): the number of fastest paths to be selected.
+
+        Returns:
+            list: the paths and completeness returned by candidate_paths for each end station, in the same order.
+        """
+
+        stats = self.get_stats()
+        if stats is None:
+            tree = None
+            if len(ends) > 1 and self.contraction_hierarchy() is None:
+                tree = graph.distances_from(start)
+
+            return [self.candidate_paths(graph, start, end, k, tree) for end in ends]
+
+        offsets = graph.get_offsets()
+        tree = None
+        results = []
+
+        for i, end in enumerate(ends):
+            stats.begin(graph.station_of(start), graph.station_of(end))
+            if i == 0 and len(ends) > 1 and self.contraction_hierarchy() is None:
+                tree = graph.distances_from(start)
+                stats.count(len(tree), sum(offsets[station + 1] - offsets[station] for station in tree))
+            results.append(self.candidate_paths(graph, start, end, k, tree))
+            stats.end()
+
+        return results
+
+
+    def reverse_paths(self, graph, paths):
+        """
+        Reverses paths found by candidate_paths, so that they can serve the search in the opposite direction.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            paths (list): the time, connections and stations of each path.
+
+        Returns:
+            list: the time, connections and stations of each reversed path, in the order in which a depth-first search
+                  would reach them.
+        """
+
+        twins = graph.get_twins()
+        reversed_paths = [(path[0], tuple(twins[edge] for edge in reversed(path[1])), path[2][::-1], 0) for path in paths]
+
+        return sorted(reversed_paths, key=lambda path: path[1])
+
+
+    def to_stations(self, graph, paths):
+        """
+        Converts paths found by candidate_paths to the format used by the Search class.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            paths (list): the time, connections and stations of each path.
+
+        Returns:
+            list: a list of lists, where each inner list corresponds to a path whose first element is its time and the
+                  subsequent ones are its stations.
+        """
+
+        return [[path[0]] + [graph.station_of(index) for index in path[2]] for path in paths]
+
+
+    def find(self, start, end, k):
+        """
+        Finds the paths between two stations from which the k fastest paths are selected. These are all the paths faster
+        than the k-th fastest one, together with the first k paths as fast as the k-th fastest one.
+
+        Args:
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+            k (int): the number of fastest paths to be selected.
+
+        Returns:
+            list: a list of lists, where each inner list corresponds to a path whose first element is its time and the
+                  subsequent ones are its stations, in the order in which a depth-first search would reach them.
+        """
+
+        graph = self.get_network().get_compact_graph()
+        paths, _ = self.candidate_paths(graph, graph.index_of(start), graph.index_of(end), k)
+
+        return self.to_stations(graph, paths)
@@ -0,0 +1,280 @@
+#-*- coding: utf-8 -*-
+
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from constants import LANDMARK_INDEX_MAGIC, LANDMARK_INDEX_VERSION, LANDMARK_INDEX_HEADER_FORMAT, NUMBER_OF_LANDMARKS, \
+    UNREACHABLE_TIME
+
+
+class LandmarkIndex:
+    """
+    A class to represent the times of the fastest paths from a few landmark stations to every station of a compact
+    graph. By the triangle inequality, the time between two stations is at least the difference of their times to any
+    landmark, which gives the lower bounds used by the A* searches (the ALT technique). The times are stored as an LxV
+    matrix in row-major order, with UNREACHABLE_TIME for the stations a landmark cannot reach.
+    """
+
+    def __init__(self, number_of_stations, maximum_landmarks, landmarks, times):
+        """
+        Initializes a new LandmarkIndex.
+
+        Args:
+            number_of_stations (int): the number of stations V of the graph.
+            maximum_landmarks (int): the number of landmarks requested when the index was built.
+            landmarks (array): the numbers of the L landmark stations, which are fewer than requested when the graph has
+                               fewer stations.
+            times (array): the LxV times, in minutes, of the fastest paths, where the time from the i-th landmark to the
+                           station numbered j is at position i*V+j.
+        """
+
+        self._number_of_stations = number_of_stations
+        self._maximum_landmarks = maximum_landmarks
+        self._landmarks = landmarks
+        self._times = times
+
+
+    @classmethod
+    def from_graph(cls, graph, number_of_landmarks=NUMBER_OF_LANDMARKS):
+        """
+        Builds the landmark index of a compact graph by farthest-point selection: the first landmark is the station
+        farthest from the station numbered 0, and each following one is the station farthest from the landmarks
+        already chosen. Stations that no landmark can reach are chosen first, so that every part of a disconnected
+        network gets a landmark while there are landmarks left.
+
+        Args:
+            graph (CompactGraph): the compact graph whose landmark index is to be built.
+            number_of_landmarks (int, optional): the maximum number of landmarks. Defaults to NUMBER_OF_LANDMARKS.
+
+        Returns:
+            LandmarkIndex: the landmark index of the given graph.
+
+        Raises:
+            ValueError: If number_of_landmarks is smaller than 1, with the message 'Invalid number of landmarks'.
+        """
+
+        if number_of_landmarks < 1:
+            raise ValueError('Invalid number of landmarks')
+
+        number_of_stations = graph.number_of_stations()
+        landmarks = array('q')
+        times = array('q')
+
+        if number_of_stations == 0:
+            return cls(number_of_stations, number_of_landmarks, landmarks, times)
+
+        origin_times = graph.distances_from(0)
+        candidate = max(origin_times, key=lambda station: (origin_times[station], -station))
+        landmark_times = [None] * number_of_stations
+
+        while candidate is not None and len(landmarks) < number_of_landmarks:
+            landmarks.append(candidate)
+            row = array('q', [UNREACHABLE_TIME]) * number_of_stations
+
+            for station, time in graph.distances_from(candidate).items():
+                row[station] = time
+                if landmark_times[station] is None or time < landmark_times[station]:
+                    landmark_times[station] = time
+
+            times.extend(row)
+
+            candidate = None
+            for station in range(number_of_stations):
+                if landmark_times[station] is None:
+                    candidate = station
+                    break
+                if station not in landmarks and (candidate is None or landmark_times[station] > landmark_times[candidate]):
+                    candidate = station
+
+        return cls(number_of_stations, number_of_landmarks, landmarks, times)
+
+
+    def get_number_of_stations(self):
+        """
+        The number of stations of the current LandmarkIndex instance.
+
+        Returns:
+            int: the number of stations V of the current LandmarkIndex instance.
+        """
+
+        return self._number_of_stations
+
+
+    def get_maximum_landmarks(self):
+        """
+        The number of landmarks requested when the current LandmarkIndex instance was built.
+
+        Returns:
+            int: the number of landmarks requested when the current LandmarkIndex instance was built.
+        """
+
+        return self._maximum_landmarks
+
+
+    def get_landmarks(self):
+        """
+        The landmarks of the current LandmarkIndex instance.
+
+        Returns:
+            array: the numbers of the landmark stations.
+        """
+
+        return self._landmarks
+
+
+    def get_times(self):
+        """
+        The times of the current LandmarkIndex instance.
+
+        Returns:
+            array: the LxV times, in minutes, of the fastest paths from each landmark to each station, in row-major
+                   order.
+        """
+
+        return self._times
+
+
+    def number_of_landmarks(self):
+        """
+        The number of landmarks of the current LandmarkIndex instance.
+
+        Returns:
+            int: the number of landmarks L of the current LandmarkIndex instance.
+        """
+
+        return len(self._landmarks)
+
+
+    def lower_bound_to(self, end):
+        """
+        Builds a function that returns a lower bound on the time of the fastest path from any station to the given end
+        station. Since every connection respects these bounds, they can be used by A* searches, which then settle each
+        station only once.
+
+        Args:
+            end (int): the number of the station where the paths end.
+
+        Returns:
+            function: a function that receives the number of a station and returns a lower bound (in minutes) on the
+                      time of its fastest path to the end station, or None if a landmark shows that the station cannot
+                      reach the end station.
+        """
+
+        number_of_stations, times = self._number_of_stations, self._times
+        rows = [(row, times[row + end]) for row in range(0, len(times), number_of_stations)]
+
+        def lower_bound(station):
+            bound = 0
+
+            for row, end_time in rows:
+                station_time = times[row + station]
+                if (station_time == UNREACHABLE_TIME) != (end_time == UNREACHABLE_TIME):
+                    return None
+                if abs(station_time - end_time) > bound:
+                    bound = abs(station_time - end_time)
+
+            return bound
+
+        return lower_bound
+
+
+    def repair(self, graph, first, second, old_time):
+        """
+        Repairs the times of the current LandmarkIndex instance after the time of the fastest connection between two
+        stations of its graph changed, so that its lower bounds stay valid. The landmarks are kept.
+
+        Args:
+            graph (CompactGraph): the compact graph of the index, with the connection already changed.
+            first (int): the number of the first station of the connection that changed.
+            second (int): the number of the second station of the connection that changed.
+            old_time (int): the time, in minutes, of the fastest connection between the two stations before it changed.
+        """
+
+        if not isinstance(self._times, array):
+            self._times = array('q', self._times)
+
+        number_of_stations = self.get_number_of_stations()
+
+        for position, landmark in enumerate(self.get_landmarks()):
+            graph.repair_distances(self._times, position * number_of_stations, landmark, first, second, old_time)
+
+
+    def save(self, landmarks_file, source_hash):
+        """
+        Writes the current LandmarkIndex instance to a binary file, keyed by the content hash of the network file it was
+        built from. The file is replaced atomically.
+
+        Args:
+            landmarks_file (str): the name of the file to write.
+            source_hash (bytes): the SHA-256 digest of the contents of the network file.
+        """
+
+        header = struct.pack(LANDMARK_INDEX_HEADER_FORMAT, LANDMARK_INDEX_MAGIC, LANDMARK_INDEX_VERSION,
+                             sys.byteorder == "little", source_hash, self.get_number_of_stations(),
+                             self.get_maximum_landmarks(), self.number_of_landmarks())
+
+        temporary_file = landmarks_file + ".tmp"
+
+        with open(temporary_file, "wb") as out_file:
+            out_file.write(header)
+            out_file.write(self.get_landmarks().tobytes())
+            out_file.write(self.get_times().tobytes())
+
+        os.replace(temporary_file, landmarks_file)
+
+
+    @classmethod
+    def load(cls, landmarks_file, source_hash, number_of_stations, number_of_landmarks):
+        """
+        Reads a landmark index from a binary file, if the file exists, has the current format version and was written
+        for the given contents of the network file and number of landmarks. The times are memory-mapped instead of being
+        read.
+
+        Args:
+            landmarks_file (str): the name of the file to read.
+            source_hash (bytes): the SHA-256 digest of the contents of the network file.
+            number_of_stations (int): the number of stations of the network.
+            number_of_landmarks (int): the number of landmarks requested for the index.
+
+        Returns:
+            LandmarkIndex: the landmark index read from the file, or None if the file cannot be used.
+        """
+
+        header_size = struct.calcsize(LANDMARK_INDEX_HEADER_FORMAT)
+
+        try:
+            with open(landmarks_file, "rb") as in_file:
+                header = in_file.read(header_size)
+                if len(header) < header_size:
+                    return None
+
+                magic, version, little_endian, file_hash, file_number_of_stations, maximum_landmarks, \
+                    file_number_of_landmarks = struct.unpack(LANDMARK_INDEX_HEADER_FORMAT, header)
+
+                if magic != LANDMARK_INDEX_MAGIC or version != LANDMARK_INDEX_VERSION or \
+                        little_endian != (sys.byteorder == "little"):
+                    return None
+
+                if file_hash != source_hash or file_number_of_stations != number_of_stations or \
+                        maximum_landmarks != number_of_landmarks:
+                    return None
+
+                contents = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return None
+
+        item_size = array('q').itemsize
+        landmarks_size = item_size * file_number_of_landmarks
+
+        if len(contents) != header_size + landmarks_size * (1 + number_of_stations):
+            contents.close()
+            return None
+
+        landmarks = memoryview(contents)[header_size:header_size + landmarks_size].cast('q')
+        times = memoryview(contents)[header_size + landmarks_size:].cast('q')
+
+        return cls(number_of_stations, maximum_landmarks, landmarks, times)
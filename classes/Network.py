@@ -1,34 +1,99 @@
 #-*- coding: utf-8 -*-
 
 
+import hashlib
+import itertools
+import mmap
+import os
+import struct
+import sys
+from array import array
+
 from classes.Station import Station
 from classes.Time import Time
 from classes.Connection import Connection
+from classes.CompactGraph import CompactGraph
+from classes.ComponentIndex import ComponentIndex
+from classes.DistanceMatrix import DistanceMatrix
+from classes.ContractionHierarchy import ContractionHierarchy
+from classes.LandmarkIndex import LandmarkIndex
+
+from constants import SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SNAPSHOT_HEADER_FORMAT, NUMBER_OF_LANDMARKS, \
+    MAX_DISTANCE_MATRIX_STATIONS
 
 
 class Network:
     """
     A class to represent a network (modelled as a undirected weighted graph) in the fastest-path-finder tool.
     """
+
+    _version_counter = itertools.count(1)
     
-    def __init__(self, network_file):
+    def __init__(self, network_file, compact=False, snapshot_file=None):
         """
         Initializes a new Network.
 
         Args:
             network_file (str): the input file that contains the network data.
+            compact (bool, optional): whether the connections are kept only in a compact graph once the network is
+                                      constructed. Defaults to False.
+            snapshot_file (str, optional): a binary snapshot of the network. If it matches the contents of the network
+                                           file, the network is loaded from it (in compact form); otherwise the network
+                                           file is parsed and the snapshot is rewritten. Defaults to None.
 
         Attributes:
             network_file (str): the input file that contains the network data.
             stations (list): an empty list to store the stations.
-            connections (dictionary): an empty dictionary to store the connections between stations.
+            station_set (set): an empty set to check the membership of stations.
+            stations_by_id (dictionary): an empty dictionary to look up stations by their id.
+            stations_by_name (dictionary): an empty dictionary to look up stations by their name.
+            connections (dictionary): an empty dictionary to store the connections between stations, or None when
+                                      the connections are kept only in the compact graph.
+            compact_graph (CompactGraph): the compact graph of the connections, built when first needed.
+            components (ComponentIndex): the connected components of the network, updated as stations and connections
+                                         are added and rebuilt when a removal splits a component.
+            version (int): a number that changes whenever a station or connection is added, changed or removed, unique
+                           among all networks.
+            source_version (int): the version of the network when it was last read from its file or snapshot.
+            source_hash (bytes): the content hash of the network file, or None until it is first needed.
+            source_hash_version (int): the version of the network when its content hash was computed, which is no longer
+                                       used once the network changes.
+            distance_matrix (DistanceMatrix): the times of the fastest paths between all pairs of stations, or None
+                                              until they are precomputed.
+            contraction_hierarchy (ContractionHierarchy): the contraction hierarchy of the connections, or None until
+                                                          it is built.
+            landmark_index (LandmarkIndex): the landmark index of the connections, or None until it is built.
         """
 
         self._network_file = network_file
         self._stations = []
+        self._station_set = set()
+        self._stations_by_id = {}
+        self._stations_by_name = {}
         self._connections = {}
+        self._compact_graph = None
+        self._components = ComponentIndex()
+        self._version = next(Network._version_counter)
+        self._source_version = None
+        self._source_hash = None
+        self._source_hash_version = None
+        self._distance_matrix = None
+        self._contraction_hierarchy = None
+        self._landmark_index = None
+
+        if snapshot_file is not None and self.load_snapshot(snapshot_file):
+            return
 
         self.construct_network_from_file()
+
+        if snapshot_file is not None:
+            try:
+                self.save_snapshot(snapshot_file)
+            except OSError:
+                pass
+
+        if compact:
+            self.compact()
     
 
     def get_stations(self):
@@ -60,12 +125,17 @@ class Network:
 
     def get_connections(self):
         """
-        The connections in the current Network instance.
+        The connections in the current Network instance. When the connections are kept only in the compact graph, a
+        new dictionary is built from it.
 
         Returns:
             dict: the dictionary of connections in the current Network instance.
         """
 
+        if self._connections is None:
+            graph = self.get_compact_graph()
+            return {station: self.children_of(station) for station in graph.get_stations()}
+
         return self._connections
 
 
@@ -102,6 +172,56 @@ class Network:
 
         self._network_file = network_file                 
 
+
+    def get_version(self):
+        """
+        The version of the current Network instance, which changes whenever a station or connection is added, changed
+        or removed, so that results computed for a previous version can be recognised.
+
+        Returns:
+            int: the version of the current Network instance.
+        """
+
+        return self._version
+
+
+    def get_compact_graph(self):
+        """
+        The compact graph of the connections in the current Network instance, which is built when first needed and
+        rebuilt after the network changes.
+
+        Returns:
+            CompactGraph: the compact graph of the current Network instance.
+        """
+
+        if self._compact_graph is None:
+            self._compact_graph = CompactGraph.from_network(self)
+
+        return self._compact_graph
+
+
+    def is_compact(self):
+        """
+        Checks whether the connections of the current Network instance are kept only in its compact graph.
+
+        Returns:
+            bool:
+                - True if the connections are kept only in the compact graph.
+                - False otherwise.
+        """
+
+        return self._connections is None
+
+
+    def compact(self):
+        """
+        Keeps the connections of the current Network instance only in its compact graph, releasing the dictionary of
+        connections. The dictionary is restored when the network changes.
+        """
+
+        self.get_compact_graph()
+        self._connections = None
+
     
     def add_station(self, station):
         """
@@ -111,15 +231,27 @@ class Network:
             station (Station): the station to be added to the current Network instance.
 
         Raises:
-            ValueError: If a station already exists in the current Network instance, with the message 
-                        'Duplicate station'.
+            ValueError: If a station, or a station with the same id, already exists in the current Network instance,
+                        with the message 'Duplicate station'.
         """
 
-        if station in self._stations:
+        if station in self._station_set or (station.get_id() is not None and station.get_id() in self._stations_by_id):
             raise ValueError('Duplicate station')
         else:
+            self._connections = self.get_connections()
+            self._compact_graph = None
+            self._distance_matrix = None
+            self._contraction_hierarchy = None
+            self._landmark_index = None
+            self._version = next(Network._version_counter)
             self._stations.append(station)
+            self._station_set.add(station)
             self._connections[station] = []
+            self._components.add(station)
+
+            if station.get_id() is not None:
+                self._stations_by_id[station.get_id()] = station
+            self._stations_by_name[station.get_name()] = station
 
 
     def add_connection(self, connection):
@@ -137,11 +269,211 @@ class Network:
         source = connection.get_source()
         destination = connection.get_destination()
 
-        if not(source in self._stations and destination in self._stations):
+        if not(source in self._station_set and destination in self._station_set):
             raise ValueError('Station not in Network')
+
+        self._connections = self.get_connections()
+        self._compact_graph = None
+        self._distance_matrix = None
+        self._contraction_hierarchy = None
+        self._landmark_index = None
+        self._version = next(Network._version_counter)
         
         self._connections[source].append((destination, connection.get_time()))
         self._connections[destination].append((source, connection.get_time()))
+        self._components.union(source, destination)
+
+
+    def connection_time(self, source, destination):
+        """
+        The time of the fastest connection between two stations of the current Network instance.
+
+        Args:
+            source (Station): the first station.
+            destination (Station): the second station.
+
+        Returns:
+            int: the time, in minutes, of the fastest connection between the two stations, or None if they are not
+                 directly connected.
+
+        Raises:
+            KeyError: if either station is not in the current Network instance.
+        """
+
+        graph = self.get_compact_graph()
+
+        return graph.connection_time(graph.index_of(source), graph.index_of(destination))
+
+
+    def set_connection_time(self, source, destination, time):
+        """
+        Sets the time of the connections between two stations of the current Network instance, for instance after a
+        delay. The connections keep their order, the compact graph is changed in place and the precomputed times of
+        the fastest paths are repaired instead of being computed again.
+
+        Args:
+            source (Station): the first station of the connections.
+            destination (Station): the second station of the connections.
+            time (Time): the time to set for the connections.
+
+        Raises:
+            ValueError: if either station is not in the current Network instance, with the message
+                        'Station not in Network'.
+            ValueError: if the stations are not directly connected, with the message 'Connection not in Network'.
+        """
+
+        if not(source in self._station_set and destination in self._station_set):
+            raise ValueError('Station not in Network')
+
+        graph = self.get_compact_graph()
+        first, second = graph.index_of(source), graph.index_of(destination)
+        old_time = graph.connection_time(first, second)
+
+        if old_time is None:
+            raise ValueError('Connection not in Network')
+
+        if self._connections is not None:
+            for station, other_station in ((source, destination), (destination, source)):
+                self._connections[station] = [(neighbor, time if neighbor == other_station else neighbor_time)
+                                              for neighbor, neighbor_time in self._connections[station]]
+
+        graph.set_connection_time(first, second, time.get_minutes())
+        self.repair_precomputed_times(first, second, old_time)
+
+
+    def remove_connection(self, connection):
+        """
+        Removes a connection from the current Network instance, in both directions. The compact graph is changed in
+        place, the component index is rebuilt only if the removal splits a component, and the precomputed times of the
+        fastest paths are repaired instead of being computed again.
+
+        Args:
+            connection (Connection): the connection to be removed, with the same stations and time as a connection of
+                                     the current Network instance.
+
+        Raises:
+            ValueError: if either the source or destination stations is not in the current Network instance, with the
+                        message 'Station not in Network'.
+            ValueError: if there is no such connection in the current Network instance, with the message
+                        'Connection not in Network'.
+        """
+
+        source = connection.get_source()
+        destination = connection.get_destination()
+
+        if not(source in self._station_set and destination in self._station_set):
+            raise ValueError('Station not in Network')
+
+        graph = self.get_compact_graph()
+        first, second = graph.index_of(source), graph.index_of(destination)
+        old_time = graph.connection_time(first, second)
+
+        if not graph.remove_connection(first, second, connection.get_time().get_minutes()):
+            raise ValueError('Connection not in Network')
+
+        if self._connections is not None:
+            for station, other_station in ((source, destination), (destination, source)):
+                connections = self._connections[station]
+                connections.pop(next(position for position, (neighbor, time) in enumerate(connections)
+                                     if neighbor == other_station and time == connection.get_time()))
+
+        if not graph.connected(first, second):
+            self.rebuild_components()
+
+        self.repair_precomputed_times(first, second, old_time)
+
+
+    def remove_station(self, station):
+        """
+        Removes a station and all its connections from the current Network instance. Since the remaining stations are
+        numbered again, the compact graph is rebuilt when next needed and the precomputed times of the fastest paths
+        are discarded. If other stations share its name, the one added last is then found by station_by_name.
+
+        Args:
+            station (Station): the station to be removed.
+
+        Raises:
+            ValueError: if the station is not in the current Network instance, with the message 'Station not in Network'.
+        """
+
+        if station not in self._station_set:
+            raise ValueError('Station not in Network')
+
+        self._connections = self.get_connections()
+        self._compact_graph = None
+        self._distance_matrix = None
+        self._contraction_hierarchy = None
+        self._landmark_index = None
+        self._version = next(Network._version_counter)
+
+        for neighbor, time in self._connections.pop(station):
+            if neighbor != station:
+                self._connections[neighbor] = [(other_station, other_time) for other_station, other_time
+                                               in self._connections[neighbor] if other_station != station]
+
+        self._stations.remove(station)
+        self._station_set.remove(station)
+
+        if station.get_id() is not None:
+            del self._stations_by_id[station.get_id()]
+        if self._stations_by_name.get(station.get_name()) is station:
+            del self._stations_by_name[station.get_name()]
+            for other_station in self._stations:
+                if other_station.get_name() == station.get_name():
+                    self._stations_by_name[station.get_name()] = other_station
+
+        self.rebuild_components()
+
+
+    def rebuild_components(self):
+        """
+        Rebuilds the component index of the current Network instance from its connections, which is needed when a
+        component is split, since the index can only merge components.
+        """
+
+        components = ComponentIndex()
+
+        for station in self._stations:
+            components.add(station)
+
+        if self._connections is None:
+            graph = self.get_compact_graph()
+            offsets, targets = graph.get_offsets(), graph.get_targets()
+
+            for source in range(graph.number_of_stations()):
+                for edge in range(offsets[source], offsets[source + 1]):
+                    if targets[edge] > source:
+                        components.union(self._stations[source], self._stations[targets[edge]])
+        else:
+            for source, destination, time in self.connections_items():
+                components.union(source, destination)
+
+        self._components = components
+
+
+    def repair_precomputed_times(self, first, second, old_time):
+        """
+        Brings the precomputed structures of the current Network instance up to date after the time of the fastest
+        connection between two stations changed in the compact graph. The distance matrix and the landmark index are
+        repaired in place, while the contraction hierarchy, whose shortcuts depend on every time, is discarded. The
+        version changes, so that cached results are no longer used.
+
+        Args:
+            first (int): the number of the first station of the connection that changed.
+            second (int): the number of the second station of the connection that changed.
+            old_time (int): the time, in minutes, of the fastest connection between the two stations before it changed.
+        """
+
+        graph = self.get_compact_graph()
+
+        self._contraction_hierarchy = None
+        self._version = next(Network._version_counter)
+
+        if self._distance_matrix is not None:
+            self._distance_matrix.repair(graph, first, second, old_time)
+
+        if self._landmark_index is not None:
+            self._landmark_index.repair(graph, first, second, old_time)
 
 
     def stations_items(self):
@@ -185,10 +517,46 @@ class Network:
         Raises:
             KeyError: if the given station is not in the current Network instance.
         """
+
+        if self._connections is None:
+            graph = self.get_compact_graph()
+            targets, weights = graph.children_of(graph.index_of(station))
+            return [(graph.station_of(target), Time.interned(str(weight))) for target, weight in zip(targets, weights)]
         
-        return self.get_connections()[station]
+        return self._connections[station]
 
     
+    def get_components(self):
+        """
+        The connected components of the current Network instance.
+
+        Returns:
+            ComponentIndex: the component index of the current Network instance.
+        """
+
+        return self._components
+
+
+    def communicate(self, start, end):
+        """
+        Checks whether there is a path between two stations of the current Network instance, in almost constant time.
+
+        Args:
+            start (Station): the first station.
+            end (Station): the second station.
+
+        Returns:
+            bool:
+                - True if both stations are in the same connected component.
+                - False otherwise.
+
+        Raises:
+            KeyError: if either station is not in the current Network instance.
+        """
+
+        return self._components.connected(start, end)
+
+
     def has_station(self, station):
         """
         Checks whether a given station exists in the current Network instance.
@@ -202,7 +570,269 @@ class Network:
                 - False otherwise.
         """
 
-        return station in self.get_stations()
+        return station in self._station_set
+
+
+    def station_by_id(self, id):
+        """
+        The station with the given id in the current Network instance.
+
+        Args:
+            id (str): the id of the station.
+
+        Returns:
+            Station: the station with the given id, or None if there is no such station in the current Network instance.
+        """
+
+        return self._stations_by_id.get(id)
+
+
+    def station_by_name(self, name):
+        """
+        The station with the given name in the current Network instance. If several stations share the name, the one
+        added last is returned.
+
+        Args:
+            name (str): the name of the station.
+
+        Returns:
+            Station: the station with the given name, or None if there is no such station in the current Network
+                     instance.
+        """
+
+        return self._stations_by_name.get(name)
+
+
+    def distances_from(self, station, excluded=()):
+        """
+        Computes the time of the fastest path from the given station to every station reachable from it, using
+        Dijkstra's algorithm. Since the network is undirected, these are also the times to the given station.
+
+        Args:
+            station (Station): the station from where the times are computed.
+            excluded (set, optional): the stations that cannot be part of a path. Defaults to an empty tuple.
+
+        Returns:
+            dict: a dictionary mapping each reachable station to the time (in minutes) of its fastest path.
+        """
+
+        graph = self.get_compact_graph()
+        distances = graph.distances_from(graph.index_of(station), {graph.index_of(other) for other in excluded})
+
+        return {graph.station_of(index): distance for index, distance in distances.items()}
+
+
+    def get_distance_matrix(self):
+        """
+        The times of the fastest paths between all pairs of stations of the current Network instance.
+
+        Returns:
+            DistanceMatrix: the distance matrix of the current Network instance, or None if it has not been precomputed
+                            since the network last changed.
+        """
+
+        return self._distance_matrix
+
+
+    def precompute_all_pairs(self, matrix_file=None):
+        """
+        Precomputes the times of the fastest paths between all pairs of stations of the current Network instance, so
+        that fastest_time answers in constant time. The matrix takes 8*V*V bytes and O(V*V*V) time, so it is only
+        computed for networks of at most MAX_DISTANCE_MATRIX_STATIONS stations. Queries that need the paths themselves
+        are not affected.
+
+        Args:
+            matrix_file (str, optional): a binary file holding the distance matrix. If it matches the contents of the
+                                         network file, the matrix is loaded from it; otherwise the matrix is computed
+                                         and the file is rewritten. The file is not used once the network has changed
+                                         since it was read. Defaults to None.
+
+        Returns:
+            DistanceMatrix: the distance matrix of the current Network instance.
+
+        Raises:
+            ValueError: if the network has more than MAX_DISTANCE_MATRIX_STATIONS stations, with the message
+                        'Network too large for a distance matrix'.
+        """
+
+        graph = self.get_compact_graph()
+
+        if graph.number_of_stations() > MAX_DISTANCE_MATRIX_STATIONS:
+            raise ValueError('Network too large for a distance matrix')
+
+        from_file = matrix_file is not None and self.get_version() == self._source_version
+        matrix = None
+
+        if from_file:
+            matrix = DistanceMatrix.load(matrix_file, self.source_hash(), graph.number_of_stations())
+
+        if matrix is None:
+            matrix = DistanceMatrix.from_graph(graph)
+
+            if from_file:
+                try:
+                    matrix.save(matrix_file, self.source_hash())
+                except OSError:
+                    pass
+
+        self._distance_matrix = matrix
+
+        return matrix
+
+
+    def get_contraction_hierarchy(self):
+        """
+        The contraction hierarchy of the connections in the current Network instance.
+
+        Returns:
+            ContractionHierarchy: the contraction hierarchy of the current Network instance, or None if it has not been
+                                  built since the network last changed.
+        """
+
+        return self._contraction_hierarchy
+
+
+    def build_contraction_hierarchy(self, hierarchy_file=None):
+        """
+        Builds the contraction hierarchy of the current Network instance, which answers fastest path queries with two
+        small searches instead of a search over the whole network. The hierarchy is used until the network changes.
+
+        Args:
+            hierarchy_file (str, optional): a binary file holding the contraction hierarchy. If it matches the contents
+                                            of the network file, the hierarchy is loaded from it; otherwise the
+                                            hierarchy is built and the file is rewritten. The file is not used once the
+                                            network has changed since it was read. Defaults to None.
+
+        Returns:
+            ContractionHierarchy: the contraction hierarchy of the current Network instance.
+        """
+
+        graph = self.get_compact_graph()
+        from_file = hierarchy_file is not None and self.get_version() == self._source_version
+        hierarchy = None
+
+        if from_file:
+            hierarchy = ContractionHierarchy.load(hierarchy_file, self.source_hash(), graph.number_of_stations())
+
+        if hierarchy is None:
+            hierarchy = ContractionHierarchy.from_graph(graph)
+
+            if from_file:
+                try:
+                    hierarchy.save(hierarchy_file, self.source_hash())
+                except OSError:
+                    pass
+
+        self._contraction_hierarchy = hierarchy
+
+        return hierarchy
+
+
+    def get_landmark_index(self):
+        """
+        The landmark index of the connections in the current Network instance.
+
+        Returns:
+            LandmarkIndex: the landmark index of the current Network instance, or None if it has not been built since
+                           the network last changed.
+        """
+
+        return self._landmark_index
+
+
+    def build_landmark_index(self, number_of_landmarks=NUMBER_OF_LANDMARKS, landmarks_file=None):
+        """
+        Builds the landmark index of the current Network instance, whose lower bounds guide the searches for fastest
+        paths towards their end station. The index is used until the network changes.
+
+        Args:
+            number_of_landmarks (int, optional): the number of landmarks of the index. Defaults to NUMBER_OF_LANDMARKS.
+            landmarks_file (str, optional): a binary file holding the landmark index. If it matches the contents of the
+                                            network file and the number of landmarks, the index is loaded from it;
+                                            otherwise the index is built and the file is rewritten. The file is not
+                                            used once the network has changed since it was read. Defaults to None.
+
+        Returns:
+            LandmarkIndex: the landmark index of the current Network instance.
+
+        Raises:
+            ValueError: If number_of_landmarks is smaller than 1, with the message 'Invalid number of landmarks'.
+        """
+
+        graph = self.get_compact_graph()
+        from_file = landmarks_file is not None and self.get_version() == self._source_version
+        landmark_index = None
+
+        if from_file:
+            landmark_index = LandmarkIndex.load(landmarks_file, self.source_hash(), graph.number_of_stations(),
+                                                number_of_landmarks)
+
+        if landmark_index is None:
+            landmark_index = LandmarkIndex.from_graph(graph, number_of_landmarks)
+
+            if from_file:
+                try:
+                    landmark_index.save(landmarks_file, self.source_hash())
+                except OSError:
+                    pass
+
+        self._landmark_index = landmark_index
+
+        return landmark_index
+
+
+    def lower_bounds_to(self, end):
+        """
+        Builds a function that returns a lower bound on the time of the fastest path from any station of the current
+        Network instance to the given end station. The bounds come from the landmark index when it has been built, and
+        are otherwise the exact times found with Dijkstra's algorithm from the end station.
+
+        Args:
+            end (Station): the station where the paths end.
+
+        Returns:
+            function: a function that receives a station and returns a lower bound (in minutes) on the time of its
+                      fastest path to the end station, or None if the station cannot reach the end station.
+        """
+
+        graph = self.get_compact_graph()
+
+        if self._landmark_index is not None:
+            lower_bound = self._landmark_index.lower_bound_to(graph.index_of(end))
+            return lambda station: lower_bound(graph.index_of(station))
+
+        return self.distances_from(end).get
+
+
+    def fastest_time(self, start, end):
+        """
+        The time of the fastest path between two stations of the current Network instance, read from the distance
+        matrix when it has been precomputed, found with the contraction hierarchy when it has been built and found with
+        Dijkstra's algorithm otherwise.
+
+        Args:
+            start (Station): the station where the path starts.
+            end (Station): the station where the path ends.
+
+        Returns:
+            int: the time, in minutes, of the fastest path between the two stations, or None if they do not communicate.
+
+        Raises:
+            KeyError: if either station is not in the current Network instance.
+        """
+
+        if not self.communicate(start, end):
+            return None
+
+        graph = self.get_compact_graph()
+
+        if self._distance_matrix is not None:
+            return self._distance_matrix.time_between(graph.index_of(start), graph.index_of(end))
+
+        if self._contraction_hierarchy is not None:
+            return self._contraction_hierarchy.time_between(graph.index_of(start), graph.index_of(end))
+
+        return graph.distances_from(graph.index_of(start)).get(graph.index_of(end))
 
 
     def read_network_file(self):
@@ -218,56 +848,335 @@ class Network:
 
     def remove_header(self):
         """
-        Reads the .txt file associated with the current Network instance, skipping the header lines.
+        Reads the .txt file associated with the current Network instance one line at a time, skipping the header line.
+        The file is closed once all the lines have been read.
 
-        Returns:
-            list: a list of strings, each representing a line of content from the .txt file associated with the
-                  current Network instance, with the header lines removed.
+        Yields:
+            str: each line of content from the .txt file associated with the current Network instance, after the header
+                 line.
         """
         
-        lines = self.read_network_file().readlines()
-        content = []
-        
-        for i, line in enumerate(lines, start=1):
-            if i > 1:
-                content.append(line)
-                
-        return content
+        with self.read_network_file() as in_file:
+            next(in_file, None)
+
+            for line in in_file:
+                yield line
+
+
+    def parsing_error(self, line_number, column, message):
+        """
+        Builds the error raised when a line of the .txt file associated with the current Network instance is malformed.
+
+        Args:
+            line_number (int): the number of the malformed line, starting at 1.
+            column (int): the column where the error was found, starting at 1.
+            message (str): the description of the error.
+
+        Returns:
+            ValueError: the error with the file name, line and column of the malformed input.
+        """
+
+        return ValueError(f"{self.get_network_file()}, line {line_number}, column {column}: {message}")
+
+
+    def parse_network_line(self, line, line_number):
+        """
+        Parses a line with the format 'Id, Name, [(Id, Time), ...]' of the .txt file associated with the current Network
+        instance.
+
+        Args:
+            line (str): the line to parse.
+            line_number (int): the number of the line in the file, starting at 1.
+
+        Returns:
+            tuple: a 3-element tuple containing:
+                - id (str): the id of the station.
+                - name (str): the name of the station.
+                - connections (list): a list of 2-element tuples with the id of each connected station and the time of
+                                      the connection as a string.
+
+        Raises:
+            ValueError: if the line is malformed, with the file name, line and column of the error in the message.
+        """
+
+        line = line.rstrip()
+        length = len(line)
+
+        id_end = line.find(", ")
+        if id_end <= 0:
+            raise self.parsing_error(line_number, 1, "expected a station id followed by ', '")
+
+        name_end = line.find(", ", id_end + 2)
+        if name_end < 0:
+            raise self.parsing_error(line_number, id_end + 3, "expected a station name followed by ', '")
+
+        id = line[:id_end]
+        name = line[id_end + 2:name_end]
+        connections = []
+
+        position = name_end + 2
+        if line[position:position + 1] != "[":
+            raise self.parsing_error(line_number, position + 1, "expected '['")
+        position += 1
+
+        while position < length and line[position] == " ":
+            position += 1
+
+        if line[position:position + 1] == "]":
+            position += 1
+        else:
+            while True:
+                if line[position:position + 1] != "(":
+                    raise self.parsing_error(line_number, position + 1, "expected '('")
+
+                destination_start = position + 1
+                position = line.find(",", destination_start)
+                destination_id = line[destination_start:position].strip()
+                if position < 0 or not destination_id or ")" in destination_id:
+                    raise self.parsing_error(line_number, destination_start + 1, "expected a station id followed by ','")
+                position += 1
+
+                while position < length and line[position] == " ":
+                    position += 1
+
+                time_start = position
+                while position < length and line[position].isdigit():
+                    position += 1
+                if position == time_start:
+                    raise self.parsing_error(line_number, position + 1, "expected a time in minutes")
+                connections.append((destination_id, line[time_start:position]))
+
+                while position < length and line[position] == " ":
+                    position += 1
+
+                if line[position:position + 1] != ")":
+                    raise self.parsing_error(line_number, position + 1, "expected ')'")
+                position += 1
+
+                if line[position:position + 1] == "]":
+                    position += 1
+                    break
+
+                if line[position:position + 1] != ",":
+                    raise self.parsing_error(line_number, position + 1, "expected ',' or ']'")
+                position += 1
+
+                while position < length and line[position] == " ":
+                    position += 1
+
+        if position != length:
+            raise self.parsing_error(line_number, position + 1, "unexpected text after ']'")
+
+        return id, name, connections
+
+
+    def network_file_items(self):
+        """
+        Supports iteration over the stations described in the .txt file associated with the current Network instance,
+        reading the file once and one line at a time. Blank lines are skipped.
+
+        Yields:
+            tuple: a 3-element tuple containing:
+                - id (str): the id of the station.
+                - name (str): the name of the station.
+                - connections (list): a list of 2-element tuples with the id of each connected station and the time of
+                                      the connection as a string.
+
+        Raises:
+            ValueError: if a line is malformed, with the file name, line and column of the error in the message.
+        """
+
+        for line_number, line in enumerate(self.remove_header(), start=2):
+            if line.strip():
+                yield self.parse_network_line(line, line_number)
     
 
     def construct_network_from_file(self):
         """
-        Populates the current Network instance from the data contained in the input file.
+        Populates the current Network instance from the data contained in the input file, in a single pass. Connections
+        may refer to stations declared later in the file; they are added once all the stations are known, in the order
+        of the file, and those referring to ids that are never declared are ignored. Until then, every connection is
+        kept in a list, so loading holds memory proportional to the number of connections on top of the network itself,
+        in exchange for reading and parsing the file only once.
         """
-        
-        in_file = self.remove_header()
-        station_dict = {}
 
-        for line in in_file:
-            line_lst = line.rstrip().split(", ", maxsplit=2)
-            name, id = line_lst[1], line_lst[0]
+        version = self.get_version()
+        pending_connections = []
 
+        for id, name, connections in self.network_file_items():
             station = Station(name, id)
             self.add_station(station)
-            station_dict[id] = station
 
-        for line in in_file:
-            line_lst = line.rstrip().split(", ", maxsplit=2)
-            id = line_lst[0]
+            for destination_id, time_string in connections:
+                pending_connections.append((station, destination_id, Time.interned(time_string)))
 
-            source_station = station_dict[id]
-            
-            new_string = line_lst[2].replace("[(","").replace(")]","").replace("(", "").replace(")", "")
-            new_string_lst = new_string.split(', ')
+        for source_station, destination_id, time in pending_connections:
+            destination_station = self.station_by_id(destination_id)
+
+            if destination_station is not None:
+                self.add_connection(Connection(source_station, destination_station, time))
+
+        self._source_version = self.get_version()
+        self.keep_source_hash(version)
+
+
+    def source_hash(self):
+        """
+        Computes the content hash of the .txt file associated with the current Network instance. The hash is computed
+        once and kept until the network changes, so that the snapshot and the precomputed structures do not read the
+        file again.
+
+        Returns:
+            bytes: the SHA-256 digest of the contents of the file.
+        """
+
+        if self._source_hash is None or self._source_hash_version != self.get_version():
+            digest = hashlib.sha256()
+
+            with open(self.get_network_file(), "rb") as in_file:
+                for block in iter(lambda: in_file.read(1 << 20), b""):
+                    digest.update(block)
+
+            self._source_hash = digest.digest()
+            self._source_hash_version = self.get_version()
+
+        return self._source_hash
+
+
+    def keep_source_hash(self, version):
+        """
+        Keeps the content hash of the .txt file associated with the current Network instance once the network has been
+        read from the file or its snapshot, which changes the version of the network but not the file.
+
+        Args:
+            version (int): the version of the network before it was read.
+        """
+
+        if self._source_hash is not None and self._source_hash_version == version:
+            self._source_hash_version = self.get_version()
+
+
+    def save_snapshot(self, snapshot_file):
+        """
+        Writes a binary snapshot of the current Network instance, keyed by the content hash of its .txt file. The
+        snapshot holds a header, the compact graph arrays and the station table, and is replaced atomically.
+
+        Args:
+            snapshot_file (str): the name of the snapshot file to write.
+        """
+
+        graph = self.get_compact_graph()
+        stations = graph.get_stations()
+
+        id_lengths = array('q')
+        name_lengths = array('q')
+        strings = bytearray()
+
+        for station in stations:
+            if station.get_id() is None:
+                id_lengths.append(-1)
+            else:
+                encoded_id = station.get_id().encode("utf-8")
+                id_lengths.append(len(encoded_id))
+                strings += encoded_id
+
+            encoded_name = station.get_name().encode("utf-8")
+            name_lengths.append(len(encoded_name))
+            strings += encoded_name
+
+        header = struct.pack(SNAPSHOT_HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sys.byteorder == "little",
+                             self.source_hash(), len(stations), graph.number_of_connections(), len(strings))
+
+        temporary_file = snapshot_file + ".tmp"
+
+        with open(temporary_file, "wb") as out_file:
+            out_file.write(header)
+            for section in (graph.get_offsets(), graph.get_targets(), graph.get_weights(), id_lengths, name_lengths):
+                out_file.write(section.tobytes())
+            out_file.write(strings)
+
+        os.replace(temporary_file, snapshot_file)
+
+
+    def load_snapshot(self, snapshot_file):
+        """
+        Replaces the contents of the current Network instance with a binary snapshot, if the snapshot exists, has the
+        current format version and was written from the current contents of the .txt file. The compact graph arrays are
+        memory-mapped from the snapshot instead of being read, and the network is left in compact form.
+
+        Args:
+            snapshot_file (str): the name of the snapshot file to read.
+
+        Returns:
+            bool:
+                - True if the snapshot was loaded.
+                - False otherwise.
+        """
+
+        header_size = struct.calcsize(SNAPSHOT_HEADER_FORMAT)
+
+        try:
+            with open(snapshot_file, "rb") as in_file:
+                header = in_file.read(header_size)
+                if len(header) < header_size:
+                    return False
+
+                magic, version, little_endian, source_hash, number_of_stations, number_of_connections, strings_size = \
+                    struct.unpack(SNAPSHOT_HEADER_FORMAT, header)
+
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or little_endian != (sys.byteorder == "little"):
+                    return False
+
+                if source_hash != self.source_hash():
+                    return False
+
+                snapshot = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return False
+
+        item_size = array('q').itemsize
+        sections = []
+        position = header_size
+
+        if len(snapshot) != header_size + item_size * (3 * number_of_stations + 1 + 2 * number_of_connections) + strings_size:
+            snapshot.close()
+            return False
+
+        for count in (number_of_stations + 1, number_of_connections, number_of_connections, number_of_stations,
+                      number_of_stations):
+            sections.append(memoryview(snapshot)[position:position + count * item_size].cast('q'))
+            position += count * item_size
+
+        offsets, targets, weights, id_lengths, name_lengths = sections
+        strings = memoryview(snapshot)[position:position + strings_size]
+
+        version = self.get_version()
+        self._stations = []
+        self._station_set = set()
+        self._stations_by_id = {}
+        self._stations_by_name = {}
+        self._connections = {}
+        self._components = ComponentIndex()
+        position = 0
+
+        for index in range(number_of_stations):
+            id = None
+            if id_lengths[index] >= 0:
+                id = str(strings[position:position + id_lengths[index]], "utf-8")
+                position += id_lengths[index]
+
+            name = str(strings[position:position + name_lengths[index]], "utf-8")
+            position += name_lengths[index]
+
+            self.add_station(Station(name, id))
 
-            for i in range(0, len(new_string_lst)-1, 2):
-                destination_station_id = new_string_lst[i]
-                time = Time(new_string_lst[i+1])
+        self._compact_graph = CompactGraph(self._stations, offsets, targets, weights)
+        self._connections = None
+        self.rebuild_components()
+        self._source_version = self.get_version()
+        self.keep_source_hash(version)
 
-                for station in self.get_stations():
-                    if station.get_id() == destination_station_id:
-                        destination_station = station
-                        self.add_connection(Connection(source_station, destination_station, time))
+        return True
 
 
     def __lt__(self, other_network):
@@ -323,7 +1232,7 @@ class Network:
         
         for source in self.get_stations():
             destination_time_pairs = []
-            for destination, time in self.get_connections()[source]:
+            for destination, time in self.children_of(source):
                 destination_time_pairs.append(f"({destination.get_id()}, {time.get_time_string()})")
             
             result += f"{source.get_id()}, {source.get_name()}, [{', '.join(destination_time_pairs)}]\n"
@@ -0,0 +1,112 @@
+#-*- coding: utf-8 -*-
+
+
+class QueryPlanner:
+    """
+    A class that plans the search of a batch of station pairs so that work is shared between them: repeated pairs are
+    searched once, a pair and its reverse are searched in a single direction, and the pairs are grouped by start station
+    so that one shortest path tree serves all the pairs with the same start station.
+    """
+
+    def __init__(self, station_pairs):
+        """
+        Initializes a new QueryPlanner.
+
+        Args:
+            station_pairs (list): the list of station pairs to be searched, where the first element of each pair is the
+                                  start station and the second element is the end station.
+        """
+
+        self._station_pairs = station_pairs
+        self._canonical_pairs = {}
+        self._groups = {}
+
+        self.plan()
+
+
+    def get_station_pairs(self):
+        """
+        The station pairs of the current QueryPlanner instance.
+
+        Returns:
+            list: the list of station pairs of the current QueryPlanner instance.
+        """
+
+        return self._station_pairs
+
+
+    def set_station_pairs(self, station_pairs):
+        """
+        Sets the station pairs of the current QueryPlanner instance and plans their search.
+
+        Args:
+            station_pairs (list): the list of station pairs to set for the current QueryPlanner instance.
+        """
+
+        self._station_pairs = station_pairs
+        self.plan()
+
+
+    def get_groups(self):
+        """
+        The groups of pairs to be searched by the current QueryPlanner instance.
+
+        Returns:
+            dict: a dictionary mapping each start station to the list of end stations to be searched from it.
+        """
+
+        return self._groups
+
+
+    def plan(self):
+        """
+        Plans the search of the station pairs of the current QueryPlanner instance. The first occurrence of a pair, in
+        either direction, sets the direction in which it is searched.
+        """
+
+        self._canonical_pairs = {}
+        self._groups = {}
+
+        for start, end in self.get_station_pairs():
+            if (start, end) in self._canonical_pairs:
+                continue
+
+            if (end, start) in self._canonical_pairs:
+                self._canonical_pairs[(start, end)] = ((end, start), True)
+            else:
+                self._canonical_pairs[(start, end)] = ((start, end), False)
+                self._groups.setdefault(start, []).append(end)
+
+
+    def canonical_pair(self, start, end):
+        """
+        The pair that is searched to answer the given pair.
+
+        Args:
+            start (Station): the start station of the pair.
+            end (Station): the end station of the pair.
+
+        Returns:
+            tuple: a 2-element tuple containing:
+                - pair (tuple): the start and end stations of the searched pair.
+                - reversed (bool): whether the searched pair is the given pair reversed.
+
+        Raises:
+            KeyError: if the given pair is not one of the station pairs of the current QueryPlanner instance.
+        """
+
+        return self._canonical_pairs[(start, end)]
+
+
+    def groups_items(self):
+        """
+        Supports iteration over the groups of pairs to be searched by the current QueryPlanner instance.
+
+        Yields:
+            tuple: a 2-element tuple containing:
+                - start (Station): the start station of the group.
+                - ends (list): the end stations to be searched from the start station.
+        """
+
+        for start, ends in self.get_groups().items():
+            yield start, ends
@@ -0,0 +1,449 @@
+#-*- coding: utf-8 -*-
+
+
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from classes.KShortestPaths import KShortestPaths
+from classes.Network import Network
+from classes.ResultCache import ResultCache
+from classes.Search import Search
+from classes.SharedGraph import SharedGraph
+from classes.Station import Station
+from classes.Time import Time
+
+from constants import SNAPSHOT_EXTENSION, NUMBER_OF_WORKERS, NUMBER_OF_FASTEST_PATHS, SERVER_HOST, SERVER_PORT, \
+    SERVER_PIPELINE_DEPTH, SERVER_MAX_PATHS
+
+
+class QueryServer:
+    """
+    A class to represent a long-running server that loads a network once and answers queries for its fastest paths
+    over a local TCP or Unix socket. Requests and responses are JSON objects, one per line, such as
+    {"from": "Coral Bay", "to": "Brookside", "k": 2}. The searches run on a pool of workers, while an asyncio event
+    loop reads the requests of every connection and writes the responses of each connection in the order of its
+    requests, so that clients can send several requests without waiting for the responses. The request
+    {"command": "reload"} reads the network file again and swaps the new network and an empty result cache in
+    atomically: queries already under way are answered with the previous network, and later queries with the new one.
+    """
+
+    def __init__(self, network_file, workers=NUMBER_OF_WORKERS, k=NUMBER_OF_FASTEST_PATHS, max_k=SERVER_MAX_PATHS):
+        """
+        Initializes a new QueryServer. The network is loaded when the server starts.
+
+        Args:
+            network_file (str): the file containing the network data.
+            workers (int, optional): the number of worker processes over which the searches are spread. With a single
+                                     worker, the searches run on a thread of the server process. Defaults to
+                                     NUMBER_OF_WORKERS.
+            k (int, optional): the number of fastest paths of the queries that do not specify it. Defaults to
+                               NUMBER_OF_FASTEST_PATHS.
+            max_k (int, optional): the maximum number of fastest paths that a query may ask for. Defaults to
+                                   SERVER_MAX_PATHS.
+
+        Attributes:
+            network (Network): the network whose queries are answered, or None until the server starts.
+            executor (Executor): the pool of workers where the searches run, or None until the server starts.
+            shared_graph (SharedGraph): the compact graph of the network shared with the worker processes, or None
+                                        when the searches run on a thread.
+            cache (ResultCache): the cache of search results of the network, replaced whenever a new network is loaded.
+            reload_lock (Lock): the lock that lets a single reload run at a time.
+            unix_socket (str): the Unix socket on which the server listens, or None when it listens on a TCP port.
+
+        Raises:
+            ValueError: If k is smaller than 1 or greater than max_k, with the message 'Invalid number of paths'.
+        """
+
+        if k < 1 or k > max_k:
+            raise ValueError('Invalid number of paths')
+
+        self._network_file = network_file
+        self._workers = workers
+        self._k = k
+        self._max_k = max_k
+        self._network = None
+        self._executor = None
+        self._shared_graph = None
+        self._cache = ResultCache()
+        self._reload_lock = None
+        self._unix_socket = None
+
+
+    def get_network_file(self):
+        """
+        The network file of the current QueryServer instance.
+
+        Returns:
+            str: the file containing the network data.
+        """
+
+        return self._network_file
+
+
+    def get_workers(self):
+        """
+        The number of workers of the current QueryServer instance.
+
+        Returns:
+            int: the number of worker processes over which the searches are spread.
+        """
+
+        return self._workers
+
+
+    def get_k(self):
+        """
+        The default number of fastest paths of the current QueryServer instance.
+
+        Returns:
+            int: the number of fastest paths of the queries that do not specify it.
+        """
+
+        return self._k
+
+
+    def get_max_k(self):
+        """
+        The maximum number of fastest paths of the queries of the current QueryServer instance.
+
+        Returns:
+            int: the maximum number of fastest paths that a query may ask for.
+        """
+
+        return self._max_k
+
+
+    def get_network(self):
+        """
+        The network of the current QueryServer instance.
+
+        Returns:
+            Network: the network whose queries are answered, or None until the server starts.
+        """
+
+        return self._network
+
+
+    def load(self):
+        """
+        Loads the network file of the current QueryServer instance, from its snapshot when the file is unchanged, and
+        starts a pool of workers for it.
+
+        Returns:
+            tuple: a 3-element tuple containing:
+                - network (Network): the loaded network.
+                - executor (Executor): the pool of workers where the searches of the network run.
+                - shared_graph (SharedGraph): the compact graph shared with the worker processes, or None when the
+                                              searches run on a thread.
+        """
+
+        network = Network(self.get_network_file(), compact=True,
+                          snapshot_file=self.get_network_file() + SNAPSHOT_EXTENSION)
+
+        if self.get_workers() > 1:
+            shared_graph = SharedGraph(network.get_compact_graph())
+            executor = ProcessPoolExecutor(max_workers=self.get_workers(), initializer=SharedGraph.attach,
+                                           initargs=shared_graph.attach_arguments())
+        else:
+            shared_graph = None
+            executor = ThreadPoolExecutor(max_workers=1)
+
+        return network, executor, shared_graph
+
+
+    @staticmethod
+    def release(executor, shared_graph):
+        """
+        Waits for the searches under way on a pool of workers and releases it, with the shared graph of its network.
+
+        Args:
+            executor (Executor): the pool of workers to be released.
+            shared_graph (SharedGraph): the shared graph to be released, or None.
+        """
+
+        executor.shutdown(wait=True)
+
+        if shared_graph is not None:
+            shared_graph.close()
+
+
+    async def find_fastest_paths(self, search, start, end, executor, shared_graph):
+        """
+        Finds the k fastest paths between two stations on a pool of workers, using the result cache of the search.
+
+        Args:
+            search (Search): a search on the network of the stations, with the number of fastest paths of the query and
+                             the result cache of the network.
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+            executor (Executor): the pool of workers of the network.
+            shared_graph (SharedGraph): the compact graph of the network shared with the worker processes, or None
+                                        when the searches run on a thread.
+
+        Returns:
+            list: the sorted list of fastest paths between the two stations.
+        """
+
+        loop = asyncio.get_running_loop()
+        network = search.get_network()
+        cache = search.get_cache()
+
+        if shared_graph is None:
+            return await loop.run_in_executor(executor, search.search_station_pair, start, end)
+
+        if not network.communicate(start, end):
+            return []
+
+        graph = network.get_compact_graph()
+        version = network.get_version()
+        cached, is_reversed = cache.get(start, end, search.get_k(), version)
+
+        if cached is None:
+            task = (graph.index_of(start), [graph.index_of(end)], search.get_k())
+            paths, complete = (await loop.run_in_executor(executor, SharedGraph.search_group, task))[0]
+            cache.put(start, end, search.get_k(), version, paths, complete)
+        elif is_reversed:
+            paths = KShortestPaths(network).reverse_paths(graph, cached[0])
+        else:
+            paths = cached[0]
+
+        return search.select_fastest_paths(graph, paths)
+
+
+    async def answer_query(self, request):
+        """
+        Answers a query for the fastest paths between two different stations. A query for more than the maximum number of
+        fastest paths of the server is rejected.
+
+        Args:
+            request (dict): the query, with the names of the stations in "from" and "to", and optionally the number of
+                            fastest paths in "k".
+
+        Returns:
+            dict: the response, with the names of the stations and the fastest paths, each with its time and the names
+                  of its stations, together with a message when there are no paths.
+        """
+
+        start_name, end_name = request.get("from"), request.get("to")
+        k = request.get("k", self.get_k())
+
+        if not isinstance(start_name, str) or not isinstance(end_name, str):
+            return {"error": "Invalid query"}
+
+        if not isinstance(k, int) or isinstance(k, bool) or k < 1 or k > self.get_max_k():
+            return {"error": "Invalid number of paths"}
+
+        network, executor, shared_graph, cache = self._network, self._executor, self._shared_graph, self._cache
+        search = Search(None, network, k, cache=cache, streaming=True)
+        start, end = network.station_by_name(start_name), network.station_by_name(end_name)
+
+        if start is not None and start is end:
+            return {"error": "Same start and end stations"}
+
+        fastest_paths = []
+        if start is not None and end is not None:
+            fastest_paths = await self.find_fastest_paths(search, start, end, executor, shared_graph)
+
+        response = {"from": start_name, "to": end_name,
+                    "paths": [{"time": path[0], "stations": [str(station) for station in path[1:]]}
+                              for path in fastest_paths]}
+
+        if not fastest_paths:
+            station_pair = [start or Station(start_name), end or Station(end_name)]
+            response["message"] = search.format_station_pair(station_pair, fastest_paths, start is None, end is None)[1]
+
+        return response
+
+
+    async def reload(self):
+        """
+        Loads the network file again and swaps the new network, its pool of workers and an empty result cache in at
+        once, so that the searches still under way on the previous network only write to the previous cache. The
+        previous pool is released once those searches are finished, and only then are the interned times forgotten, so
+        that those of the previous network are not kept. If the network file cannot be loaded, the previous network is
+        kept.
+
+        Returns:
+            dict: the response, with the number of stations of the new network, or an error.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        async with self._reload_lock:
+            try:
+                network, executor, shared_graph = await loop.run_in_executor(None, self.load)
+            except (OSError, ValueError) as error:
+                return {"error": str(error)}
+
+            previous_executor, previous_shared_graph = self._executor, self._shared_graph
+            self._network, self._executor, self._shared_graph = network, executor, shared_graph
+            self._cache = ResultCache(self._cache.get_max_size())
+
+            await loop.run_in_executor(None, self.release, previous_executor, previous_shared_graph)
+            Time.clear_interned()
+
+        return {"reloaded": True, "stations": len(network.get_stations())}
+
+
+    async def answer(self, line):
+        """
+        Answers a request. The "id" of the request, if any, is copied to the response.
+
+        Args:
+            line (bytes): the request, as a JSON object.
+
+        Returns:
+            dict: the response to the request, or an error.
+        """
+
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"error": "Invalid JSON"}
+
+        if not isinstance(request, dict):
+            return {"error": "Invalid request"}
+
+        try:
+            if "command" not in request:
+                response = await self.answer_query(request)
+            elif request["command"] == "reload":
+                response = await self.reload()
+            else:
+                response = {"error": "Unknown command"}
+        except Exception as error:
+            response = {"error": str(error) or type(error).__name__}
+
+        if "id" in request:
+            response["id"] = request["id"]
+
+        return response
+
+
+    async def send_responses(self, responses, writer):
+        """
+        Writes the responses of a connection in the order of its requests, as each one is ready.
+
+        Args:
+            responses (Queue): the tasks answering the requests of the connection, in order, followed by None.
+            writer (StreamWriter): the stream to which the responses are written.
+        """
+
+        while True:
+            task = await responses.get()
+            if task is None:
+                return
+
+            response = await task
+            writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+
+
+    async def handle_connection(self, reader, writer):
+        """
+        Answers the requests of a connection until the client closes it or the server stops. Each request is answered
+        as soon as it is read, while at most SERVER_PIPELINE_DEPTH responses wait to be written. A request longer than
+        the limit of the stream closes the connection.
+
+        Args:
+            reader (StreamReader): the stream from which the requests are read.
+            writer (StreamWriter): the stream to which the responses are written.
+        """
+
+        responses = asyncio.Queue(SERVER_PIPELINE_DEPTH)
+        sender = asyncio.create_task(self.send_responses(responses, writer))
+
+        try:
+            while not sender.done():
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    line = b""
+
+                if not line:
+                    break
+
+                if line.strip():
+                    await responses.put(asyncio.ensure_future(self.answer(line)))
+
+            if not sender.done():
+                await responses.put(None)
+
+            await sender
+        except (ConnectionError, asyncio.CancelledError):
+            sender.cancel()
+        finally:
+            writer.close()
+
+
+    async def start(self, host=SERVER_HOST, port=SERVER_PORT, unix_socket=None):
+        """
+        Loads the network and starts listening for connections.
+
+        Args:
+            host (str, optional): the address on which the server listens. Defaults to SERVER_HOST.
+            port (int, optional): the TCP port on which the server listens, where 0 picks a free port. Defaults to
+                                  SERVER_PORT.
+            unix_socket (str, optional): the Unix socket on which the server listens instead of a TCP port. Defaults
+                                         to None.
+
+        Returns:
+            Server: the asyncio server accepting the connections.
+        """
+
+        self._reload_lock = asyncio.Lock()
+        self._network, self._executor, self._shared_graph = \
+            await asyncio.get_running_loop().run_in_executor(None, self.load)
+
+        if unix_socket is not None:
+            self._unix_socket = unix_socket
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT, unix_socket=None):
+        """
+        Loads the network and answers queries until the server receives SIGTERM or is interrupted. The address on
+        which the server listens is written to the standard error, so that the standard output is left untouched.
+
+        Args:
+            host (str, optional): the address on which the server listens. Defaults to SERVER_HOST.
+            port (int, optional): the TCP port on which the server listens. Defaults to SERVER_PORT.
+            unix_socket (str, optional): the Unix socket on which the server listens instead of a TCP port. Defaults
+                                         to None.
+        """
+
+        server = await self.start(host, port, unix_socket)
+        stopped = asyncio.Event()
+
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+        except NotImplementedError:
+            pass
+
+        try:
+            async with server:
+                print("Serving " + self.get_network_file() + " on " +
+                      ", ".join(str(listener.getsockname()) for listener in server.sockets),
+                      file=sys.stderr, flush=True)
+                await stopped.wait()
+        finally:
+            self.close()
+
+
+    def close(self):
+        """
+        Releases the pool of workers of the current QueryServer instance and removes its Unix socket, if any.
+        """
+
+        if self._executor is not None:
+            self.release(self._executor, self._shared_graph)
+            self._executor, self._shared_graph = None, None
+
+        if self._unix_socket is not None and os.path.exists(self._unix_socket):
+            os.remove(self._unix_socket)
@@ -0,0 +1,206 @@
+#-*- coding: utf-8 -*-
+
+
+from collections import OrderedDict
+
+from constants import RESULT_CACHE_SIZE
+
+
+class ResultCache:
+    """
+    A class to represent a bounded least-recently-used cache of search results, keyed by the start and end stations
+    and the number of fastest paths, so that stations without an id are told apart by their names. The cache is emptied
+    whenever the version of the network changes.
+    """
+
+    def __init__(self, max_size=RESULT_CACHE_SIZE):
+        """
+        Initializes a new ResultCache.
+
+        Args:
+            max_size (int, optional): the maximum number of entries of the cache. Defaults to RESULT_CACHE_SIZE.
+
+        Raises:
+            ValueError: If max_size is smaller than 1, with the message 'Invalid cache size'.
+        """
+
+        self._entries = OrderedDict()
+        self._version = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+        self.set_max_size(max_size)
+
+
+    def get_max_size(self):
+        """
+        The maximum number of entries of the current ResultCache instance.
+
+        Returns:
+            int: the maximum number of entries of the current ResultCache instance.
+        """
+
+        return self._max_size
+
+
+    def set_max_size(self, max_size):
+        """
+        Sets the maximum number of entries of the current ResultCache instance, evicting the least recently used entries
+        that no longer fit.
+
+        Args:
+            max_size (int): the maximum number of entries to set for the current ResultCache instance.
+
+        Raises:
+            ValueError: If max_size is smaller than 1, with the message 'Invalid cache size'.
+        """
+
+        if max_size < 1:
+            raise ValueError('Invalid cache size')
+
+        self._max_size = max_size
+
+        while len(self._entries) > max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+    def get_hits(self):
+        """
+        The number of lookups answered by the current ResultCache instance.
+
+        Returns:
+            int: the number of hits of the current ResultCache instance.
+        """
+
+        return self._hits
+
+
+    def get_misses(self):
+        """
+        The number of lookups not answered by the current ResultCache instance.
+
+        Returns:
+            int: the number of misses of the current ResultCache instance.
+        """
+
+        return self._misses
+
+
+    def get_evictions(self):
+        """
+        The number of entries evicted from the current ResultCache instance to respect its maximum size.
+
+        Returns:
+            int: the number of evictions of the current ResultCache instance.
+        """
+
+        return self._evictions
+
+
+    def get_invalidations(self):
+        """
+        The number of times the current ResultCache instance was emptied because the network changed.
+
+        Returns:
+            int: the number of invalidations of the current ResultCache instance.
+        """
+
+        return self._invalidations
+
+
+    def validate(self, version):
+        """
+        Empties the current ResultCache instance if its entries belong to another version of the network.
+
+        Args:
+            version (int): the current version of the network.
+        """
+
+        if version != self._version:
+            if self._entries:
+                self._entries.clear()
+                self._invalidations += 1
+            self._version = version
+
+
+    def get(self, start, end, k, version):
+        """
+        Looks up the search result of a pair of stations. A pair that is not cached is answered from the reversed pair
+        when the result of the reversed pair does not depend on the direction of the search.
+
+        Args:
+            start (Station): the start station.
+            end (Station): the end station.
+            k (int): the number of fastest paths.
+            version (int): the current version of the network.
+
+        Returns:
+            tuple: a 2-element tuple containing:
+                - result (tuple): the cached paths and whether they are complete, or None if there is no usable entry.
+                - reversed (bool): whether the result belongs to the reversed pair.
+        """
+
+        self.validate(version)
+
+        key = (start, end, k)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return self._entries[key], False
+
+        reversed_key = (end, start, k)
+        if reversed_key in self._entries and self._entries[reversed_key][1]:
+            self._entries.move_to_end(reversed_key)
+            self._hits += 1
+            return self._entries[reversed_key], True
+
+        self._misses += 1
+
+        return None, False
+
+
+    def put(self, start, end, k, version, paths, complete):
+        """
+        Stores the search result of a pair of stations, evicting the least recently used entry if the current
+        ResultCache instance is full.
+
+        Args:
+            start (Station): the start station.
+            end (Station): the end station.
+            k (int): the number of fastest paths.
+            version (int): the current version of the network.
+            paths (list): the paths found for the pair.
+            complete (bool): whether the paths do not depend on the direction of the search.
+        """
+
+        self.validate(version)
+
+        key = (start, end, k)
+        self._entries[key] = (paths, complete)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.get_max_size():
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+    def clear(self):
+        """
+        Removes all the entries of the current ResultCache instance.
+        """
+
+        self._entries.clear()
+
+
+    def __len__(self):
+        """
+        The number of entries of the current ResultCache instance.
+
+        Returns:
+            int: the number of entries of the current ResultCache instance.
+        """
+
+        return len(self._entries)
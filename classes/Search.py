@@ -2,34 +2,59 @@
 
 
 import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 from classes.Station import Station
+from classes.KShortestPaths import KShortestPaths
+from classes.QueryPlanner import QueryPlanner
+from classes.SharedGraph import SharedGraph
 
-from constants import RESULTS_PATH
+from constants import RESULTS_PATH, NUMBER_OF_FASTEST_PATHS, NUMBER_OF_WORKERS
 
 
 class Search:
     """
-    A class that performs depth-first search on a network of the fastest-path-finder tool.
+    A class that searches for the fastest paths on a network of the fastest-path-finder tool.
     """
 
-    def __init__(self, stations_file, network):
+    def __init__(self, stations_file, network, k=NUMBER_OF_FASTEST_PATHS, cache=None, streaming=False, stats=None,
+                 budget=None):
         """
         Initializes a new Search.
 
         Args:
             stations_file (str): the name of the input stations file that contains the stations requests
-            network (Network): the network where the depth-first search is to be performed.
+            network (Network): the network where the search is to be performed.
+            k (int, optional): the number of fastest paths to find for each pair of stations. Defaults to
+                               NUMBER_OF_FASTEST_PATHS.
+            cache (ResultCache, optional): a cache of search results shared between searches on the same network.
+                                           Defaults to None.
+            streaming (bool, optional): whether the stations file is only read, one pair at a time, by stream_results
+                                        instead of being checked when the Search is initialized. Defaults to False.
+            stats (SearchStats, optional): the statistics to which the work of the search of each pair of stations is
+                                           added. Defaults to None, in which case it is not recorded.
+            budget (SearchBudget, optional): the budget of the search of each pair of stations. Defaults to None, in
+                                             which case it is not bounded.
+
+        Raises:
+            ValueError: If k is smaller than 1, with the message 'Invalid number of paths'.
         """
 
         self._stations_file = stations_file
         self._network = network
+        self.set_k(k)
+        self._cache = cache
+        self._stats = stats
+        self._budget = budget
         self._stations = []
         self._in_network_stations = []
         self._out_of_network_stations = []
         self._search_results = []
-        
-        self.check_network_stations()
+        self._truncated_pairs = set()
+
+        if not streaming:
+            self.check_network_stations()
 
 
     def get_stations_file(self):
@@ -75,7 +100,102 @@ class Search:
 
         self._network = network
 
+
+    def get_k(self):
+        """
+        The number of fastest paths found for each pair of stations by the current Search instance.
+
+        Returns:
+            int: the number of fastest paths found for each pair of stations by the current Search instance.
+        """
+
+        return self._k
+
+
+    def set_k(self, k):
+        """
+        Sets the number of fastest paths found for each pair of stations by the current Search instance.
+
+        Args:
+            k (int): the number of fastest paths to set for the current Search instance.
+
+        Raises:
+            ValueError: If k is smaller than 1, with the message 'Invalid number of paths'.
+        """
+
+        if k < 1:
+            raise ValueError('Invalid number of paths')
+
+        self._k = k
+
     
+    def get_cache(self):
+        """
+        The result cache of the current Search instance.
+
+        Returns:
+            ResultCache: the result cache of the current Search instance, or None if results are not cached.
+        """
+
+        return self._cache
+
+
+    def set_cache(self, cache):
+        """
+        Sets the result cache of the current Search instance.
+
+        Args:
+            cache (ResultCache): the result cache to set for the current Search instance, or None to disable caching.
+        """
+
+        self._cache = cache
+
+
+    def get_stats(self):
+        """
+        The search statistics of the current Search instance.
+
+        Returns:
+            SearchStats: the search statistics of the current Search instance, or None if they are not recorded.
+        """
+
+        return self._stats
+
+
+    def set_stats(self, stats):
+        """
+        Sets the search statistics of the current Search instance.
+
+        Args:
+            stats (SearchStats): the search statistics to set for the current Search instance, or None to stop recording
+                                 them.
+        """
+
+        self._stats = stats
+
+
+    def get_budget(self):
+        """
+        The search budget of the current Search instance.
+
+        Returns:
+            SearchBudget: the budget of the search of each pair of stations, or None if it is not bounded.
+        """
+
+        return self._budget
+
+
+    def set_budget(self, budget):
+        """
+        Sets the search budget of the current Search instance.
+
+        Args:
+            budget (SearchBudget): the budget of the search of each pair of stations, or None to not bound it.
+        """
+
+        self._budget = budget
+
+
     def get_stations(self):
         """
         The stations of the current Search instance.
@@ -164,6 +284,34 @@ class Search:
         self._search_results = search_results
 
 
+    def get_truncated_pairs(self):
+        """
+        The pairs of stations of the current Search instance whose search ran out of budget, and whose paths are
+        therefore possibly not the fastest ones.
+
+        Returns:
+            set: the start and end stations of each pair whose search ran out of budget.
+        """
+
+        return self._truncated_pairs
+
+
+    def stations_file_items(self):
+        """
+        Supports iteration over the pairs of stations of the stations file of the current Search instance, reading the
+        file one line at a time. The file is closed once all the lines have been read.
+
+        Yields:
+            list: a list with two strings representing a pair of stations (source and destination), as specified in a
+                  line of the file.
+        """
+
+        with open(self.get_stations_file(), "r", encoding="utf-8-sig") as in_file:
+            for line in in_file:
+                start, end = line.rstrip().split(" - ")
+                yield [start, end]
+
+
     def read_stations_file(self):
         """
         Reads the stations file of the current Search instance.
@@ -173,14 +321,7 @@ class Search:
                   destination), as specified in each line of the file
         """
 
-        in_file = open(self.get_stations_file(), "r", encoding="utf-8-sig")
-        lines = []
-        
-        for line in in_file:
-            start, end = line.rstrip().split(" - ")
-            lines.append([start, end])
-
-        return lines
+        return list(self.stations_file_items())
     
 
     def check_network_stations(self):
@@ -195,15 +336,8 @@ class Search:
         station_pairs = self.read_stations_file()
 
         for station_pair in station_pairs:
-            start_station = None
-            end_station = None
-
-            for station in self.get_network().stations_items():
-                if station.get_name() == station_pair[0]:
-                    start_station = station
-                    
-                if station.get_name() == station_pair[1]:
-                    end_station = station
+            start_station = self.get_network().station_by_name(station_pair[0])
+            end_station = self.get_network().station_by_name(station_pair[1])
 
             if start_station is not None and end_station is not None:
                 in_network_stations.append([start_station, end_station])
@@ -259,45 +393,168 @@ class Search:
         return result
         
 
-    def depth_first_search(self, start, end, path, fastest_paths):
+    def depth_first_search(self, start, end, path, fastest_paths, lower_bounds=None):
         """
-        Performs depth-first search to find the three fastest paths between two stations of the current Search instance
+        Performs depth-first search to find the k fastest paths between two stations of the current Search instance.
+        This exhaustive search is kept as the reference for the faster search engines.
+
+        The search runs on the compact graph of the network with an explicit stack instead of recursion, so that long
+        paths do not reach the recursion limit. A single path of station numbers is extended and shortened in place, and
+        whether a station is on it is read from a byte array indexed by station number. The paths are visited in the
+        same order as by a recursive search, so the results are the same.
+
+        Branches are cut as soon as their time plus a lower bound on the time still needed to reach the end station
+        reaches the k-th fastest path found so far, which leaves the results unchanged. The bounds are those of
+        Network.lower_bounds_to.
+
+        When the Search has a SearchStats instance, the stations expanded, connections relaxed, branches pruned and
+        paths offered to update_fastest_paths are added to the pair of stations begun last. When it has a SearchBudget
+        instance, each station expanded is spent from the budget started last, and the search stops with the paths
+        found so far once the budget is exhausted.
 
         Args:
-            start (Station):
-            end (Station): 
-            path (list): the list of stations that make a path.
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+            path (list): the path that leads to the start station, whose first element is its time and the subsequent
+                         ones its stations, or an empty list when the search begins.
+            fastest_paths (list): the fastest paths found so far, or None when the search begins.
+            lower_bounds (function, optional): a function that receives a station and returns a lower bound on the time
+                                               of its fastest path to the end station, or None if it cannot reach it.
+                                               Built when the search begins if not provided. Defaults to None.
             
         Returns:
-            fastest_paths (list): a list of lists, where each inner list corresponds to one of the fastest paths (maximum of 3)
+            fastest_paths (list): a list of lists, where each inner list corresponds to one of the fastest paths (maximum of k)
                                   found between the start and end stations.
         """
 
         if fastest_paths is None:
             fastest_paths = []
 
+        if lower_bounds is None:
+            if not self.get_network().communicate(start, end):
+                return fastest_paths
+            lower_bounds = self.get_network().lower_bounds_to(end)
+
         if not path:
             path = [0, start]
 
-        current_time = path[0]
-        current_path = path[1:]
+        stats = self.get_stats()
+        budget = self.get_budget()
 
         if start == end:
             self.update_fastest_paths(path, fastest_paths)
+            if stats is not None:
+                stats.count(candidate_paths=1)
             return fastest_paths
 
-        if self.is_current_path_longer_than_third_fastest(fastest_paths, current_time):
+        lower_bound = lower_bounds(start)
+        if lower_bound is None:
+            return fastest_paths
+        if self.is_current_path_longer_than_third_fastest(fastest_paths, path[0], lower_bound):
+            if stats is not None:
+                stats.count(branches_pruned=1)
             return fastest_paths
 
-        for neighbor, time in self.get_network().children_of(start):
-            if neighbor not in current_path:
-                new_time = current_time + time.get_minutes()
-                new_path = [new_time] + current_path + [neighbor]
-                fastest_paths = self.depth_first_search(neighbor, end, new_path, fastest_paths)
+        graph = self.get_network().get_compact_graph()
+        offsets, targets, weights = graph.get_offsets(), graph.get_targets(), graph.get_weights()
+        stations = graph.get_stations()
+        end_index = graph.index_of(end)
+
+        current_path = [graph.index_of(station) for station in path[1:]]
+        on_path = bytearray(graph.number_of_stations())
+        for index in current_path:
+            on_path[index] = 1
+
+        bounds = {}
+        stack = [[current_path[-1], offsets[current_path[-1]], path[0]]]
+        nodes_expanded = 1
+        edges_relaxed = offsets[current_path[-1] + 1] - offsets[current_path[-1]]
+        branches_pruned = 0
+        candidate_paths = 0
+
+        while stack:
+            frame = stack[-1]
+            station, edge, time = frame
+
+            if edge == offsets[station + 1]:
+                stack.pop()
+                on_path[current_path.pop()] = 0
+                continue
+
+            frame[1] = edge + 1
+            neighbor = targets[edge]
+            if on_path[neighbor]:
+                continue
+
+            new_time = time + weights[edge]
+
+            if neighbor == end_index:
+                self.update_fastest_paths([new_time] + [stations[index] for index in current_path] + [stations[neighbor]],
+                                          fastest_paths)
+                candidate_paths += 1
+                continue
+
+            if neighbor not in bounds:
+                bounds[neighbor] = lower_bounds(stations[neighbor])
+
+            if bounds[neighbor] is None:
+                continue
+            if self.is_current_path_longer_than_third_fastest(fastest_paths, new_time, bounds[neighbor]):
+                branches_pruned += 1
+                continue
+
+            on_path[neighbor] = 1
+            current_path.append(neighbor)
+            stack.append([neighbor, offsets[neighbor], new_time])
+            nodes_expanded += 1
+            edges_relaxed += offsets[neighbor + 1] - offsets[neighbor]
+
+            if budget is not None and budget.spend():
+                break
+
+        if stats is not None:
+            stats.count(nodes_expanded, edges_relaxed, branches_pruned, candidate_paths)
 
         return fastest_paths
 
 
+    def seeded_depth_first_search(self, start, end):
+        """
+        Finds the k fastest paths between two stations with the depth-first search, within the budget of the current
+        Search instance. The fastest path is first found by a bidirectional Dijkstra search, so that a search that runs
+        out of budget still returns it, together with the paths found by the depth-first search until then, and the
+        pair of stations is added to the truncated pairs.
+
+        Args:
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+
+        Returns:
+            list: the sorted list of fastest paths between the two stations.
+        """
+
+        budget = self.get_budget()
+        self._truncated_pairs.discard((start, end))
+
+        if budget is None or not self.get_network().communicate(start, end):
+            return self.sort_fastest_paths(self.depth_first_search(start, end, [], None))
+
+        graph = self.get_network().get_compact_graph()
+        k_shortest_paths = KShortestPaths(self.get_network(), self.get_stats())
+        seed = k_shortest_paths.bidirectional_path(graph, graph.index_of(start), graph.index_of(end))
+
+        budget.start((start, end))
+        fastest_paths = self.depth_first_search(start, end, [], None)
+
+        if budget.is_exhausted():
+            self._truncated_pairs.add((start, end))
+            seed_path = k_shortest_paths.to_stations(graph, [seed])[0]
+            if seed_path not in fastest_paths:
+                self.update_fastest_paths(seed_path, fastest_paths)
+
+        return self.sort_fastest_paths(fastest_paths)
+
+
     def update_fastest_paths(self, path, fastest_paths):
         """
         Updates the collection of fastest paths for the current Search instance.
@@ -309,7 +566,7 @@ class Search:
                          to the stations.
         """
 
-        if len(fastest_paths) < 3:
+        if len(fastest_paths) < self.get_k():
             fastest_paths.append(path)
         else:
             if path[0] < max(path[0] for path in fastest_paths):
@@ -317,25 +574,27 @@ class Search:
                 fastest_paths.append(path)
 
     
-    def is_current_path_longer_than_third_fastest(self, fastest_paths, current_time):
+    def is_current_path_longer_than_third_fastest(self, fastest_paths, current_time, remaining_time=0):
         """
-        Checks whether the current time of a path is longer than the third fastest path found so far between the start and
+        Checks whether the current time of a path is longer than the k-th fastest path found so far between the start and
         end stations.
         
         Args:
             fastest_paths (list): a list of lists, where each inner list corresponds to one of the fastest paths (up to
-                                  three) between the start and end stations.
+                                  k) between the start and end stations.
             current_time (int): the current time of the path.
+            remaining_time (int, optional): a lower bound on the time still needed to reach the end station. Defaults to 0.
 
         Returns:
             bool:
-                - True if the current path time is longer than the less fastest path in fastest paths.
+                - True if the current path time, plus the remaining time, is longer than the less fastest path in fastest
+                  paths.
                 - False otherwise.
         """
 
-        if len(fastest_paths) == 3:
+        if len(fastest_paths) == self.get_k():
             third_best_path_time = max(fastest_paths, key=lambda x: x[0])[0]
-            if current_time >= third_best_path_time:
+            if current_time + remaining_time >= third_best_path_time:
                 return True
         return False
 
@@ -347,7 +606,7 @@ class Search:
 
         Args:
             fastest_paths (list): a list of lists, where each inner list corresponds to one of the fastest paths (up to
-                                  three) between the start and end stations.
+                                  k) between the start and end stations.
         
         Returns:
             list: the sorted list of fastest paths.
@@ -356,20 +615,322 @@ class Search:
         return sorted(fastest_paths, key=lambda x: (x[0], -len(x[1:]), x[2]))
 
 
-    def search(self):
+    def find_candidate_paths(self, graph, groups, workers=NUMBER_OF_WORKERS):
         """
-        Performs depth-first search to find the three fastest paths between the station pairs provided in the stations file
-        and present in the network of the current Search instance.
+        Finds the candidate paths of groups of station pairs, either in the current process or spread over a pool of
+        worker processes that share the compact graph of the network. When statistics are recorded or the search is
+        bounded by a budget, the pairs are searched in the current process, so that their work is counted and bounded.
+        They are also searched in the current process when the network has a contraction hierarchy or a landmark index,
+        which the worker processes do not share.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            groups (dict): a dictionary mapping each start station to the list of end stations to be searched from it.
+            workers (int, optional): the number of worker processes. Defaults to NUMBER_OF_WORKERS.
+
+        Returns:
+            dict: a dictionary mapping each station pair to the paths and completeness returned by
+                  KShortestPaths.candidate_paths.
         """
-        
+
+        tasks = [(graph.index_of(start), [graph.index_of(end) for end in ends], self.get_k())
+                 for start, ends in groups.items()]
+
+        network = self.get_network()
+        shareable = network.get_contraction_hierarchy() is None and network.get_landmark_index() is None
+
+        if workers > 1 and len(tasks) > 1 and self.get_stats() is None and self.get_budget() is None and shareable:
+            shared_graph = SharedGraph(graph)
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=SharedGraph.attach,
+                                         initargs=shared_graph.attach_arguments()) as executor:
+                    task_results = list(executor.map(SharedGraph.search_group, tasks,
+                                                     chunksize=max(1, len(tasks) // (4 * workers))))
+            finally:
+                shared_graph.close()
+        else:
+            k_shortest_paths = KShortestPaths(self.get_network(), self.get_stats(), self.get_budget())
+            task_results = [k_shortest_paths.candidate_paths_from(graph, *task) for task in tasks]
+
+        candidates = {}
+        for (start, ends), group_results in zip(groups.items(), task_results):
+            for end, result in zip(ends, group_results):
+                candidates[(start, end)] = result
+
+        return candidates
+
+
+    def search(self, workers=NUMBER_OF_WORKERS):
+        """
+        Finds the k fastest paths between the station pairs provided in the stations file and present in the network of
+        the current Search instance. Pairs of stations in different components of the network are answered without any
+        search. The other pairs are planned by a QueryPlanner, so that repeated and reversed pairs are searched once and
+        one shortest path tree is computed for each start station.
+
+        When statistics are recorded, each pair of stations in the same component has one record, holding the work of
+        the search of the pair and of the selection of its fastest paths. A pair answered from the cache, or from the
+        paths of the opposite pair, only holds the work of the selection.
+
+        When the search is bounded by a budget, the pairs whose search ran out of it keep the paths found so far, which
+        always include the fastest path, are added to the truncated pairs and are not cached.
+
+        Args:
+            workers (int, optional): the number of worker processes over which the station pairs are spread. The results
+                                     are the same for any number of workers. Defaults to NUMBER_OF_WORKERS.
+        """
+
+        graph = self.get_network().get_compact_graph()
+        version = self.get_network().get_version()
+        cache = self.get_cache()
+        stats = self.get_stats()
+        budget = self.get_budget()
+        k_shortest_paths = KShortestPaths(self.get_network(), stats, budget)
+        planner = QueryPlanner([station_pair for station_pair in self.get_in_network_stations()
+                                if self.get_network().communicate(station_pair[0], station_pair[1])])
+        candidates = {}
+        uncached = {}
+
+        for start, ends in planner.groups_items():
+            for end in ends:
+                cached, is_reversed = None, False
+                if cache is not None:
+                    cached, is_reversed = cache.get(start, end, self.get_k(), version)
+
+                if cached is None:
+                    uncached.setdefault(start, []).append(end)
+                elif is_reversed:
+                    candidates[(start, end)] = (k_shortest_paths.reverse_paths(graph, cached[0]), cached[1])
+                else:
+                    candidates[(start, end)] = cached
+
+        for (start, end), result in self.find_candidate_paths(graph, uncached, workers).items():
+            if budget is not None and (graph.index_of(start), graph.index_of(end)) in budget.get_exhausted_queries():
+                self._truncated_pairs.add((start, end))
+            elif cache is not None:
+                cache.put(start, end, self.get_k(), version, *result)
+            candidates[(start, end)] = result
+
+        results = {}
+
         for station_pair in self.get_in_network_stations():
             start = station_pair[0]
             end = station_pair[1]
-            
-            fastest_paths = self.depth_first_search(start, end, [], None)
-            sorted_paths = self.sort_fastest_paths(fastest_paths)
 
-            self._search_results.append(sorted_paths)
+            if (start, end) not in results and not self.get_network().communicate(start, end):
+                results[(start, end)] = []
+
+            if (start, end) not in results:
+                if stats is not None:
+                    stats.begin(start, end)
+
+                pair, is_reversed = planner.canonical_pair(start, end)
+                paths, complete = candidates[pair]
+
+                if is_reversed and complete:
+                    paths = k_shortest_paths.reverse_paths(graph, paths)
+                elif is_reversed:
+                    paths, _ = k_shortest_paths.candidate_paths(graph, graph.index_of(start), graph.index_of(end),
+                                                                self.get_k())
+                    if budget is not None and budget.is_exhausted():
+                        self._truncated_pairs.add((start, end))
+                    elif cache is not None:
+                        cache.put(start, end, self.get_k(), version, paths, False)
+
+                results[(start, end)] = self.select_fastest_paths(graph, paths)
+
+                if stats is not None:
+                    stats.end()
+
+            self._search_results.append(results[(start, end)])
+
+
+    def search_station_pair(self, start, end):
+        """
+        Finds the k fastest paths between two stations of the network of the current Search instance, using the result
+        cache when there is one. Stations in different components of the network are answered without any search. When
+        the search runs out of budget, the pair of stations is added to the truncated pairs and its paths are not cached.
+
+        Args:
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+
+        Returns:
+            list: the sorted list of fastest paths between the two stations.
+        """
+
+        self._truncated_pairs.discard((start, end))
+
+        if not self.get_network().communicate(start, end):
+            return []
+
+        graph = self.get_network().get_compact_graph()
+        version = self.get_network().get_version()
+        cache = self.get_cache()
+        stats = self.get_stats()
+        budget = self.get_budget()
+        k_shortest_paths = KShortestPaths(self.get_network(), stats, budget)
+
+        if stats is not None:
+            stats.begin(start, end)
+
+        cached, is_reversed = None, False
+        if cache is not None:
+            cached, is_reversed = cache.get(start, end, self.get_k(), version)
+
+        if cached is None:
+            paths, complete = k_shortest_paths.candidate_paths(graph, graph.index_of(start), graph.index_of(end),
+                                                               self.get_k())
+            if budget is not None and budget.is_exhausted():
+                self._truncated_pairs.add((start, end))
+            elif cache is not None:
+                cache.put(start, end, self.get_k(), version, paths, complete)
+        elif is_reversed:
+            paths = k_shortest_paths.reverse_paths(graph, cached[0])
+        else:
+            paths = cached[0]
+
+        fastest_paths = self.select_fastest_paths(graph, paths)
+
+        if stats is not None:
+            stats.end()
+
+        return fastest_paths
+
+
+    def select_fastest_paths(self, graph, paths):
+        """
+        Selects the k fastest paths among the paths found by KShortestPaths.candidate_paths, as the depth-first search
+        would.
+
+        Args:
+            graph (CompactGraph): the compact graph of the network.
+            paths (list): the time, connections and stations of each path.
+
+        Returns:
+            list: the sorted list of fastest paths.
+        """
+
+        fastest_paths = []
+        for path in KShortestPaths(self.get_network()).to_stations(graph, paths):
+            self.update_fastest_paths(path, fastest_paths)
+
+        if self.get_stats() is not None:
+            self.get_stats().count(candidate_paths=len(paths))
+
+        return self.sort_fastest_paths(fastest_paths)
+
+
+    def format_station_pair(self, station_pair, fastest_paths, start_out_of_network, end_out_of_network,
+                            truncated=False):
+        """
+        The lines of the results of a pair of stations.
+
+        Args:
+            station_pair (list): the list where the first element is the start station and the second element is the end
+                                 station.
+            fastest_paths (list): the sorted list of fastest paths between the two stations.
+            start_out_of_network (bool): whether the start station is out of the network.
+            end_out_of_network (bool): whether the end station is out of the network.
+            truncated (bool, optional): whether the search of the pair ran out of budget, so that its paths are possibly
+                                        not the fastest ones. Defaults to False.
+
+        Returns:
+            list: the lines of the results of the pair of stations, without line breaks.
+        """
+
+        lines = ['# ' + ' - '.join([str(station) for station in station_pair])]
+
+        if start_out_of_network and not end_out_of_network:
+            lines.append(f"{station_pair[0]} out of the network")
+        elif end_out_of_network and not start_out_of_network:
+            lines.append(f"{station_pair[1]} out of the network")
+        elif start_out_of_network and end_out_of_network:
+            lines.append(f"{station_pair[0]} and {station_pair[1]} out of the network")
+
+        for path in fastest_paths:
+            lines.append(', '.join([str(station) for station in path]))
+
+        if not fastest_paths and not start_out_of_network and not end_out_of_network:
+            lines.append(f"{station_pair[0]} and {station_pair[1]} do not communicate")
+
+        if truncated:
+            lines.append("search budget exhausted, paths possibly non-optimal")
+
+        return lines
+
+
+    def stream_results(self, file, path = RESULTS_PATH, search_station_pair=None):
+        """
+        Searches the pairs of stations of the stations file one at a time and writes the results of each pair as soon as
+        they are found, so that the paths of the pairs are not kept in memory and the results of the pairs already
+        searched are kept if the run is interrupted. The results are the same as those written by write_results: a pair
+        repeated in the stations file has the paths of all its occurrences written under each of them, so the stations
+        file is read once beforehand to count the occurrences of each pair, which takes memory proportional to the
+        number of distinct pairs.
+
+        Args:
+            file (str): the name of the file to where the search results are written to.
+            path (str): the path to where the file is written to.
+            search_station_pair (function, optional): a function that receives the start and end stations of a pair and
+                                                      returns its sorted list of fastest paths, as the method of the
+                                                      same name does. Defaults to None, in which case that method is
+                                                      used.
+        """
+
+        if search_station_pair is None:
+            search_station_pair = self.search_station_pair
+
+        os.makedirs(path, exist_ok=True)
+
+        occurrences = Counter(tuple(names) for names in self.stations_file_items())
+
+        with open(os.path.join(path, file), "w", encoding="utf-8-sig") as out_file:
+            for i, names in enumerate(self.stations_file_items()):
+                start = self.get_network().station_by_name(names[0])
+                end = self.get_network().station_by_name(names[1])
+
+                fastest_paths = []
+                if start is not None and end is not None:
+                    fastest_paths = search_station_pair(start, end) * occurrences[tuple(names)]
+
+                station_pair = [start or Station(names[0]), end or Station(names[1])]
+                lines = self.format_station_pair(station_pair, fastest_paths, start is None, end is None,
+                                                 (start, end) in self._truncated_pairs)
+
+                out_file.write(("\n" if i > 0 else "") + "\n".join(lines))
+                out_file.flush()
+
+
+    def write_fastest_times(self, file, path = RESULTS_PATH):
+        """
+        Writes, for each pair of stations of the current Search instance, only the time of its fastest path instead of
+        the k fastest paths. The times are read from the distance matrix of the network when it has been precomputed.
+
+        Args:
+            file (str): the name of the file to where the times are written to.
+            path (str): the path to where the file is written to.
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        out_of_network_stations = set(self.get_out_of_network_stations())
+        lines = []
+
+        for station_pair in self.stations_items():
+            start_out_of_network = station_pair[0] in out_of_network_stations
+            end_out_of_network = station_pair[1] in out_of_network_stations
+
+            fastest_times = []
+            if not start_out_of_network and not end_out_of_network:
+                time = self.get_network().fastest_time(station_pair[0], station_pair[1])
+                if time is not None:
+                    fastest_times.append([time])
+
+            lines.extend(self.format_station_pair(station_pair, fastest_times, start_out_of_network,
+                                                  end_out_of_network))
+
+        with open(os.path.join(path, file), "w", encoding="utf-8-sig") as out_file:
+            out_file.write("\n".join(lines))
 
 
     def write_results(self, file, path = RESULTS_PATH):
@@ -383,9 +944,8 @@ class Search:
 
         os.makedirs(path, exist_ok=True)
 
-        in_file = open(os.path.join(path, file), "w", encoding="utf-8-sig")
-        in_file.write(str(self))
-        in_file.close()
+        with open(os.path.join(path, file), "w", encoding="utf-8-sig") as out_file:
+            out_file.write(str(self))
 
 
     def __lt__(self, other_search):
@@ -423,33 +983,26 @@ class Search:
 
     def __str__(self):
         """
-        The string representation of a Search instance.
+        The string representation of a Search instance. The paths of the results are indexed once by their start and
+        end stations, so that the representation is built in time linear in the number of pairs and paths.
 
         Returns:
             result (str): the current Search instance as a string.
         """
 
-        result = ""
+        paths_by_pair = {}
+        for result_path in self.get_search_results():
+            for path in result_path:
+                paths_by_pair.setdefault((path[1], path[-1]), []).append(path)
+
+        out_of_network_stations = set(self.get_out_of_network_stations())
+        truncated_pairs = self.get_truncated_pairs()
+        lines = []
+
         for station_pair in self.stations_items():
-            
-            station_pairs_result = None
-            result += '# ' + ' - '.join([str(station) for station in station_pair]) + "\n"
-
-            if station_pair[0] in self.get_out_of_network_stations() and station_pair[1] not in self.get_out_of_network_stations():
-                result += f"{station_pair[0]} out of the network\n"
-            elif station_pair[1] in self.get_out_of_network_stations() and station_pair[0] not in self.get_out_of_network_stations():
-                result += f"{station_pair[1]} out of the network\n"
-            elif station_pair[0] in self.get_out_of_network_stations() and station_pair[1] in self.get_out_of_network_stations():
-                result += f"{station_pair[0]} and {station_pair[1]} out of the network\n"
-
-            for result_path in self.get_search_results():
-                for i in range(len(result_path)):
-                    if station_pair[0] == result_path[i][1] and station_pair[1] == result_path[i][-1]:
-                        station_pairs_result = ', '.join([str(station) for station in result_path[i]])
-                        result += station_pairs_result + "\n"
-
-            if station_pairs_result is None and station_pair[0] not in self.get_out_of_network_stations() \
-                                          and station_pair[1] not in self.get_out_of_network_stations():
-                result += f"{station_pair[0]} and {station_pair[1]} do not communicate\n"
+            lines.extend(self.format_station_pair(station_pair, paths_by_pair.get((station_pair[0], station_pair[1]), []),
+                                                  station_pair[0] in out_of_network_stations,
+                                                  station_pair[1] in out_of_network_stations,
+                                                  (station_pair[0], station_pair[1]) in truncated_pairs))
         
-        return result.rstrip()
\ No newline at end of file
+        return "\n".join(lines).rstrip()
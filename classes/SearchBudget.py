@@ -0,0 +1,153 @@
+#-*- coding: utf-8 -*-
+
+
+import time
+
+
+class SearchBudget:
+    """
+    A class that bounds the work of the search of each pair of stations, by a number of stations expanded, by a time in
+    seconds, or by both. The budget is started again before each search, and the search stops, keeping the paths found
+    so far, once it is exhausted.
+    """
+
+    def __init__(self, max_expansions=None, max_seconds=None):
+        """
+        Initializes a new SearchBudget.
+
+        Args:
+            max_expansions (int, optional): the number of stations that the search of a pair may expand. Defaults to
+                                            None, in which case it is not bounded.
+            max_seconds (float, optional): the time, in seconds, that the search of a pair may take. Defaults to None,
+                                           in which case it is not bounded.
+
+        Raises:
+            ValueError: if either bound is not positive, with the message 'Invalid search budget'.
+        """
+
+        self.set_max_expansions(max_expansions)
+        self.set_max_seconds(max_seconds)
+        self._query = None
+        self._expansions = 0
+        self._deadline = None
+        self._exhausted = False
+        self._exhausted_queries = set()
+
+
+    def get_max_expansions(self):
+        """
+        The number of stations that the search of a pair may expand with the current SearchBudget instance.
+
+        Returns:
+            int: the number of stations, or None if it is not bounded.
+        """
+
+        return self._max_expansions
+
+
+    def set_max_expansions(self, max_expansions):
+        """
+        Sets the number of stations that the search of a pair may expand with the current SearchBudget instance.
+
+        Args:
+            max_expansions (int): the number of stations to set, or None to not bound it.
+
+        Raises:
+            ValueError: if the number is smaller than 1, with the message 'Invalid search budget'.
+        """
+
+        if max_expansions is not None and max_expansions < 1:
+            raise ValueError('Invalid search budget')
+
+        self._max_expansions = max_expansions
+
+
+    def get_max_seconds(self):
+        """
+        The time that the search of a pair may take with the current SearchBudget instance.
+
+        Returns:
+            float: the time, in seconds, or None if it is not bounded.
+        """
+
+        return self._max_seconds
+
+
+    def set_max_seconds(self, max_seconds):
+        """
+        Sets the time that the search of a pair may take with the current SearchBudget instance.
+
+        Args:
+            max_seconds (float): the time, in seconds, to set, or None to not bound it.
+
+        Raises:
+            ValueError: if the time is not positive, with the message 'Invalid search budget'.
+        """
+
+        if max_seconds is not None and max_seconds <= 0:
+            raise ValueError('Invalid search budget')
+
+        self._max_seconds = max_seconds
+
+
+    def get_exhausted_queries(self):
+        """
+        The queries of the current SearchBudget instance whose budget was exhausted.
+
+        Returns:
+            set: the queries given to start whose search ran out of budget.
+        """
+
+        return self._exhausted_queries
+
+
+    def start(self, query):
+        """
+        Starts the budget of a search.
+
+        Args:
+            query (tuple): the query searched, such as its start and end stations, recorded if the budget is exhausted.
+        """
+
+        self._query = query
+        self._expansions = 0
+        self._deadline = time.perf_counter() + self._max_seconds if self._max_seconds is not None else None
+        self._exhausted = False
+        self._exhausted_queries.discard(query)
+
+
+    def spend(self, expansions=1):
+        """
+        Spends part of the budget of the search started last.
+
+        Args:
+            expansions (int, optional): the number of stations expanded. Defaults to 1.
+
+        Returns:
+            bool:
+                - True if the budget is exhausted.
+                - False otherwise.
+        """
+
+        if not self._exhausted:
+            self._expansions += expansions
+
+            if (self._max_expansions is not None and self._expansions > self._max_expansions) or \
+                    (self._deadline is not None and time.perf_counter() > self._deadline):
+                self._exhausted = True
+                self._exhausted_queries.add(self._query)
+
+        return self._exhausted
+
+
+    def is_exhausted(self):
+        """
+        Checks whether the budget of the search started last is exhausted.
+
+        Returns:
+            bool:
+                - True if the budget is exhausted.
+                - False otherwise.
+        """
+
+        return self._exhausted
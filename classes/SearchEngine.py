@@ -0,0 +1,216 @@
+#-*- coding: utf-8 -*-
+
+
+from abc import ABC, abstractmethod
+
+from constants import RESULTS_PATH, NUMBER_OF_WORKERS, AUTO_ENGINE
+
+
+class SearchEngine(ABC):
+    """
+    A class to represent a search engine of the fastest-path-finder tool: a strategy that finds the k fastest paths of
+    the pairs of stations of a Search, which then writes them in the same format whatever the engine.
+
+    Engines are subclasses that implement search and search_station_pair and register under their name with the
+    register method. An engine is chosen either by its name or automatically, from cheap statistics of the network and
+    the number of paths requested: among the engines suitable for the network, the one with the highest preference is
+    chosen. When the pairs are spread over several worker processes, only the engines that can use them are chosen.
+
+    Attributes:
+        name (str): the name under which the engine is registered.
+        preference (int): the preference of the engine when it is chosen automatically.
+        parallel (bool): whether the engine can spread the pairs of stations over several worker processes.
+    """
+
+    name = None
+    preference = 0
+    parallel = False
+    _engines = {}
+
+    @classmethod
+    def register(cls, engine_class):
+        """
+        Registers a search engine under its name, so that it can be chosen by name or automatically.
+
+        Args:
+            engine_class (type): the subclass of SearchEngine to be registered.
+
+        Returns:
+            type: the registered class, so that the method can be used as a class decorator.
+
+        Raises:
+            ValueError: if the engine has no name or its name is already registered, with the message
+                        'Invalid search engine'.
+        """
+
+        if not engine_class.name or engine_class.name == AUTO_ENGINE or engine_class.name in cls._engines:
+            raise ValueError('Invalid search engine')
+
+        cls._engines[engine_class.name] = engine_class
+
+        return engine_class
+
+
+    @classmethod
+    def names(cls):
+        """
+        The names of the registered search engines.
+
+        Returns:
+            list: the sorted names of the registered search engines.
+        """
+
+        return sorted(cls._engines)
+
+
+    @classmethod
+    def engine_class(cls, name):
+        """
+        The class of a registered search engine.
+
+        Args:
+            name (str): the name of the engine.
+
+        Returns:
+            type: the subclass of SearchEngine registered under the name.
+
+        Raises:
+            ValueError: if there is no engine registered under the name, with the message 'Unknown search engine'.
+        """
+
+        if name not in cls._engines:
+            raise ValueError('Unknown search engine')
+
+        return cls._engines[name]
+
+
+    @classmethod
+    def create(cls, name, network=None, k=None, workers=NUMBER_OF_WORKERS):
+        """
+        Creates a registered search engine.
+
+        Args:
+            name (str): the name of the engine, or AUTO_ENGINE to choose it with select.
+            network (Network, optional): the network, needed to choose the engine automatically. Defaults to None.
+            k (int, optional): the number of fastest paths requested, needed to choose the engine automatically.
+                               Defaults to None.
+            workers (int, optional): the number of worker processes over which the pairs of stations are spread, used
+                                     to choose the engine automatically. Defaults to NUMBER_OF_WORKERS.
+
+        Returns:
+            SearchEngine: a new instance of the engine.
+
+        Raises:
+            ValueError: if there is no engine registered under the name, with the message 'Unknown search engine'.
+        """
+
+        if name == AUTO_ENGINE:
+            name = cls.select(network, k, workers)
+
+        return cls.engine_class(name)()
+
+
+    @staticmethod
+    def network_statistics(network):
+        """
+        The statistics of a network from which an engine is chosen automatically, read from the component index of the
+        network without any search.
+
+        Args:
+            network (Network): the network.
+
+        Returns:
+            dict: the number of stations of the largest component.
+        """
+
+        return {"largest_component": network.get_components().largest_component_size()}
+
+
+    @classmethod
+    def select(cls, network, k, workers=NUMBER_OF_WORKERS):
+        """
+        Chooses the registered engine with the highest preference among those suitable for a network and a number of
+        fastest paths, and able to use the worker processes when there is more than one. Equal preferences are broken by
+        name.
+
+        Args:
+            network (Network): the network.
+            k (int): the number of fastest paths requested.
+            workers (int, optional): the number of worker processes over which the pairs of stations are spread.
+                                     Defaults to NUMBER_OF_WORKERS.
+
+        Returns:
+            str: the name of the chosen engine.
+
+        Raises:
+            ValueError: if no registered engine is suitable, with the message 'Unknown search engine'.
+        """
+
+        statistics = cls.network_statistics(network)
+        suitable = [engine_class for engine_class in cls._engines.values()
+                    if engine_class.suitable(statistics, k) and (workers <= 1 or engine_class.parallel)]
+
+        if not suitable:
+            raise ValueError('Unknown search engine')
+
+        return max(suitable, key=lambda engine_class: (engine_class.preference, engine_class.name)).name
+
+
+    @classmethod
+    def suitable(cls, statistics, k):
+        """
+        Checks whether the engine is suitable for a network, when it is chosen automatically.
+
+        Args:
+            statistics (dict): the statistics of the network, as returned by network_statistics.
+            k (int): the number of fastest paths requested.
+
+        Returns:
+            bool:
+                - True if the engine may be chosen for the network.
+                - False otherwise.
+        """
+
+        return True
+
+
+    @abstractmethod
+    def search(self, search, workers=NUMBER_OF_WORKERS):
+        """
+        Finds the k fastest paths of the pairs of stations of a Search in the network and appends them to its results,
+        in the order of its in-network station pairs.
+
+        Args:
+            search (Search): the search whose pairs of stations are searched.
+            workers (int, optional): the number of worker processes over which the pairs of stations may be spread.
+                                     Defaults to NUMBER_OF_WORKERS.
+        """
+
+
+    @abstractmethod
+    def search_station_pair(self, search, start, end):
+        """
+        Finds the k fastest paths between two stations of the network of a Search.
+
+        Args:
+            search (Search): the search that the pair of stations belongs to.
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+
+        Returns:
+            list: the sorted list of fastest paths between the two stations.
+        """
+
+
+    def stream_results(self, search, file, path = RESULTS_PATH):
+        """
+        Searches the pairs of stations of the stations file of a Search one at a time with the current engine and writes
+        the results of each pair as soon as they are found, as Search.stream_results does.
+
+        Args:
+            search (Search): the search whose pairs of stations are searched.
+            file (str): the name of the file to where the search results are written to.
+            path (str): the path to where the file is written to.
+        """
+
+        search.stream_results(file, path, lambda start, end: self.search_station_pair(search, start, end))
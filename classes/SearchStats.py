@@ -0,0 +1,145 @@
+#-*- coding: utf-8 -*-
+
+
+import csv
+import json
+import os
+import time
+
+from constants import RESULTS_PATH, SEARCH_STATS_FIELDS
+
+
+class SearchStats:
+    """
+    A class that records, for each pair of stations searched, how much work the search did: the stations expanded, the
+    connections relaxed, the branches pruned, the candidate paths offered to Search.update_fastest_paths and the wall
+    time.
+
+    The search engines count in local variables and add their counts once per call to the pair begun last, so that a
+    search without a SearchStats instance only pays for checking that there is none.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new SearchStats, without any pair.
+        """
+
+        self._records = {}
+        self._current = None
+        self._started = None
+
+
+    def get_records(self):
+        """
+        The records of the current SearchStats instance.
+
+        Returns:
+            dict: a dictionary mapping each pair of stations, in the order in which they were first begun, to the list
+                  of its stations expanded, connections relaxed, branches pruned, candidate paths and wall time in
+                  seconds.
+        """
+
+        return self._records
+
+
+    def begin(self, start, end):
+        """
+        Begins, or resumes, the recording of a pair of stations: the counts added until end is called, and the time
+        elapsed, are attributed to it.
+
+        Args:
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+        """
+
+        self._current = self._records.setdefault((start, end), [0, 0, 0, 0, 0.0])
+        self._started = time.perf_counter()
+
+
+    def end(self):
+        """
+        Ends the recording of the pair of stations begun last, adding the time elapsed since it was begun to its wall
+        time.
+        """
+
+        if self._current is not None:
+            self._current[4] += time.perf_counter() - self._started
+            self._current = None
+
+
+    def count(self, nodes_expanded=0, edges_relaxed=0, branches_pruned=0, candidate_paths=0):
+        """
+        Adds counts to the pair of stations begun last. Counts added while no pair is begun are ignored.
+
+        Args:
+            nodes_expanded (int, optional): the number of stations whose connections were explored. Defaults to 0.
+            edges_relaxed (int, optional): the number of connections explored. Defaults to 0.
+            branches_pruned (int, optional): the number of branches cut because they could not lead to one of the k
+                                             fastest paths. Defaults to 0.
+            candidate_paths (int, optional): the number of paths offered to Search.update_fastest_paths. Defaults to 0.
+        """
+
+        record = self._current
+        if record is not None:
+            record[0] += nodes_expanded
+            record[1] += edges_relaxed
+            record[2] += branches_pruned
+            record[3] += candidate_paths
+
+
+    def records_items(self):
+        """
+        Supports iteration over the records of the current SearchStats instance.
+
+        Yields:
+            dict: the record of a pair of stations, with a key for each of SEARCH_STATS_FIELDS.
+        """
+
+        for (start, end), record in self._records.items():
+            yield dict(zip(SEARCH_STATS_FIELDS, [str(start), str(end)] + record))
+
+
+    def totals(self):
+        """
+        The counts and wall time of all the pairs of stations of the current SearchStats instance.
+
+        Returns:
+            dict: the sum of each count and of the wall time, keyed by the fields of SEARCH_STATS_FIELDS that follow
+                  the stations.
+        """
+
+        return {field: sum(record[i] for record in self._records.values())
+                for i, field in enumerate(SEARCH_STATS_FIELDS[2:])}
+
+
+    def write(self, file, path = RESULTS_PATH):
+        """
+        Writes the records of the current SearchStats instance, one per pair of stations, as JSON if the file name ends
+        with '.json' and as CSV otherwise.
+
+        Args:
+            file (str): the name of the file to where the records are written to.
+            path (str): the path to where the file is written to.
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, file), "w", encoding="utf-8", newline="") as out_file:
+            if file.lower().endswith(".json"):
+                json.dump({"pairs": list(self.records_items()), "totals": self.totals()}, out_file, indent=2,
+                          ensure_ascii=False)
+            else:
+                writer = csv.DictWriter(out_file, fieldnames=SEARCH_STATS_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records_items())
+
+
+    def __len__(self):
+        """
+        The number of pairs of stations of the current SearchStats instance.
+
+        Returns:
+            int: the number of pairs of stations recorded.
+        """
+
+        return len(self._records)
@@ -0,0 +1,124 @@
+#-*- coding: utf-8 -*-
+
+
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+from classes.CompactGraph import CompactGraph
+from classes.KShortestPaths import KShortestPaths
+
+
+class SharedGraph:
+    """
+    A class to represent a compact graph published once in shared memory, so that the worker processes of a parallel
+    search can attach to it instead of receiving a copy of the network with every task.
+    """
+
+    _worker_memory = None
+    _worker_graph = None
+
+    def __init__(self, graph):
+        """
+        Initializes a new SharedGraph, copying the arrays of the given compact graph to a new shared memory block.
+
+        Args:
+            graph (CompactGraph): the compact graph to be published.
+        """
+
+        self._number_of_stations = graph.number_of_stations()
+        self._number_of_connections = graph.number_of_connections()
+
+        item_size = array('q').itemsize
+        self._memory = SharedMemory(create=True, size=max(1, item_size * self.size()))
+
+        position = 0
+        for section in (graph.get_offsets(), graph.get_targets(), graph.get_weights()):
+            with memoryview(self._memory.buf)[position:position + item_size * len(section)].cast('q') as view:
+                view[:] = section
+            position += item_size * len(section)
+
+
+    def get_name(self):
+        """
+        The name of the shared memory block of the current SharedGraph instance.
+
+        Returns:
+            str: the name of the shared memory block.
+        """
+
+        return self._memory.name
+
+
+    def size(self):
+        """
+        The number of integers stored in the shared memory block of the current SharedGraph instance.
+
+        Returns:
+            int: the number of offsets, targets and weights of the shared graph.
+        """
+
+        return self._number_of_stations + 1 + 2 * self._number_of_connections
+
+
+    def attach_arguments(self):
+        """
+        The arguments with which worker processes attach to the current SharedGraph instance.
+
+        Returns:
+            tuple: the name of the shared memory block, the number of stations and the number of connections.
+        """
+
+        return self.get_name(), self._number_of_stations, self._number_of_connections
+
+
+    def close(self):
+        """
+        Releases and destroys the shared memory block of the current SharedGraph instance.
+        """
+
+        self._memory.close()
+        self._memory.unlink()
+
+
+    @staticmethod
+    def attach(name, number_of_stations, number_of_connections):
+        """
+        Attaches the current worker process to a shared graph. Used as the initializer of the worker processes.
+
+        Args:
+            name (str): the name of the shared memory block.
+            number_of_stations (int): the number of stations of the shared graph.
+            number_of_connections (int): the number of connections of the shared graph.
+        """
+
+        memory = SharedMemory(name=name)
+
+        item_size = array('q').itemsize
+        sections = []
+        position = 0
+
+        for count in (number_of_stations + 1, number_of_connections, number_of_connections):
+            sections.append(memoryview(memory.buf)[position:position + item_size * count].cast('q'))
+            position += item_size * count
+
+        SharedGraph._worker_memory = memory
+        SharedGraph._worker_graph = CompactGraph(None, *sections)
+
+
+    @staticmethod
+    def search_group(task):
+        """
+        Finds, in the shared graph of the current worker process, the candidate paths of a group of station pairs with
+        the same start station.
+
+        Args:
+            task (tuple): the number of the start station, the numbers of the end stations and the number of fastest
+                          paths.
+
+        Returns:
+            list: the paths and completeness returned by KShortestPaths.candidate_paths for each end station.
+        """
+
+        start, ends, k = task
+
+        return KShortestPaths(None).candidate_paths_from(SharedGraph._worker_graph, start, ends, k)
@@ -3,9 +3,12 @@
 
 class Station:
     """
-    A class to represent a station.
+    A class to represent a station. Stations are kept in __slots__ and their hash is computed once, since networks
+    hold many of them and use them as dictionary keys.
     """
 
+    __slots__ = ("_name", "_id", "_hash")
+
     def __init__(self, name, id=None):
         """
         Initializes a new Station.
@@ -13,11 +16,17 @@ class Station:
         Args:
             name (str): the name of the station.
             id (str, optional): the unique identifier of the station. Defaults to None.
+
+        Attributes:
+            name (str): the name of the station.
+            id (str): the unique identifier of the station.
+            hash (int): the hash value of the station, computed from its id and name.
         """
 
         #super().__init__(name)
         self._name = name
         self._id = id
+        self._hash = hash((id, name))
     
 
     def get_name(self):
@@ -40,6 +49,7 @@ class Station:
         """
 
         self._name = name
+        self._hash = hash((self._id, name))
 
 
     def get_id(self):
@@ -62,18 +72,19 @@ class Station:
         """
 
         self._id = id
+        self._hash = hash((id, self._name))
 
 
     def __hash__(self):
         """
         The hash value for the current Station instance based on its id and name attributes, making this object usable
-        as a key in dictionaries.
+        as a key in dictionaries. The value is computed when the id or the name are set.
 
         Returns:
             int: a hash value unique to the current Station instance based on its id and name attributes.
         """
 
-        return hash((self.get_id(), self.get_name()))
+        return self._hash
 
     
     def __lt__(self, other_station):
@@ -97,18 +108,38 @@ class Station:
     
     def __eq__(self, other_station):
         """
-        Checks the equality between the current Station instance and another one according to their hash values.
+        Checks the equality between the current Station instance and another one according to their id and name. Identity
+        is checked first, since equal stations of a network are the same object, and then the cached hash values.
 
         Args:
             other_station (Station): another instance of the Station class.
 
         Returns:
             bool:
-                - True if both instances have the same hash values.
+                - True if both instances have the same id and name.
                 - False otherwise.
         """
 
-        return hash(self) == hash(other_station)
+        if self is other_station:
+            return True
+
+        if not isinstance(other_station, Station):
+            return NotImplemented
+
+        return self._hash == other_station._hash and self._id == other_station._id and \
+            self._name == other_station._name
+
+
+    def __reduce__(self):
+        """
+        Supports pickling the current Station instance, so that its hash value is computed again by the process that
+        unpickles it, where the hash values of strings may differ.
+
+        Returns:
+            tuple: the Station class and the arguments that rebuild the current Station instance.
+        """
+
+        return Station, (self._name, self._id)
 
 
     def __str__(self):
@@ -1,10 +1,19 @@
 #-*- coding: utf-8 -*-
 
 
+from constants import MAX_INTERNED_TIMES
+
+
 class Time:
     """
-    A class to represent a time.
+    A class to represent a time. Times are kept in __slots__, and the times of the connections of a network are
+    interned, so that connections with the same time share a single Time instance. Interned instances are read-only,
+    and at most MAX_INTERNED_TIMES time strings are interned at once.
     """
+
+    __slots__ = ("_time_string", "_minutes", "_read_only")
+
+    _interned = {}
     
     def __init__(self, time_string, minutes = None):
         """
@@ -19,12 +28,49 @@ class Time:
         populate it based on the time_string attribute.
         """
         
+        self._read_only = False
         self._time_string = time_string
         self._minutes = minutes
 
         self.convert_string_to_int()
 
 
+    @classmethod
+    def interned(cls, time_string):
+        """
+        The shared Time instance of a time string, which is created the first time the string is seen. Interned
+        instances are read-only, since they may be shared by many connections. Once MAX_INTERNED_TIMES time strings
+        are interned, the new ones get a read-only instance of their own.
+
+        Args:
+            time_string (str): minutes component of the time as a string.
+
+        Returns:
+            Time: the read-only Time instance with the given time string.
+        """
+
+        time = cls._interned.get(time_string)
+
+        if time is None:
+            time = cls(time_string)
+            time._read_only = True
+
+            if len(cls._interned) < MAX_INTERNED_TIMES:
+                cls._interned[time_string] = time
+
+        return time
+
+
+    @classmethod
+    def clear_interned(cls):
+        """
+        Forgets the interned Time instances, for instance when the network that used them is discarded. The instances
+        already handed out are left unchanged.
+        """
+
+        cls._interned.clear()
+
+
     def get_time_string(self):
         """
         The string representation with the format "HhM" of the current Time instance.
@@ -42,7 +88,13 @@ class Time:
         
         Args:
             time_string (str): the string representation with the format "HhM" to set for the current Time instance.
+
+        Raises:
+            ValueError: if the current Time instance is interned, with the message 'Read-only time'.
         """
+
+        if self._read_only:
+            raise ValueError('Read-only time')
         
         self._time_string = time_string
 
@@ -64,7 +116,13 @@ class Time:
 
         Args:
             minutes (int): the minutes to set for the current Time instance.
+
+        Raises:
+            ValueError: if the current Time instance is interned, with the message 'Read-only time'.
         """
+
+        if self._read_only:
+            raise ValueError('Read-only time')
         
         self._minutes = minutes
     
@@ -103,7 +161,8 @@ class Time:
 
     def __eq__(self, other_time):
         """
-        Checks the equality between the current Time instance and another one based on their minutes attribute.
+        Checks the equality between the current Time instance and another one based on their minutes attribute. Interned
+        instances are equal by identity.
 
         Args:
             other_time (Time): another instance of the Time class.
@@ -114,7 +173,7 @@ class Time:
                 - False otherwise.
         """
 
-        return self.get_minutes() == other_time.get_minutes()
+        return self is other_time or self._minutes == other_time._minutes
         
     
     def __str__(self):
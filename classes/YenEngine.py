@@ -0,0 +1,46 @@
+#-*- coding: utf-8 -*-
+
+
+from classes.SearchEngine import SearchEngine
+
+from constants import NUMBER_OF_WORKERS
+
+
+class YenEngine(SearchEngine):
+    """
+    A class that represents the search engine based on Yen's algorithm, through KShortestPaths. It plans the pairs of
+    stations, caches their results and spreads them over worker processes, as Search.search does, and is suitable for
+    any network.
+    """
+
+    name = 'yen'
+    preference = 0
+    parallel = True
+
+    def search(self, search, workers=NUMBER_OF_WORKERS):
+        """
+        Finds the k fastest paths of the pairs of stations of a Search with Search.search.
+
+        Args:
+            search (Search): the search whose pairs of stations are searched.
+            workers (int, optional): the number of worker processes over which the pairs of stations are spread.
+                                     Defaults to NUMBER_OF_WORKERS.
+        """
+
+        search.search(workers)
+
+
+    def search_station_pair(self, search, start, end):
+        """
+        Finds the k fastest paths between two stations with Search.search_station_pair.
+
+        Args:
+            search (Search): the search that the pair of stations belongs to.
+            start (Station): the station where the paths start.
+            end (Station): the station where the paths end.
+
+        Returns:
+            list: the sorted list of fastest paths between the two stations.
+        """
+
+        return search.search_station_pair(start, end)
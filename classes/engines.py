@@ -0,0 +1,21 @@
+#-*- coding: utf-8 -*-
+
+
+from classes.DepthFirstEngine import DepthFirstEngine
+from classes.SearchEngine import SearchEngine
+from classes.YenEngine import YenEngine
+
+
+# The search engines of the fastest-path-finder tool, in the order in which they are registered.
+ENGINES = (YenEngine, DepthFirstEngine)
+
+
+def register_engines():
+    """
+    Registers the search engines of the fastest-path-finder tool with SearchEngine, so that they can be chosen by name
+    or automatically. The engines already registered are skipped, so the function may be called more than once.
+    """
+
+    for engine_class in ENGINES:
+        if engine_class.name not in SearchEngine.names():
+            SearchEngine.register(engine_class)
@@ -1,17 +1,144 @@
 #-*- coding: utf-8 -*-
 
 
-# Constants related to file positions in the sys.argv list
+# Constant related to the path to the results folder
+RESULTS_PATH = './results/'
 
-## Index of the myLevadasNetwork.txt file position when running the program
-NETWORK_FILE_INDEX = 1
 
-## Index of the myStations.txt file position when running the program
-STATIONS_FILE_INDEX = 2
+# Constants related to the search
 
-## Index of the myResults.txt file position when running the program
-RESULTS_FILE_INDEX = 3
+## Number of fastest paths found for each pair of stations
+NUMBER_OF_FASTEST_PATHS = 3
 
+## Default number of worker processes over which the pairs of stations are searched
+NUMBER_OF_WORKERS = 1
 
-# Constant related to the path to the results folder
-RESULTS_PATH = './results/'
\ No newline at end of file
+
+# Constants related to the binary network snapshots
+
+## Extension appended to the network file name to name its snapshot
+SNAPSHOT_EXTENSION = '.snapshot'
+
+## First bytes of every snapshot file
+SNAPSHOT_MAGIC = b'NFPFSNAP'
+
+## Version of the snapshot format, to be increased whenever the format changes
+SNAPSHOT_VERSION = 1
+
+## Header of a snapshot: magic, version, little-endian flag, source hash, number of stations, number of connections and
+## size of the station strings (padded to a multiple of 8 bytes)
+SNAPSHOT_HEADER_FORMAT = '<8sI?3x32sqqq'
+
+
+# Constant related to the result cache
+
+## Default maximum number of search results kept by a ResultCache
+RESULT_CACHE_SIZE = 1024
+
+# Constants related to the all-pairs distance matrix
+
+## Extension appended to the network file name to name its distance matrix
+DISTANCE_MATRIX_EXTENSION = '.distances'
+
+## First bytes of every distance matrix file
+DISTANCE_MATRIX_MAGIC = b'NFPFDIST'
+
+## Version of the distance matrix format, to be increased whenever the format changes
+DISTANCE_MATRIX_VERSION = 1
+
+## Header of a distance matrix file: magic, version, little-endian flag, source hash and number of stations
+DISTANCE_MATRIX_HEADER_FORMAT = '<8sI?3x32sq'
+
+## Number of rows relaxed at once by the vectorized Floyd-Warshall algorithm
+DISTANCE_MATRIX_BLOCK_SIZE = 256
+
+## Time stored in the distance matrix for pairs of stations that do not communicate
+UNREACHABLE_TIME = -1
+
+## Largest number of stations of a network whose distance matrix is computed, which then takes at most 32 MB and about
+## 20 seconds with NumPy; larger networks answer time-only queries with one search per pair instead
+MAX_DISTANCE_MATRIX_STATIONS = 2000
+
+# Constants related to the contraction hierarchy
+
+## Extension appended to the network file name to name its contraction hierarchy
+CONTRACTION_HIERARCHY_EXTENSION = '.hierarchy'
+
+## First bytes of every contraction hierarchy file
+CONTRACTION_HIERARCHY_MAGIC = b'NFPFHIER'
+
+## Version of the contraction hierarchy format, to be increased whenever the format changes
+CONTRACTION_HIERARCHY_VERSION = 2
+
+## Header of a contraction hierarchy file: magic, version, little-endian flag, source hash, number of stations and
+## number of upward connections
+CONTRACTION_HIERARCHY_HEADER_FORMAT = '<8sI?3x32sqq'
+
+## Maximum number of stations settled by each witness search while contracting a station
+WITNESS_SEARCH_LIMIT = 64
+
+# Constants related to the landmark index
+
+## Extension appended to the network file name to name its landmark index
+LANDMARK_INDEX_EXTENSION = '.landmarks'
+
+## First bytes of every landmark index file
+LANDMARK_INDEX_MAGIC = b'NFPFLAND'
+
+## Version of the landmark index format, to be increased whenever the format changes
+LANDMARK_INDEX_VERSION = 1
+
+## Header of a landmark index file: magic, version, little-endian flag, source hash, number of stations, number of
+## landmarks requested and number of landmarks chosen
+LANDMARK_INDEX_HEADER_FORMAT = '<8sI?3x32sqqq'
+
+## Default number of landmarks of a landmark index
+NUMBER_OF_LANDMARKS = 8
+
+
+# Constants related to the query server
+
+## Default address on which the query server listens
+SERVER_HOST = '127.0.0.1'
+
+## Default port on which the query server listens
+SERVER_PORT = 8765
+
+## Maximum number of queries of a connection that are answered ahead of the responses being written
+SERVER_PIPELINE_DEPTH = 64
+
+## Default maximum number of fastest paths that a query to the query server may ask for
+SERVER_MAX_PATHS = 100
+
+
+# Constants related to the benchmarks
+
+## Phases of a run of the tool that are timed by the benchmark runner
+BENCHMARK_PHASES = ('load', 'resolution', 'search', 'write')
+
+## Relative slowdown of a phase allowed before the benchmark runner reports it as a regression
+BENCHMARK_TOLERANCE = 0.25
+
+## Slowdown, in seconds, below which a phase is never reported as a regression
+BENCHMARK_MINIMUM_DIFFERENCE = 0.01
+
+# Constants related to the search statistics
+
+## Fields of each record of the search statistics, in the order of the columns of their CSV report
+SEARCH_STATS_FIELDS = ('start', 'end', 'nodes_expanded', 'edges_relaxed', 'branches_pruned', 'candidate_paths',
+                       'wall_time')
+
+# Constants related to the search engines
+
+## Name of the engine that is chosen from the statistics of the network
+AUTO_ENGINE = 'auto'
+
+## Largest component, in number of stations, for which the automatic choice is the depth-first search, which is only as
+## fast as Yen's algorithm on very small networks and when more than one path is requested
+AUTO_DEPTH_FIRST_MAX_STATIONS = 12
+
+# Constants related to the times
+
+## Largest number of time strings whose Time instances are interned and shared, beyond which new time strings get
+## their own Time instance
+MAX_INTERNED_TIMES = 4096
\ No newline at end of file
@@ -1,29 +1,238 @@
 #-*- coding: utf-8 -*-
 
 
+import asyncio
+import sys
+from argparse import ArgumentParser
+
 from classes.Search import Search
 from classes.Network import Network
-from sys import argv
+from classes.QueryServer import QueryServer
+from classes.ResultCache import ResultCache
+from classes.SearchBudget import SearchBudget
+from classes.SearchStats import SearchStats
+from classes.SearchEngine import SearchEngine
+from classes.engines import register_engines
+
+from constants import SNAPSHOT_EXTENSION, DISTANCE_MATRIX_EXTENSION, CONTRACTION_HIERARCHY_EXTENSION, LANDMARK_INDEX_EXTENSION, \
+    NUMBER_OF_WORKERS, NUMBER_OF_FASTEST_PATHS, SERVER_HOST, SERVER_PORT, SERVER_MAX_PATHS, AUTO_ENGINE, \
+    MAX_DISTANCE_MATRIX_STATIONS
+
 
-from constants import NETWORK_FILE_INDEX, STATIONS_FILE_INDEX, RESULTS_FILE_INDEX
+register_engines()
 
 
-def find(network_file, stations_file, results_file):
+def find(network_file, stations_file, results_file, workers=NUMBER_OF_WORKERS, stream=False, times_only=False,
+         hierarchy=False, landmarks=None, k=NUMBER_OF_FASTEST_PATHS, stats_file=None,
+         budget=None, deadline=None, engine=AUTO_ENGINE):
     """
     Creates a network from the provided network file, executes a search operation using the stations file, and
-    writes the results to the specified output file.
+    writes the results to the specified output file. The network is loaded from its binary snapshot when the network
+    file has not changed since the snapshot was written.
 
     Args:
         network_file (str): the file name containing the network data.
         stations_file (str): the file name containing the stations data.
         results_file (str): the file name where search results will be written.
+        workers (int, optional): the number of worker processes over which the pairs of stations are searched.
+                                 Defaults to NUMBER_OF_WORKERS.
+        stream (bool, optional): whether the pairs of stations are searched and written one at a time. Defaults to
+                                 False.
+        times_only (bool, optional): whether only the time of the fastest path of each pair of stations is written,
+                                     read from the all-pairs distance matrix of the network, or found with one search
+                                     per pair when the network has more than MAX_DISTANCE_MATRIX_STATIONS stations.
+                                     Defaults to False.
+        hierarchy (bool, optional): whether the fastest path of each pair of stations is found with a contraction
+                                    hierarchy of the network, which is built once and saved next to the network file.
+                                    Defaults to False.
+        landmarks (int, optional): the number of landmarks of a landmark index of the network that guides the search,
+                                   which is built once and saved next to the network file. Defaults to None, in which
+                                   case no landmark index is used.
+        k (int, optional): the number of fastest paths written for each pair of stations. With k=1, each pair is
+                           answered by a single bidirectional search. Defaults to NUMBER_OF_FASTEST_PATHS.
+        stats_file (str, optional): the file name where the work of the search of each pair of stations is written, as
+                                    JSON if it ends with '.json' and as CSV otherwise. Defaults to None, in which case
+                                    it is not recorded.
+        budget (int, optional): the number of stations that the search of each pair of stations may expand. Defaults
+                                to None, in which case it is not bounded.
+        deadline (float, optional): the time, in seconds, that the search of each pair of stations may take. Defaults
+                                    to None, in which case it is not bounded. The pairs whose search runs out of budget
+                                    or time are written with the paths found so far, marked as possibly non-optimal.
+        engine (str, optional): the name of the search engine that finds the fastest paths, one of those registered
+                                with SearchEngine, or AUTO_ENGINE to choose it from the statistics of the network. The
+                                results are the same whatever the engine. Defaults to AUTO_ENGINE.
     """
     
-    network = Network(network_file)
+    stats = SearchStats() if stats_file is not None else None
+    search_budget = SearchBudget(budget, deadline) if budget is not None or deadline is not None else None
+    network = Network(network_file, compact=True, snapshot_file=network_file + SNAPSHOT_EXTENSION)
+
+    if hierarchy:
+        network.build_contraction_hierarchy(network_file + CONTRACTION_HIERARCHY_EXTENSION)
+
+    if landmarks is not None:
+        network.build_landmark_index(landmarks, network_file + LANDMARK_INDEX_EXTENSION)
+
+    if times_only:
+        if len(network.get_stations()) <= MAX_DISTANCE_MATRIX_STATIONS:
+            network.precompute_all_pairs(network_file + DISTANCE_MATRIX_EXTENSION)
+        searcher = Search(stations_file, network)
+        searcher.write_fastest_times(results_file)
+    elif stream:
+        searcher = Search(stations_file, network, k, cache=ResultCache(), streaming=True, stats=stats,
+                          budget=search_budget)
+        SearchEngine.create(engine, network, k).stream_results(searcher, results_file)
+    else:
+        searcher = Search(stations_file, network, k, stats=stats, budget=search_budget)
+        SearchEngine.create(engine, network, k, workers).search(searcher, workers)
+        searcher.write_results(results_file)
+
+    if stats is not None:
+        stats.write(stats_file)
+
+
+def serve(network_file, host=SERVER_HOST, port=SERVER_PORT, unix_socket=None, workers=NUMBER_OF_WORKERS,
+          k=NUMBER_OF_FASTEST_PATHS, max_k=SERVER_MAX_PATHS):
+    """
+    Loads the network from the provided network file once and answers JSON queries for its fastest paths over a local
+    socket until interrupted.
+
+    Args:
+        network_file (str): the file name containing the network data.
+        host (str, optional): the address on which the server listens. Defaults to SERVER_HOST.
+        port (int, optional): the TCP port on which the server listens. Defaults to SERVER_PORT.
+        unix_socket (str, optional): the Unix socket on which the server listens instead of a TCP port. Defaults to
+                                     None.
+        workers (int, optional): the number of worker processes over which the searches are spread. Defaults to
+                                 NUMBER_OF_WORKERS.
+        k (int, optional): the number of fastest paths of the queries that do not specify it. Defaults to
+                           NUMBER_OF_FASTEST_PATHS.
+        max_k (int, optional): the maximum number of fastest paths that a query may ask for. Defaults to
+                               SERVER_MAX_PATHS.
+    """
+
+    try:
+        asyncio.run(QueryServer(network_file, workers, k, max_k).serve(host, port, unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_serve_arguments(arguments):
+    """
+    Parses the command line arguments of the serve mode of the fastest-path-finder tool.
+
+    Args:
+        arguments (list): the command line arguments that follow "serve".
+
+    Returns:
+        Namespace: the parsed arguments.
+    """
+
+    parser = ArgumentParser(prog="main.py serve",
+                            description="Answers JSON queries for the fastest paths of a network over a local socket.")
+    parser.add_argument("network_file", help="the file containing the network data")
+    parser.add_argument("--host", default=SERVER_HOST, help="the address on which the server listens")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="the TCP port on which the server listens")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of a TCP port")
+    parser.add_argument("--workers", type=int, default=NUMBER_OF_WORKERS, metavar="N",
+                        help="the number of worker processes over which the searches are spread")
+    parser.add_argument("--paths", type=int, default=NUMBER_OF_FASTEST_PATHS, metavar="K",
+                        help="the number of fastest paths of the queries that do not specify it")
+    parser.add_argument("--max-paths", type=int, default=SERVER_MAX_PATHS, metavar="K",
+                        help="the maximum number of fastest paths that a query may ask for")
+
+    parsed_arguments = parser.parse_args(arguments)
+
+    if parsed_arguments.paths < 1:
+        parser.error("--paths must be at least 1")
+
+    if parsed_arguments.paths > parsed_arguments.max_paths:
+        parser.error("--paths cannot be greater than --max-paths")
+
+    if parsed_arguments.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return parsed_arguments
+
+
+def parse_arguments():
+    """
+    Parses the command line arguments of the fastest-path-finder tool.
+
+    Returns:
+        Namespace: the parsed arguments.
+    """
+
+    parser = ArgumentParser(description="Finds the fastest paths between pairs of stations of a network.")
+    parser.add_argument("network_file", help="the file containing the network data")
+    parser.add_argument("stations_file", help="the file containing the pairs of stations, one per line")
+    parser.add_argument("results_file", help="the name of the file, inside the results folder, to write the results to")
+    parser.add_argument("--workers", type=int, default=NUMBER_OF_WORKERS, metavar="N",
+                        help="the number of worker processes over which the pairs of stations are searched")
+    parser.add_argument("--stream", action="store_true",
+                        help="search and write the pairs of stations one at a time, keeping memory bounded")
+    parser.add_argument("--times-only", action="store_true",
+                        help="write only the time of the fastest path of each pair, from a precomputed distance matrix")
+    parser.add_argument("--hierarchy", action="store_true",
+                        help="find the fastest path of each pair with a precomputed contraction hierarchy of the network")
+    parser.add_argument("--paths", type=int, default=NUMBER_OF_FASTEST_PATHS, metavar="K",
+                        help="the number of fastest paths written for each pair of stations")
+    parser.add_argument("--landmarks", type=int, metavar="L",
+                        help="guide the search with a precomputed index of L landmark stations of the network")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="write the work of the search of each pair, inside the results folder, as CSV or JSON")
+    parser.add_argument("--engine", choices=[AUTO_ENGINE] + SearchEngine.names(), default=AUTO_ENGINE,
+                        help="the engine that finds the fastest paths, chosen from the network and --paths by default")
+    parser.add_argument("--budget", type=int, metavar="N",
+                        help="stop the search of a pair after expanding N stations, keeping the paths found so far")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="stop the search of a pair after SECONDS seconds, keeping the paths found so far")
+
+    arguments = parser.parse_args()
+
+    if arguments.stream and arguments.workers != NUMBER_OF_WORKERS:
+        parser.error("--stream cannot be combined with --workers")
+
+    if arguments.times_only and (arguments.stream or arguments.workers != NUMBER_OF_WORKERS):
+        parser.error("--times-only cannot be combined with --stream or --workers")
+
+    if arguments.stats is not None and (arguments.times_only or arguments.workers != NUMBER_OF_WORKERS):
+        parser.error("--stats cannot be combined with --times-only or --workers")
+
+    if arguments.engine != AUTO_ENGINE and not SearchEngine.engine_class(arguments.engine).parallel and \
+            arguments.workers != NUMBER_OF_WORKERS:
+        parser.error(f"--engine {arguments.engine} cannot be combined with --workers")
+
+    if (arguments.hierarchy or arguments.landmarks is not None) and arguments.workers != NUMBER_OF_WORKERS:
+        parser.error("--hierarchy and --landmarks cannot be combined with --workers")
+
+    bounded = arguments.budget is not None or arguments.deadline is not None
+
+    if bounded and (arguments.times_only or arguments.workers != NUMBER_OF_WORKERS):
+        parser.error("--budget and --deadline cannot be combined with --times-only or --workers")
+
+    if arguments.budget is not None and arguments.budget < 1:
+        parser.error("--budget must be at least 1")
+
+    if arguments.deadline is not None and arguments.deadline <= 0:
+        parser.error("--deadline must be positive")
+
+    if arguments.paths < 1:
+        parser.error("--paths must be at least 1")
+
+    if arguments.landmarks is not None and arguments.landmarks < 1:
+        parser.error("--landmarks must be at least 1")
 
-    dfs_searcher = Search(stations_file, network)
-    dfs_searcher.search()
-    dfs_searcher.write_results(results_file)
+    return arguments
 
 
-find(argv[NETWORK_FILE_INDEX], argv[STATIONS_FILE_INDEX], argv[RESULTS_FILE_INDEX])
\ No newline at end of file
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["serve"]:
+        arguments = parse_serve_arguments(sys.argv[2:])
+        serve(arguments.network_file, arguments.host, arguments.port, arguments.unix, arguments.workers,
+              arguments.paths, arguments.max_paths)
+    else:
+        arguments = parse_arguments()
+        find(arguments.network_file, arguments.stations_file, arguments.results_file, arguments.workers,
+             arguments.stream, arguments.times_only, arguments.hierarchy, arguments.landmarks, arguments.paths,
+             arguments.stats, arguments.budget, arguments.deadline, arguments.engine)